@@ -13,21 +13,28 @@
 # that they have been altered from the originals.
 """The base class of all QDesigns in Qiskit Metal."""
 
+import ast
+import heapq
 import importlib
+import time
 #import inspect
 #import os
 from datetime import datetime
+from collections.abc import Mapping
 from typing import Any, Dict as Dict_, Iterable, List, TYPE_CHECKING, Union
 
+import numpy as np
 import pandas as pd
 
 from qiskit_metal.qgeometries.qgeometries_handler import QGeometryTables
 from qiskit_metal.toolbox_metal.parsing import is_true, parse_options, parse_value
+from qiskit_metal.toolbox_metal.parsing import is_for_ast_eval, is_variable_name
 from qiskit_metal.designs.interface_components import Components
 from qiskit_metal.designs.net_info import QNet
 from qiskit_metal import Dict, config, logger
 from qiskit_metal.config import DefaultMetalOptions, DefaultOptionsRenderer
 from qiskit_metal.toolbox_metal.exceptions import QiskitMetalDesignError
+from qiskit_metal.toolbox_python.attr_dict import VersionedDict
 
 if not config.is_building_docs():
     from qiskit_metal.toolbox_metal.import_export import load_metal_design, save_metal
@@ -112,7 +119,8 @@ class QDesign():
         # Cache for component ids.  Hold the reverse of _components dict,
         self.name_to_id = Dict()
 
-        self._variables = Dict()
+        # Versioned, so that parse_value can cache values parsed with them
+        self._variables = VersionedDict()
         self._chips = Dict()
 
         self._metadata = self._init_metadata()
@@ -142,6 +150,18 @@ class QDesign():
 
         self._qnet = QNet()
 
+        # Dependency graph between components, keyed by component id.
+        # Each dict maps a child id to the set of parent ids it depends on.
+        # Explicit dependencies are added with add_dependency, pin dependencies
+        # are recorded by the child while it is being made.
+        self._dependencies = dict()
+        self._pin_dependencies = dict()
+
+        # Parsed options and upstream pins of the last successful build
+        # of each component, keyed by component id. Used to skip clean
+        # components during an incremental rebuild.
+        self._build_signatures = dict()
+
         # Dict used to populate the columns of QGeometry table i.e. path,
         # junction, poly etc.
         self.renderer_defaults_by_table = Dict()
@@ -253,7 +273,7 @@ class QDesign():
             pd.DataFrame: copy of net_info table.
         """
         # pylint: disable=protected-access
-        return self._qnet._net_info.copy(deep=True)
+        return self._qnet._get_table().copy(deep=True)
 
 #########Proxy properties##################################################
 
@@ -310,7 +330,7 @@ class QDesign():
         values = list(self._variables.values())
 
         keys[keys.index(old_key)] = new_key
-        self._variables = Dict(zip(keys, values))
+        self._variables = VersionedDict(zip(keys, values))
 
     def delete_all_pins(self) -> 'QNet':
         """Clear all pins in the net_Info and update the pins in components.
@@ -323,8 +343,7 @@ class QDesign():
         for (_, _, comp_id, pin_name) in df_net_info.itertuples():
             self._components[comp_id].pins[pin_name].net_id = 0
 
-        # remove rows, but save column names
-        self._qnet._net_info = self._qnet._net_info.iloc[0:0]
+        self._qnet.delete_all_nets()
         return self._qnet
 
     def connect_pins(self, comp1_id: int, pin1_name: str, comp2_id: int,
@@ -360,6 +379,21 @@ class QDesign():
             )
         return net_id
 
+    def connect_pins_many(self, connections: Iterable[tuple]) -> list:
+        """Connect many pairs of pins, as with connect_pins.
+
+        Args:
+            connections (Iterable[tuple]): Tuples of (comp1_id, pin1_name,
+                comp2_id, pin2_name).
+
+        Returns:
+            list: Net_id of each connection, 0 (zero) if it was not added.
+        """
+        return [
+            self.connect_pins(comp1_id, pin1_name, comp2_id, pin2_name)
+            for comp1_id, pin1_name, comp2_id, pin2_name in connections
+        ]
+
     #  This is replaced by design.components.find_id()
     # def get_component(self, search_name: str) -> 'QComponent':
     #     """The design contains a dict of all the components, which is correlated to
@@ -437,6 +471,9 @@ class QDesign():
         self.delete_all_pins()
         self.name_to_id.clear()
         self._components.clear()
+        self._dependencies.clear()
+        self._pin_dependencies.clear()
+        self._build_signatures.clear()
 
         self._qgeometry.clear_all_tables()
 
@@ -463,10 +500,79 @@ class QDesign():
 
         return self._qcomponent_latest_name_id[prefix]
 
-    def rebuild(self):  # remake_all_components
-        """Remakes all components with their current parameters."""
-        for _, obj in self._components.items():  # pylint: disable=unused-variable
-            obj.rebuild()
+    def rebuild(self,
+                incremental: bool = False) -> list:  # remake_all_components
+        """Remakes all components with their current parameters.
+
+        Args:
+            incremental (bool): When True, components are remade in dependency
+                order, and a component is skipped if its parsed options and the
+                pins of the components it depends on are unchanged since its
+                last successful build.  Defaults to False.
+
+        Returns:
+            list: Names of the components that were remade.
+        """
+        if not incremental:
+            for _, obj in self._components.items():  # pylint: disable=unused-variable
+                obj.rebuild()
+            return [obj.name for obj in self._components.values()]
+
+        return self._rebuild_components(
+            self._topological_order(self._components.keys()))
+
+    def route_all(self, route_names: Iterable[str] = None) -> pd.DataFrame:
+        """Remake many routes in one pass, one after the other.
+
+        The obstacles of the design are indexed once, before the first route.
+        Each finished route is then added to the index, so the next routes
+        avoid it. A route which fails to build is reported, and does not stop
+        the others.
+
+        Args:
+            route_names (Iterable[str]): Names of the routes, in the order to
+                route them.  Defaults to None, which remakes all the QRoutes
+                of the design, in the order they were added.
+
+        Returns:
+            pd.DataFrame: One row per route, with its name, build status,
+            time to build in seconds, and error message, or None.
+        """
+        # pylint: disable=import-outside-toplevel
+        from qiskit_metal.qlibrary.core import QRoute
+
+        if route_names is None:
+            route_names = [
+                component.name
+                for _, component in sorted(self._components.items())
+                if isinstance(component, QRoute)
+            ]
+
+        self._qgeometry.spatial_index.update()
+
+        report = []
+        for name in dict.fromkeys(route_names):
+            component_id = self._get_component_id(name)
+            error = None
+            start = time.perf_counter()
+            if component_id is None:
+                status = 'missing'
+                error = 'The component is not in the design.'
+            else:
+                try:
+                    self._components[component_id].rebuild()
+                except Exception as route_error:  # pylint: disable=broad-except
+                    error = str(route_error)
+                status = self._components[component_id].status
+            report.append((name, status, time.perf_counter() - start, error))
+
+        report = pd.DataFrame(report,
+                              columns=['name', 'status', 'time', 'error'])
+        failed = report[report['status'] != 'good']
+        if len(failed) > 0:
+            self.logger.warning(f'{len(failed)} of {len(report)} routes were '
+                                f'not built: {failed["name"].to_list()}')
+        return report
 
     def rename_component(self, component_id: int, new_component_name: str):
         """Rename component.  The component_id is expected.  However, if user
@@ -594,16 +700,15 @@ class QDesign():
                 # make net_id be zero for every component which is connected to it.
                 net_id_search = self._components[component_id].pins[
                     pin_name].net_id
-                df_subset_based_on_net_id = self.net_info[(
-                    self.net_info['net_id'] == net_id_search)]
-                delete_this_pin = df_subset_based_on_net_id[(
-                    df_subset_based_on_net_id['component_id'] != component_id)]
+                delete_this_pin = [(other_id, other_pin)
+                                   for other_id, other_pin in
+                                   self._qnet.get_pins_for_net_id(net_id_search)
+                                   if other_id != component_id]
 
                 # If Component is connected to anything, meaning it is part of net_info
                 # table.
-                if not delete_this_pin.empty:
-                    edit_component = list(delete_this_pin['component_id'])[0]
-                    edit_pin = list(delete_this_pin['pin_name'])[0]
+                if delete_this_pin:
+                    edit_component, edit_pin = delete_this_pin[0]
 
                     if self._components[edit_component]:
                         if self._components[edit_component].pins[edit_pin]:
@@ -623,6 +728,8 @@ class QDesign():
 
             # remove from design dict of components
             self._components.pop(component_id, None)
+
+            self._remove_component_from_dependencies(component_id)
         else:
             # if not in components dict
             logger.warning(
@@ -862,6 +969,19 @@ class QDesign():
 ####################################################################################
 # Dependencies
 
+    def _get_component_id(self, component: Union[str, int]) -> int:
+        """Get the id of a component from its name or id.
+
+        Args:
+            component (Union[str, int]): Name or id of the component.
+
+        Returns:
+            int: Id of the component, None if it is not in the design.
+        """
+        if isinstance(component, int):
+            return component if component in self._components else None
+        return self.name_to_id.get(component, None)
+
     def add_dependency(self, parent: str, child: str):
         """Add a dependency between one component and another.
 
@@ -869,6 +989,14 @@ class QDesign():
             parent (str): The component on which the child depends.
             child (str): The child cannot live without the parent.
         """
+        parent_id = self._get_component_id(parent)
+        child_id = self._get_component_id(child)
+        if parent_id is None or child_id is None:
+            self.logger.warning(
+                f'Called add_dependency with parent={parent}, child={child}, '
+                'but one of them is not in the design.')
+            return
+        self._dependencies.setdefault(child_id, set()).add(parent_id)
 
     def remove_dependency(self, parent: str, child: str):
         """Remove a dependency between one component and another.
@@ -877,17 +1005,354 @@ class QDesign():
             parent (str): The component on which the child depends.
             child (str): The child cannot live without the parent.
         """
+        parent_id = self._get_component_id(parent)
+        child_id = self._get_component_id(child)
+        if child_id in self._dependencies:
+            self._dependencies[child_id].discard(parent_id)
 
-    def update_component(self, component_name: str, dependencies: bool = True):
+    def _add_pin_dependency(self, parent: str, child_id: int):
+        """Record that the child uses a pin of the parent. Called by the child
+        while it is being made.
+
+        Args:
+            parent (str): Name of the component that owns the pin.
+            child_id (int): Id of the component that uses the pin.
+        """
+        parent_id = self._get_component_id(parent)
+        if parent_id is not None and parent_id != child_id:
+            self._pin_dependencies.setdefault(child_id, set()).add(parent_id)
+
+    def _clear_pin_dependencies(self, child_id: int):
+        """Forget the pin dependencies of a component, before it is remade.
+
+        Args:
+            child_id (int): Id of the component.
+        """
+        self._pin_dependencies.pop(child_id, None)
+
+    def _remove_component_from_dependencies(self, component_id: int):
+        """Remove a deleted component from the dependency graph.
+
+        Args:
+            component_id (int): Id of the deleted component.
+        """
+        self._build_signatures.pop(component_id, None)
+        for graph in (self._dependencies, self._pin_dependencies):
+            graph.pop(component_id, None)
+            for parent_ids in graph.values():
+                parent_ids.discard(component_id)
+
+    def _get_parent_ids(self, component_id: int) -> set:
+        """Ids of the components on which a component depends.
+
+        Args:
+            component_id (int): Id of the component.
+
+        Returns:
+            set: Ids of the parents.
+        """
+        return self._dependencies.get(component_id, set()) | \
+            self._pin_dependencies.get(component_id, set())
+
+    def _get_children_ids(self) -> Dict_[int, set]:
+        """Reverse the dependency graph.
+
+        Returns:
+            Dict[int, set]: Maps a component id to the ids of the components
+            that depend on it.
+        """
+        children = dict()
+        for graph in (self._dependencies, self._pin_dependencies):
+            for child_id, parent_ids in graph.items():
+                for parent_id in parent_ids:
+                    children.setdefault(parent_id, set()).add(child_id)
+        return children
+
+    def get_variable_references(self, value: Any) -> set:
+        """Names of the design variables referenced by a value, such as the
+        options of a component. Variables which are referenced by other
+        variables are included.
+
+        Args:
+            value (Any): Value to search, as would be passed to `parse_value`.
+
+        Returns:
+            set: Names of the referenced design variables.
+        """
+        found = set()
+        to_search = [value]
+        while to_search:
+            value = to_search.pop()
+            if isinstance(value, str):
+                val = value.strip()
+                if not val:
+                    continue
+                if is_variable_name(val):
+                    if val in self._variables and val not in found:
+                        found.add(val)
+                        to_search.append(self._variables[val])
+                elif is_for_ast_eval(val):
+                    try:
+                        to_search.append(ast.literal_eval(val))
+                    except (ValueError, SyntaxError):
+                        pass
+            elif isinstance(value, Mapping):
+                to_search.extend(value.values())
+            elif isinstance(value, (list, tuple, set)):
+                to_search.extend(value)
+        return found
+
+    def get_dependency_graph(self, variables: bool = False) -> Dict:
+        """Get the dependency graph of the design.
+
+        A component depends on another if it was connected to one of its pins
+        when it was made (such as a QRoute connecting to a qubit), or if the
+        dependency was added with `add_dependency`.
+
+        Args:
+            variables (bool): True to also add the design variables as nodes,
+                which map to the components whose options reference them.
+                Defaults to False.
+
+        Returns:
+            Dict: Maps the name of each component (or variable) to the sorted
+            list of names of the components that depend on it.
+        """
+        graph = Dict()
+        children = self._get_children_ids()
+        for component_id, component in self._components.items():
+            graph[component.name] = sorted(
+                self._components[child_id].name
+                for child_id in children.get(component_id, set()))
+        if variables:
+            for component in self._components.values():
+                for name in self.get_variable_references(component.options):
+                    graph.setdefault(name, []).append(component.name)
+            for name in self._variables:
+                if name in graph:
+                    graph[name] = sorted(graph[name])
+        return graph
+
+    def _get_descendant_ids(self, component_ids: Iterable[int]) -> set:
+        """Ids of the components and of everything that depends on them,
+        directly or not.
+
+        Args:
+            component_ids (Iterable[int]): Ids of the components.
+
+        Returns:
+            set: Ids of the components and their descendants.
+        """
+        children = self._get_children_ids()
+        found = set(component_ids)
+        to_visit = list(found)
+        while to_visit:
+            for child_id in children.get(to_visit.pop(), set()):
+                if child_id not in found:
+                    found.add(child_id)
+                    to_visit.append(child_id)
+        return found
+
+    def _topological_order(self, component_ids: Iterable[int]) -> list:
+        """Sort components so that every component comes after the components
+        it depends on. Ties are broken by the order in which the components
+        were added to the design.
+
+        Args:
+            component_ids (Iterable[int]): Ids of the components to sort.
+
+        Returns:
+            list: Sorted component ids.
+        """
+        component_ids = set(component_ids)
+        num_parents = dict()
+        children = dict()
+        for component_id in component_ids:
+            parent_ids = self._get_parent_ids(component_id) & component_ids
+            num_parents[component_id] = len(parent_ids)
+            for parent_id in parent_ids:
+                children.setdefault(parent_id, []).append(component_id)
+
+        ready = [cid for cid, count in num_parents.items() if count == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            component_id = heapq.heappop(ready)
+            order.append(component_id)
+            for child_id in children.get(component_id, []):
+                num_parents[child_id] -= 1
+                if num_parents[child_id] == 0:
+                    heapq.heappush(ready, child_id)
+
+        if len(order) < len(component_ids):
+            in_cycle = sorted(component_ids.difference(order))
+            self.logger.warning(
+                'The dependencies between components '
+                f'{[self._components[cid].name for cid in in_cycle]} '
+                'have a cycle. They will be remade in the order they were '
+                'added to the design.')
+            order += in_cycle
+        return order
+
+    @classmethod
+    def _freeze_value(cls, value: Any) -> Any:
+        """Make an immutable copy of an option value that can be compared
+        with ==.
+
+        Args:
+            value (Any): Value to copy, such as the options of a component.
+
+        Returns:
+            Any: Nested tuples in place of the mappings, lists and arrays.
+        """
+        if isinstance(value, Mapping):
+            return tuple(
+                (key, cls._freeze_value(val)) for key, val in value.items())
+        if isinstance(value, (list, tuple)):
+            return tuple(cls._freeze_value(val) for val in value)
+        if isinstance(value, np.ndarray):
+            return (value.shape, tuple(value.ravel().tolist()))
+        return value
+
+    def _get_build_signature(self, component: 'QComponent') -> tuple:
+        """Everything a build of the component depends on: its options, the
+        design variables they reference and the pins of the components it
+        depends on. Together, the first two determine the parsed options.
+
+        Args:
+            component (QComponent): The component.
+
+        Returns:
+            tuple: The signature.
+        """
+        variables = tuple(
+            (name, self._freeze_value(self._variables[name]))
+            for name in sorted(self.get_variable_references(component.options)))
+        upstream_pins = []
+        for parent_id in sorted(self._get_parent_ids(component.id)):
+            for pin_name, pin in self._components[parent_id].pins.items():
+                upstream_pins.append(
+                    (parent_id, pin_name,
+                     tuple(np.asarray(pin.points, dtype=float).ravel()),
+                     pin.width, pin.gap, pin.chip))
+        return (self._freeze_value(component.options), variables,
+                tuple(upstream_pins))
+
+    def _record_build_signature(self, component: 'QComponent'):
+        """Remember the signature of a successful build of the component.
+
+        Args:
+            component (QComponent): The component that was just made.
+        """
+        self._build_signatures[component.id] = self._get_build_signature(
+            component)
+
+    def _is_component_clean(self, component: 'QComponent') -> bool:
+        """Is the component up to date with its options and with the pins
+        of the components it depends on?
+
+        Args:
+            component (QComponent): The component.
+
+        Returns:
+            bool: True if a rebuild would not change the component.
+        """
+        if component.status != 'good' or \
+                component.id not in self._build_signatures:
+            return False
+        return self._build_signatures[component.id] == \
+            self._get_build_signature(component)
+
+    def _rebuild_components(
+        self, component_ids: Iterable[int], force: Iterable[int] = ()) -> list:
+        """Remake the dirty components, in the given order.
+
+        Remaking a component drops the connections to its pins. Connections to
+        components which are not remade are restored afterwards.
+
+        Args:
+            component_ids (Iterable[int]): Ids of the components, sorted in
+                dependency order.
+            force (Iterable[int]): Ids of the components to remake even if they
+                are clean.  Defaults to ().
+
+        Returns:
+            list: Names of the remade components.
+        """
+        force = set(force)
+        rebuilt = []
+        connections = []
+        for component_id in component_ids:
+            component = self._components[component_id]
+            if component_id not in force and self._is_component_clean(
+                    component):
+                continue
+            connections += self._qnet.get_connections_for_component(
+                component_id)
+            component.rebuild()
+            rebuilt.append(component_id)
+
+        rebuilt_ids = set(rebuilt)
+        for comp1_id, pin1_name, comp2_id, pin2_name in connections:
+            if comp2_id in rebuilt_ids or comp2_id not in self._components:
+                # The other side connects itself when it is remade.
+                continue
+            if pin1_name in self._components[comp1_id].pins and \
+                    pin2_name in self._components[comp2_id].pins and \
+                    not self._components[comp1_id].pins[pin1_name].net_id:
+                self.connect_pins(comp1_id, pin1_name, comp2_id, pin2_name)
+
+        return [self._components[cid].name for cid in rebuilt]
+
+    def update_component(self,
+                         component_name: str,
+                         dependencies: bool = True) -> list:
         """Update the component and any dependencies it may have. Mediator type
         function to update all children.
 
+        The component is remade, then the components which depend on it are
+        remade in dependency order, skipping those whose parsed options and
+        upstream pins are unchanged.
+
         Args:
             component_name (str): Component name to update
             dependencies (bool): True to update all dependencies.  Defaults to True.
+
+        Returns:
+            list: Names of the remade components.
+        """
+        component_id = self._get_component_id(component_name)
+        if component_id is None:
+            self.logger.warning(
+                f'Called update_component {component_name}, but such a '
+                f'component is not in the design.')
+            return []
+
+        if not dependencies:
+            return self._rebuild_components([component_id],
+                                            force=[component_id])
+
+        return self._rebuild_components(self._topological_order(
+            self._get_descendant_ids([component_id])),
+                                        force=[component_id])
+
+    def update_variable(self, variable_name: str) -> list:
+        """Remake the components whose options reference a design variable,
+        and the components which depend on them.
+
+        Args:
+            variable_name (str): Name of the design variable.
+
+        Returns:
+            list: Names of the remade components.
         """
-        # Get dependency graph
-        # Remake components in order
+        users = [
+            component_id
+            for component_id, component in self._components.items()
+            if variable_name in self.get_variable_references(component.options)
+        ]
+        return self._rebuild_components(
+            self._topological_order(self._get_descendant_ids(users)))
 
 
 ######### Renderers ###############################################################
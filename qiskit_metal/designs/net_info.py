@@ -13,23 +13,70 @@
 # that they have been altered from the originals.
 """Module containing Net information storage."""
 #from typing import Tuple
+from typing import Iterable
+
 import pandas as pd
 from qiskit_metal import logger
 
 
 class QNet():
-    """Use DataFrame to hold Net Information about the connected pins of a
-    design.
+    """Hold Net Information about the connected pins of a design.
 
     There is one unique net_id for each connected pin.
+
+    The connections are indexed by pin and by net, so looking up, adding or
+    deleting a connection does not depend on the size of the design. The
+    DataFrame of `net_info` is built from the index when it is read.
+
+    As before the index, the table given by `_net_info` may be edited in
+    place, until the next connection is added or deleted. The index is
+    then built again from the edited table.
     """
 
     def __init__(self):
         """Hold the net information of all the USED pins within a design."""
         self.column_names = ['net_id', 'component_id', 'pin_name']
-        self._net_info = pd.DataFrame(columns=self.column_names)
         self._qnet_latest_assigned_id = 0
         self.logger = logger  # type: logging.Logger
+        self._clear()
+
+    def _clear(self):
+        """Remove all the nets from the index."""
+        # key=row number, value=(net_id, component_id, pin_name), in the
+        # order the rows were added.
+        self._rows = dict()
+        self._next_row = 0
+        # Rows deleted since the last add; the table is numbered again on
+        # each add, as with pd.concat(ignore_index=True).
+        self._deleted_rows = []
+
+        # key=(component_id, pin_name), value=row number
+        self._pin_rows = dict()
+        # key=net_id, value=list of row numbers
+        self._net_rows = dict()
+        # key=component_id, value=dict of pin_name: net_id
+        self._component_nets = dict()
+
+        self._net_info_cache = None
+        # True when _net_info_cache was handed out by _net_info, and may
+        # have been edited in place.
+        self._net_info_exposed = False
+
+    def __getstate__(self):
+        self._sync_index()
+        state = self.__dict__.copy()
+        state['_net_info_cache'] = None
+        state['_net_info_exposed'] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if '_rows' not in state:
+            # Saved before the index, with the table as a DataFrame
+            net_info = state['_net_info']
+            self._clear()
+            self._net_info = net_info
+        self._net_info_exposed = False
 
     def _get_new_net_id(self) -> int:
         """Provide unique new qnet_id.
@@ -58,6 +105,86 @@ class QNet():
         """
         return self._net_info
 
+    @property
+    def _net_info(self) -> pd.DataFrame:
+        """Table of all the nets, built from the index when first read after
+        a change.
+
+        The table may be edited in place, or replaced by assigning a new
+        table. The index follows the edits on its next use.
+        """
+        table = self._get_table()
+        self._net_info_exposed = True
+        return table
+
+    @_net_info.setter
+    def _net_info(self, table: pd.DataFrame):
+        self._build_index(table)
+        self._net_info_cache = table
+        self._net_info_exposed = True
+
+    def _get_table(self) -> pd.DataFrame:
+        """Table of all the nets, without handing it out for edits. Used to
+        make copies of the table."""
+        self._sync_index()
+        if self._net_info_cache is None:
+            self._net_info_cache = self._make_table(self._rows.keys())
+        return self._net_info_cache
+
+    def _build_index(self, table: pd.DataFrame):
+        """Replace the index by the rows of a table."""
+        self._clear()
+        for (net_identity, component_id,
+             pin_name) in table[self.column_names].itertuples(index=False):
+            self._add_row(net_identity, component_id, pin_name)
+
+    def _sync_index(self):
+        """Build the index again if the table handed out by _net_info was
+        edited in place since."""
+        table = self._net_info_cache
+        if not self._net_info_exposed or table is None:
+            return
+        rows = list(table[self.column_names].itertuples(index=False, name=None))
+        if rows != list(self._rows.values()):
+            self._build_index(table)
+            # The edited table stays the table of the nets
+            self._net_info_cache = table
+            self._net_info_exposed = True
+
+    def _make_table(self, rows: Iterable[int]) -> pd.DataFrame:
+        """Build the table of some rows.
+
+        Args:
+            rows (Iterable[int]): Row numbers, in the order they were added.
+
+        Returns:
+            pd.DataFrame: Table of the rows, with the index they would have
+            in a table kept up to date with pd.concat and drop.
+        """
+        rows = list(rows)
+        if self._deleted_rows:
+            all_rows = sorted(list(self._rows.keys()) + self._deleted_rows)
+            position = {row: index for index, row in enumerate(all_rows)}
+        else:
+            position = {row: index for index, row in enumerate(self._rows)}
+        return pd.DataFrame([self._rows[row] for row in rows],
+                            index=[position[row] for row in rows],
+                            columns=self.column_names,
+                            dtype=object)
+
+    def _add_row(self, net_identity: int, component_id: int, pin_name: str):
+        """Add a pin to a net in the index."""
+        row = self._next_row
+        self._next_row += 1
+        self._rows[row] = (net_identity, component_id, pin_name)
+        self._pin_rows[(component_id, pin_name)] = row
+        self._net_rows.setdefault(net_identity, []).append(row)
+        self._component_nets.setdefault(component_id,
+                                        dict())[pin_name] = net_identity
+        self._deleted_rows = []
+        self._net_info_cache = None
+        self._net_info_exposed = False
+
     def _check_arguments(self, comp1_id: int, pin1_name: str, comp2_id: int,
                          pin2_name: str) -> int:
         """Error check the arguments before using them.
@@ -113,35 +240,51 @@ class QNet():
             return 0
 
         # Confirm the component-pin combination is NOT in _net_info, before adding them.
-        for (net_identity, component_id,
-             pin_name) in self._net_info.itertuples(index=False):
-            if ((component_id == comp1_id) and (pin_name == pin1_name)):
-                self.logger.warning(
-                    f'Component: {comp1_id} and pin: {pin1_name} are '
-                    f'already in net_info with net_id {net_identity}')
-                return 0
-            if ((component_id == comp2_id) and (pin_name == pin2_name)):
+        pins = [(comp1_id, pin1_name), (comp2_id, pin2_name)]
+        for component_id, pin_name in pins:
+            net_identity = self.get_net_id(component_id, pin_name)
+            if net_identity:
                 self.logger.warning(
-                    f'Component: {comp2_id} and pin: {pin2_name} are '
+                    f'Component: {component_id} and pin: {pin_name} are '
                     f'already in net_info with net_id {net_identity}')
                 return 0
 
         net_id = self._get_new_net_id()
 
-        entry1 = [net_id, comp1_id, pin1_name]
-        entry2 = [net_id, comp2_id, pin2_name]
-        temp_df = pd.DataFrame([entry1, entry2], columns=self.column_names)
-
-        self._net_info = pd.concat([self._net_info, temp_df],
-                                   axis=0,
-                                   join='outer',
-                                   ignore_index=True,
-                                   sort=False,
-                                   verify_integrity=False,
-                                   copy=False)
+        self._add_row(net_id, comp1_id, pin1_name)
+        self._add_row(net_id, comp2_id, pin2_name)
 
         return net_id
 
+    def get_net_id(self, component_id: int, pin_name: str) -> int:
+        """Get the net of a pin.
+
+        Args:
+            component_id (int): Component ID of the pin.
+            pin_name (str): Name of the pin.
+
+        Returns:
+            int: The net_id, or 0 if the pin is not connected.
+        """
+        self._sync_index()
+        row = self._pin_rows.get((component_id, pin_name))
+        if row is None:
+            return 0
+        return self._rows[row][0]
+
+    def get_pins_for_net_id(self, net_id: int) -> list:
+        """Get the pins of a net.
+
+        Args:
+            net_id (int): Unique net id.
+
+        Returns:
+            list: Tuples of (component_id, pin_name), in the order they
+            were added.
+        """
+        self._sync_index()
+        return [self._rows[row][1:] for row in self._net_rows.get(net_id, [])]
+
     def delete_net_id(self, net_id_to_remove: int):
         """Removes the two entries with net_id_to_remove. If id is in
         _net_info, the entry will be removed.
@@ -149,10 +292,24 @@ class QNet():
         Args:
             net_id_to_remove (int): The id to remove.
         """
-
-        self._net_info.drop(
-            self._net_info.index[self._net_info['net_id'] == net_id_to_remove],
-            inplace=True)
+        self._sync_index()
+        for row in self._net_rows.pop(net_id_to_remove, []):
+            _, component_id, pin_name = self._rows.pop(row)
+            self._deleted_rows.append(row)
+            self._pin_rows.pop((component_id, pin_name), None)
+            component_nets = self._component_nets.get(component_id, dict())
+            component_nets.pop(pin_name, None)
+            if not component_nets:
+                self._component_nets.pop(component_id, None)
+            self._net_info_cache = None
+            self._net_info_exposed = False
+
+    def delete_all_nets(self):
+        """Remove all the nets.
+
+        The net ids already used are not given again.
+        """
+        self._clear()
 
     def delete_all_pins_for_component(self, component_id_to_remove: int) -> set:
         """Delete all the pins for a given component id.
@@ -163,16 +320,34 @@ class QNet():
         Returns:
             set: All deleted ids
         """
-        all_net_id_deleted = set()
-
-        for (net_identity, component_id,
-             dummy_pin_name) in self._net_info.itertuples(index=False):
-            if component_id == component_id_to_remove:
-                all_net_id_deleted.add(net_identity)
-                self.delete_net_id(net_identity)
+        self._sync_index()
+        all_net_id_deleted = set(
+            self._component_nets.get(component_id_to_remove, dict()).values())
+        for net_identity in all_net_id_deleted:
+            self.delete_net_id(net_identity)
 
         return all_net_id_deleted
 
+    def get_connections_for_component(self, component_id: int) -> list:
+        """Get the connections of all the pins of a given component id.
+
+        Args:
+            component_id (int): Component ID to search
+
+        Returns:
+            list: Tuples of (component_id, pin_name, other_component_id,
+            other_pin_name), one per connected pin.
+        """
+        self._sync_index()
+        connections = []
+        for pin_name, net_identity in self._component_nets.get(
+                component_id, dict()).items():
+            for other_id, other_pin in self.get_pins_for_net_id(net_identity):
+                if other_id != component_id:
+                    connections.append(
+                        (component_id, pin_name, int(other_id), other_pin))
+        return connections
+
     def get_components_and_pins_for_netid(self,
                                           net_id_search: int) -> pd.DataFrame:
         """Search with a net_id to get component id and pin name.
@@ -183,6 +358,5 @@ class QNet():
         Returns:
             pandas.DataFrame: Two rows of the net_info which have the same net_id_search.
         """
-        df_subset_based_on_net_id = self._net_info[(
-            self._net_info['net_id'] == net_id_search)]
-        return df_subset_based_on_net_id
+        self._sync_index()
+        return self._make_table(self._net_rows.get(net_id_search, []))
@@ -27,6 +27,10 @@ QGeometryTables
     :toctree: ../stubs/
 
     QGeometryTables
+    QGeometrySpatialIndex
+    get_galvanic_net_ids
 
 """
 from .qgeometries_handler import is_qgeometry_table, QGeometryTables  # , QGeometry Types
+from .spatial_index import QGeometrySpatialIndex
+from .galvanic_nets import get_galvanic_net_ids
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2017, 2021.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+"""Find the galvanically connected regions of the metal in the qgeometry
+tables.
+
+Used by the renderers which need to know the nets before they mesh or
+simulate the design, such as the Elmer renderer.
+"""
+
+from typing import Dict as Dict_
+from typing import Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+from shapely.strtree import STRtree
+
+__all__ = ['get_galvanic_net_ids']
+
+
+def _get_layers_touch(
+        layers: np.ndarray,
+        layer_thickness_z: Dict_[int, Tuple[float,
+                                            float]] = None) -> np.ndarray:
+    """Find which of the layers touch each other in z.
+
+    Args:
+        layers (np.ndarray): Unique layer numbers.
+        layer_thickness_z (Dict_[int, Tuple[float, float]], optional):
+            key=layer, value=(thickness, z_coord) of the layer.
+            If None, a layer only touches itself.  Defaults to None.
+
+    Returns:
+        np.ndarray: Square array of bool, True where layers[i] touches
+        layers[j].
+    """
+    touch = np.eye(len(layers), dtype=bool)
+    if layer_thickness_z is None:
+        return touch
+    thickness, z_coord = np.array(
+        [layer_thickness_z[layer] for layer in layers],
+        dtype=float).reshape(-1, 2).T
+    top = z_coord + thickness
+    touch |= z_coord[:, None] == z_coord[None, :]
+    touch |= top[:, None] == z_coord[None, :]
+    touch |= z_coord[:, None] == top[None, :]
+    return touch
+
+
+def get_galvanic_net_ids(table: pd.DataFrame,
+                         layer_thickness_z: Dict_[int, Tuple[float,
+                                                             float]] = None,
+                         groups: Iterable = None) -> np.ndarray:
+    """Give the same net id to the rows of a qgeometry table which are
+    galvanically connected.
+
+    Two rows are connected when they are on the same chip, their geometry
+    intersects or touches, and their layers are the same or touch in z.
+    The pairs of rows are found with an STRtree for each chip, and merged
+    into nets with a union-find.
+
+    Args:
+        table (pd.DataFrame): Rows with the columns 'geometry', 'layer' and
+            'chip', such as the metal of the "path" and "poly" tables.
+        layer_thickness_z (Dict_[int, Tuple[float, float]], optional):
+            key=layer, value=(thickness, z_coord) of the layer, as given by
+            the layer stack. Needed for each layer of the table.  If None,
+            rows on different layers are never connected.  Defaults to None.
+        groups (Iterable, optional): One key for each row.  Rows with the same
+            key, such as the same physical group name, are always in the same
+            net.  Defaults to None.
+
+    Returns:
+        np.ndarray: The net id of each row.  The nets are numbered from 0 in
+        the order of their first row.
+    """
+    # pylint: disable=too-many-locals
+    num_rows = len(table)
+    if num_rows == 0:
+        return np.empty(0, dtype=int)
+
+    geometry = np.asarray(table['geometry'], dtype=object)
+    chips = np.asarray(table['chip'], dtype=object)
+    layers, layer_idx = np.unique(np.asarray(table['layer']),
+                                  return_inverse=True)
+    layers_touch = _get_layers_touch(layers, layer_thickness_z)
+
+    pairs = []
+    for chip in pd.unique(chips):
+        rows = np.flatnonzero(chips == chip)
+        tree = STRtree(geometry[rows])
+        left, right = tree.query(geometry[rows], predicate='intersects')
+        left, right = rows[left], rows[right]
+        keep = (left < right) & layers_touch[layer_idx[left], layer_idx[right]]
+        pairs.append(np.column_stack((left[keep], right[keep])))
+    if groups is not None:
+        first_row = dict()
+        for row, key in enumerate(groups):
+            first = first_row.setdefault(key, row)
+            if first != row:
+                pairs.append(np.array([[first, row]]))
+
+    # Union-find, where the root of each net is its first row
+    parent = list(range(num_rows))
+
+    def find(row: int) -> int:
+        while parent[row] != row:
+            parent[row] = parent[parent[row]]
+            row = parent[row]
+        return row
+
+    for row_i, row_j in np.concatenate(pairs).tolist():
+        root_i, root_j = find(row_i), find(row_j)
+        if root_i < root_j:
+            parent[root_j] = root_i
+        elif root_j < root_i:
+            parent[root_i] = root_j
+
+    roots = [find(row) for row in range(num_rows)]
+    return np.unique(roots, return_inverse=True)[1]
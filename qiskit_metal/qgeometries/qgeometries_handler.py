@@ -18,6 +18,7 @@ See the docstring of `QGeometryTables`
 
 import inspect
 import logging
+import numpy as np
 import pandas as pd
 import shapely
 
@@ -32,6 +33,8 @@ from qiskit_metal.draw.utility import round_coordinate_sequence
 
 from shapely.geometry.multipolygon import MultiPolygon  #to avoid MultiPolygons
 from .. import config
+from .spatial_index import QGeometrySpatialIndex
+from .galvanic_nets import get_galvanic_net_ids
 if not config.is_building_docs():
     from qiskit_metal.toolbox_python.utility_functions import get_range_of_vertex_to_not_fillet, data_frame_empty_typed
 
@@ -254,6 +257,24 @@ class QGeometryTables(object):
 
         self._tables = Dict()
 
+        # Rows added by add_qgeometry that have not been written to self._tables yet.
+        # key=table_name, value=dict with key=component_id and value=list of
+        # columnar chunks (dict of column name to list of values).
+        # The chunks are concatenated onto the tables the first time the tables are read.
+        self._pending_rows = dict()
+
+        # Index of the rows of each component in self._tables.
+        # key=table_name, value=dict with key=component_id and value=numpy array of
+        # row positions. Rebuilt whenever the rows of a table move, see flush_pending_rows().
+        self._component_rows = dict()
+
+        # Row positions of deleted components, dropped from self._tables in one batch
+        # the next time the tables are read. key=table_name, value=list of numpy arrays.
+        self._deleted_rows = dict()
+
+        # Bounding boxes and outlines of the components, for routing.
+        self._spatial_index = QGeometrySpatialIndex(self)
+
         # Need to call after columns are added by add_renderer_extension is run by all the renderers.
         # self.create_tables()
 
@@ -271,12 +292,99 @@ class QGeometryTables(object):
     def tables(self) -> Dict_[str, GeoDataFrame]:
         """The dictionary of tables containing qgeometry.
 
+        Any rows buffered by `add_qgeometry` are written to the
+        tables before they are returned.
+
         Returns:
             Dict_[str, GeoDataFrame]: The keys of this dictionary are
             also obtained from `self.get_element_types()`
         """
+        if self._pending_rows or self._deleted_rows:
+            self.flush_pending_rows()
         return self._tables
 
+    @property
+    def spatial_index(self) -> QGeometrySpatialIndex:
+        """Spatial index of the component bounding boxes and outlines.
+
+        Kept up to date by `add_qgeometry` and `delete_component_id`.
+        """
+        return self._spatial_index
+
+    def flush_pending_rows(self):
+        """Write the rows buffered by `add_qgeometry` to the tables, and
+        drop the rows of the components deleted since the last flush.
+
+        All the buffered rows of a table are turned into a single GeoDataFrame,
+        which is then concatenated once onto the table. This keeps the cost of
+        building a design linear in the number of rows.
+        """
+        for table_name in set(self._pending_rows) | set(self._deleted_rows):
+            table = self._tables[table_name]
+
+            deleted_rows = self._deleted_rows.get(table_name)
+            if deleted_rows:
+                keep = np.ones(len(table), dtype=bool)
+                keep[np.concatenate(deleted_rows)] = False
+                table = table[keep]
+
+            table = self._concat_pending_rows(
+                table, self._pending_rows.get(table_name, dict()))
+
+            self._tables[table_name] = table
+            self._component_rows[table_name] = table.groupby('component',
+                                                             sort=False).indices
+
+        self._pending_rows.clear()
+        self._deleted_rows.clear()
+
+    @staticmethod
+    def _concat_pending_rows(table: GeoDataFrame,
+                             rows_by_component: dict) -> GeoDataFrame:
+        """Concatenate the buffered rows of one table onto the table.
+
+        Args:
+            table (GeoDataFrame): Table to add the rows to.
+            rows_by_component (dict): Buffered chunks of the table, by component.
+
+        Returns:
+            GeoDataFrame: The table with the rows added.
+        """
+        chunks = [
+            chunk for component_chunks in rows_by_component.values()
+            for chunk in component_chunks
+        ]
+        if not chunks:
+            return table
+
+        # Columns in order of first appearance, same as an outer join.
+        columns = dict()
+        for chunk in chunks:
+            columns.update(dict.fromkeys(chunk))
+
+        data = dict()
+        for column in columns:
+            values = []
+            for chunk in chunks:
+                if column in chunk:
+                    values.extend(chunk[column])
+                else:
+                    values.extend([np.nan] * len(chunk['name']))
+            if column in table.columns and table[column].dtype == object:
+                # Do not let pandas infer a narrower type than the table has.
+                values = pd.Series(values, dtype=object)
+            data[column] = values
+
+        df = GeoDataFrame(data, columns=list(columns))
+
+        return pd.concat([table, df],
+                         axis=0,
+                         join='outer',
+                         ignore_index=True,
+                         sort=False,
+                         verify_integrity=False,
+                         copy=False)
+
     @classmethod
     def add_renderer_extension(cls, renderer_name: str, qgeometry: dict):
         """Add renderer element extension to ELEMENT_COLUMNS. Called when the
@@ -333,6 +441,9 @@ class QGeometryTables(object):
         """
         self.logger.debug('Creating Element Tables.')
 
+        self._pending_rows.clear()
+        self._deleted_rows.clear()
+
         for table_name in self.get_element_types():
             # Create GeoDataFrame with correct columns and d types
             assert isinstance(table_name, str)
@@ -375,7 +486,8 @@ class QGeometryTables(object):
             table.name = table_name
 
             # Assign
-            self.tables[table_name] = table
+            self._tables[table_name] = table
+            self._component_rows[table_name] = dict()
 
     def _validate_column_dictionary(self, table_name: str, column_dict: dict):
         """Validate A possible error here is if the user did not pass a valid
@@ -477,6 +589,7 @@ class QGeometryTables(object):
                 f' The call was with subtract={subtract} and helper={helper}'
                 f' and impedance={impedance}'
                 f' and layer={layer}, and options={other_options}')
+            return
 
         #Checks if (any) of the geometry are MultiPolygons, and breaks them up into
         #individual polygons. Rounds the coordinate sequences of those values to avoid
@@ -516,27 +629,17 @@ class QGeometryTables(object):
         #        options[keyC] = ???[keyC] -> alternative manner to pass options to the add_qgeometry function?
         #                                       instead have the add_qeometry in baseComponent generate the dict?
 
-        #Could we just append rather than make a new table each time? This seems slow
-        table = self.tables[kind]
+        # Buffer the rows as columns. They are written to the table, in one concat,
+        # the first time the tables are read. See flush_pending_rows().
+        names = list(geometry.keys())
+        num_rows = len(names)
+        chunk = dict(name=names, geometry=list(geometry.values()))
+        for key, value in options.items():
+            chunk[key] = [value] * num_rows
 
-        # assert that all names in options are in table columns! TODO: New approach will not be wanting
-        #to do this (maybe check that all columns are in options?)
-        df = GeoDataFrame.from_dict(geometry,
-                                    orient='index',
-                                    columns=['geometry'])
-        df.index.name = 'name'
-        df = df.reset_index()
-
-        df = df.assign(**options)
-
-        # Set new table. Unfortunately, this creates a new instance. Can just direct append
-        self.tables[kind] = pd.concat([table, df],
-                                      axis=0,
-                                      join='outer',
-                                      ignore_index=True,
-                                      sort=False,
-                                      verify_integrity=False,
-                                      copy=False)
+        rows_by_component = self._pending_rows.setdefault(kind, dict())
+        rows_by_component.setdefault(component_name, []).append(chunk)
+        self._spatial_index.invalidate(component_name)
 
     def check_lengths(self, geometry: shapely.geometry.base.BaseGeometry,
                       kind: str, component_name: str, **other_options):
@@ -584,8 +687,9 @@ class QGeometryTables(object):
 
         Use when clearing a design and starting from scratch.
         """
-        self.tables.clear()
+        self._tables.clear()
         self.create_tables()  # remake all tables
+        self._spatial_index.invalidate()
 
     def delete_component(self, name: str):
         """Delete component by name.
@@ -597,21 +701,58 @@ class QGeometryTables(object):
         # TODO: is this the best way to do this, or is there a faster way?
         a_comp = self.design.components[name]
         if a_comp is not None:
-            for table_name in self.tables:
-                df = self.tables[table_name]
-                self.tables[table_name] = df[df['component'] != a_comp.id]
+            self.delete_component_id(a_comp.id)
 
     def delete_component_id(self, component_id: int):
         """Drop the components within the qgeometry.tables.
 
+        The rows are looked up in the component index and dropped in one batch
+        the next time the tables are read, so the cost does not depend on the
+        size of the design.
+
         Args:
             component_id (int): Unique number to describe the component.
         """
-        for table_name in self.tables:
-            df_table_name = self.tables[table_name]
-            # self.tables[table_name] = df_table_name.drop(df_table_name[df_table_name['component'] == component_id].index)
-            self.tables[table_name] = df_table_name[df_table_name['component']
-                                                    != component_id]
+        # Drop the buffered rows without writing them to the tables.
+        for rows_by_component in self._pending_rows.values():
+            rows_by_component.pop(component_id, None)
+
+        for table_name, component_rows in self._component_rows.items():
+            rows = component_rows.pop(component_id, None)
+            if rows is not None and len(rows) > 0:
+                self._deleted_rows.setdefault(table_name, []).append(rows)
+        self._spatial_index.invalidate(component_id)
+
+    def _get_component_rows(self, table_name: str, component_id: int,
+                            columns: List[str]) -> Dict_[str, list]:
+        """Get columns of the rows of a component, from the component index
+        and the rows still buffered, without writing the buffered rows to the
+        tables.
+
+        Args:
+            table_name (str): Element table name ('poly', 'path', etc.).
+            component_id (int): Unique number to describe the component.
+            columns (List[str]): Names of the columns to return.
+
+        Returns:
+            Dict_[str, list]: Key is the column name, value is the list of values
+            for the rows of the component, in table order.
+        """
+        values = {column: [] for column in columns}
+
+        rows = self._component_rows.get(table_name, dict()).get(component_id)
+        if rows is not None and len(rows) > 0:
+            table = self._tables[table_name]
+            for column in columns:
+                values[column] = table[column].take(rows).to_list()
+
+        pending_chunks = self._pending_rows.get(table_name,
+                                                dict()).get(component_id, [])
+        for chunk in pending_chunks:
+            for column in columns:
+                values[column].extend(chunk[column])
+
+        return values
 
     def get_component(
         self,
@@ -644,7 +785,8 @@ class QGeometryTables(object):
                 # Component not found.
                 return None
             else:
-                return df[df.component == a_comp.id]
+                rows = self._component_rows[table_name].get(a_comp.id, [])
+                return df.take(rows)
 
             # comp_id = self.design.components[name].id
             # return df[df.component == comp_id]
@@ -680,10 +822,17 @@ class QGeometryTables(object):
         if a_comp is None:
             return None
         else:
-            # TODO: is this the best way to do this, or is there a faster way?
-            for table_name in self.tables:
-                table = self.tables[table_name]
-                table.component[table.component == a_comp.id] = new_name
+            tables = self.tables
+            for table_name, component_rows in self._component_rows.items():
+                rows = component_rows.pop(a_comp.id, None)
+                if rows is None or len(rows) == 0:
+                    continue
+                table = tables[table_name]
+                table.iloc[rows, table.columns.get_loc('component')] = new_name
+                if new_name in component_rows:
+                    rows = np.sort(
+                        np.concatenate([component_rows[new_name], rows]))
+                component_rows[new_name] = rows
 
     def get_component_geometry_list(self,
                                     name: str,
@@ -706,9 +855,9 @@ class QGeometryTables(object):
                 qgeometry += self.get_component_geometry_list(name, table)
 
         else:
-            table = self.tables[table_name]
             comp_id = self.design.components[name].id
-            qgeometry = table.geometry[table.component == comp_id].to_list()
+            qgeometry = self._get_component_rows(table_name, comp_id,
+                                                 ['geometry'])['geometry']
 
         return qgeometry
 
@@ -722,17 +871,15 @@ class QGeometryTables(object):
             GeoSeries : Geometry of the component
         """
         comp_id = self.design.components[name].id
-        qgeometry = {}
+        geometry = []
+        keys = []
         for table_name in self.get_element_types():
-            table = self.tables[table_name]
-            qgeometry[table_name] = table.geometry[table.component == comp_id]
-        qgeometry = pd.concat(qgeometry)
-
-        # when concatenating empty GeoSeries, returns Series (ugly fix)
-        if not isinstance(qgeometry, GeoSeries):
-            qgeometry = GeoSeries(qgeometry)
+            table_geometry = self._get_component_rows(table_name, comp_id,
+                                                      ['geometry'])['geometry']
+            geometry += table_geometry
+            keys += [table_name] * len(table_geometry)
 
-        return qgeometry
+        return GeoSeries(geometry, index=keys, dtype='geometry')
 
     def get_component_geometry_dict(self,
                                     name: str,
@@ -756,15 +903,11 @@ class QGeometryTables(object):
             return qgeometry  # return pd.concat(qgeometry, axis=0)
 
         else:
-            table = self.tables[table_name]
-
-            # mask the rows nad get only 2 columns
+            # get only 2 columns of the rows of the component
             comp_id = self.design.components[name].id
-            df_comp_id = table.loc[table.component == comp_id,
-                                   ['name', 'geometry']]
-            df_geometry = df_comp_id.geometry
-            df_geometry.index = df_comp_id.name
-            return df_geometry.to_dict()
+            rows = self._get_component_rows(table_name, comp_id,
+                                            ['name', 'geometry'])
+            return dict(zip(rows['name'], rows['geometry']))
 
     def check_element_type(self,
                            table_name: str,
@@ -840,3 +983,43 @@ class QGeometryTables(object):
         unique_layers = list(set(unique_layers))
 
         return unique_layers
+
+    def get_galvanic_nets(
+        self,
+        qcomp_ids: Union[list, None] = None,
+        layers: Union[list, None] = None,
+        layer_thickness_z: Union[Dict_[int, Tuple[float, float]], None] = None
+    ) -> GeoDataFrame:
+        """Find the galvanically connected metal of the "path" and "poly"
+        tables, without meshing the design.
+
+        Args:
+            qcomp_ids (Union[list, None], optional): The list has integers
+                which denote component_id.  Defaults to None, for all the
+                components.
+            layers (Union[list, None], optional): Layers to include, such as
+                the metal layers of the layer stack.  Defaults to None, for
+                all the layers.
+            layer_thickness_z (Union[Dict_[int, Tuple[float, float]], None],
+                optional): key=layer, value=(thickness, z_coord) of the
+                layer.  Layers which touch in z are connected.  Defaults to
+                None, to only connect the qgeometry on the same layer.
+
+        Returns:
+            GeoDataFrame: The rows of the "path" and "poly" tables which are
+            not subtracted, with a 'net' column.  The nets are numbered from
+            0 in the order of the rows.
+        """
+        frames = list()
+        for table_name in ['path', 'poly']:
+            table = self.tables[table_name]
+            mask = ~table['subtract'].astype(bool)
+            if qcomp_ids is not None:
+                mask &= table['component'].isin(qcomp_ids)
+            if layers is not None:
+                mask &= table['layer'].isin(layers)
+            frames.append(table[mask])
+        metal = pd.concat(frames, ignore_index=True)
+        metal['net'] = get_galvanic_net_ids(metal, layer_thickness_z)
+
+        return metal
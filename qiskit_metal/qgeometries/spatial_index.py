@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2017, 2021.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+"""Spatial index over the qgeometry of the components of a design.
+
+Used by the routers to find the components near a segment, without looping
+over every component of the design.
+"""
+
+from typing import TYPE_CHECKING
+from typing import Dict as Dict_
+from typing import List, Tuple
+
+import numpy as np
+import shapely
+from shapely.strtree import STRtree
+
+if TYPE_CHECKING:
+    from .qgeometries_handler import QGeometryTables
+
+__all__ = ['QGeometrySpatialIndex']
+
+
+class QGeometrySpatialIndex():
+    """An STRtree of the bounding boxes of the components, with their outlines
+    cached.
+
+    Owned by `QGeometryTables`, which invalidates a component whenever its
+    qgeometry is added or deleted, such as on a rebuild. The bounds of the
+    invalidated components are refreshed on the next query, and checked one
+    by one until there are enough of them to build the tree again. Thus a
+    component can be added between queries, such as by a batch of routes,
+    without building the whole tree each time.
+    Direct edits of the tables are not tracked; call `invalidate()`.
+    """
+
+    # Build the tree again when more than this number, or than a tenth of
+    # the components, are checked one by one.
+    MAX_STALE = 64
+
+    def __init__(self, qgeometry: 'QGeometryTables'):
+        """
+        Args:
+            qgeometry (QGeometryTables): Tables of the design to index.
+        """
+        self._qgeometry = qgeometry
+
+        # key=component_id, value=(minx, miny, maxx, maxy).
+        # Components without qgeometry are not indexed.
+        self._bounds = dict()  # type: Dict_[int, Tuple[float, ...]]
+
+        # key=component_id, value=list of outline rings, as lists of (x, y)
+        self._outlines = dict()  # type: Dict_[int, List[list]]
+
+        # Components whose bounds need to be refreshed
+        self._dirty = set()
+        self._all_dirty = True
+
+        # Components whose box in the tree is out of date
+        self._stale = set()
+
+        self._tree = None  # type: STRtree
+        self._tree_ids = np.empty(0, dtype=int)
+
+    def __getstate__(self):
+        # The tree is built again on the next query
+        state = self.__dict__.copy()
+        state['_tree'] = None
+        return state
+
+    def invalidate(self, component_id: int = None):
+        """Forget the cached bounds and outline of a component.
+
+        Args:
+            component_id (int): Unique number to describe the component.
+                None to invalidate all the components.  Defaults to None.
+        """
+        if component_id is None:
+            self._all_dirty = True
+            self._dirty.clear()
+            self._outlines.clear()
+        else:
+            self._dirty.add(component_id)
+            self._outlines.pop(component_id, None)
+
+    def _get_geometry(self, table_name: str, component_id: int,
+                      columns: List[str]) -> Dict_[str, list]:
+        # pylint: disable=protected-access
+        return self._qgeometry._get_component_rows(table_name, component_id,
+                                                   columns)
+
+    def _build_tree(self):
+        self._tree_ids = np.fromiter(self._bounds.keys(),
+                                     dtype=int,
+                                     count=len(self._bounds))
+        boxes = np.array(list(self._bounds.values()), dtype=float)
+        self._tree = STRtree(
+            shapely.box(*boxes.T) if len(boxes) else np.empty(0, dtype=object))
+        self._stale = set()
+
+    def update(self):
+        """Refresh the bounds of the invalidated components now, rather than
+        on the next query."""
+        if self._all_dirty:
+            self._bounds.clear()
+            component_ids = list(self._qgeometry.design._components.keys())  # pylint: disable=protected-access
+            self._all_dirty = False
+            self._tree = None
+        else:
+            component_ids = self._dirty
+        for component_id in component_ids:
+            geometry = []
+            for table_name in self._qgeometry.get_element_types():
+                geometry += self._get_geometry(table_name, component_id,
+                                               ['geometry'])['geometry']
+            if geometry:
+                self._bounds[component_id] = tuple(
+                    shapely.total_bounds(geometry))
+            else:
+                self._bounds.pop(component_id, None)
+        self._stale |= self._dirty
+        self._dirty = set()
+
+        if self._tree is None or len(self._stale) > max(
+                self.MAX_STALE,
+                len(self._bounds) // 10):
+            self._build_tree()
+
+    def query(self, bounds: Tuple[float, float, float, float]) -> List[int]:
+        """Find the components whose bounding box intersects or touches a
+        box.
+
+        Args:
+            bounds (Tuple[float, float, float, float]): (minx, miny, maxx, maxy)
+                of the box to search.
+
+        Returns:
+            List[int]: Ids of the components, in the order they were added to
+            the design.
+        """
+        if self._tree is None or self._dirty or self._all_dirty:
+            self.update()
+        found = set(self._tree_ids[self._tree.query(
+            shapely.box(*bounds))].tolist())
+        if self._stale:
+            found -= self._stale
+            minx, miny, maxx, maxy = bounds
+            for component_id in self._stale:
+                box = self._bounds.get(component_id)
+                if box is not None and box[0] <= maxx and box[2] >= minx \
+                        and box[1] <= maxy and box[3] >= miny:
+                    found.add(component_id)
+        return sorted(found)
+
+    def get_bounds(self,
+                   component_id: int) -> Tuple[float, float, float, float]:
+        """Get the bounds of the qgeometry of a component.
+
+        Args:
+            component_id (int): Unique number to describe the component.
+
+        Returns:
+            Tuple[float, float, float, float]: (minx, miny, maxx, maxy), or None
+            if the component has no qgeometry.
+        """
+        if self._tree is None or self._dirty or self._all_dirty:
+            self.update()
+        return self._bounds.get(component_id)
+
+    def get_total_bounds(self) -> Tuple[float, float, float, float]:
+        """Get the bounds of the qgeometry of all the components.
+
+        Returns:
+            Tuple[float, float, float, float]: (minx, miny, maxx, maxy), or None
+            if no component has qgeometry.
+        """
+        if self._tree is None or self._dirty or self._all_dirty:
+            self.update()
+        if not self._bounds:
+            return None
+        boxes = np.array(list(self._bounds.values()), dtype=float)
+        return (*boxes[:, :2].min(axis=0), *boxes[:, 2:].max(axis=0))
+
+    def get_outline(self, component_id: int) -> List[list]:
+        """Get the outline of a component: the exterior rings of its
+        `qgeometry_keepout()`.
+
+        Args:
+            component_id (int): Unique number to describe the component.
+
+        Returns:
+            List[list]: Coordinates of each ring, one (x, y) tuple per vertex.
+        """
+        if component_id not in self._outlines:
+            # pylint: disable=protected-access
+            keepout = self._qgeometry.design._components[
+                component_id].qgeometry_keepout()
+            self._outlines[component_id] = [
+                list(polygon.exterior.coords)
+                for polygon in getattr(keepout, 'geoms', [keepout])
+                if polygon.geom_type == 'Polygon' and not polygon.is_empty
+            ]
+        return self._outlines[component_id]
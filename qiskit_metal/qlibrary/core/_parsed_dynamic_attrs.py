@@ -15,6 +15,7 @@
 import pprint
 from typing import List
 from typing import TYPE_CHECKING
+from ...toolbox_python.attr_dict import Dict, get_dict_version
 #from ...toolbox_python.utility_functions import log_error_easy
 if TYPE_CHECKING:
     from .base import QComponent
@@ -41,6 +42,41 @@ def is_ipython_magic(check_attribute: str) -> bool:
     }
 
 
+class ParsedOptionsSnapshot():
+    """Parsed options of a component, computed once at the start of a build.
+
+    While the component is being made, `component.p` and
+    `component.parse_options()` read from the snapshot instead of parsing the
+    options again. The snapshot is stale, and is replaced, once the options or
+    the design variables take a new version.
+    """
+    __slots__ = ('parsed', 'options_version', 'variables_version')
+
+    def __init__(self, component: 'QComponent'):
+        """
+        Args:
+            component (QComponent): Component to parse the options of.
+        """
+        self.parsed = component.design.parse_value(
+            component.options)  # type: Dict
+        self.options_version = get_dict_version(component.options)
+        self.variables_version = get_dict_version(component.design.variables)
+
+    def is_valid(self, component: 'QComponent') -> bool:
+        """Are the options and design variables unchanged since the
+        snapshot?
+
+        Args:
+            component (QComponent): Component the snapshot was taken of.
+
+        Returns:
+            bool: True if the snapshot can be used.
+        """
+        return self.options_version == get_dict_version(component.options) and \
+            self.variables_version == get_dict_version(
+                component.design.variables)
+
+
 class ParsedDynamicAttributes_Component():
     """Provides a parsing view of the component options.
 
@@ -168,6 +204,10 @@ class ParsedDynamicAttributes_Component():
                 return ParsedDynamicAttributes_Component(
                     self.__component__, key_list=self.__keylist__ + [name])
             else:
+                # pylint: disable=protected-access
+                parsed = self.__component__._get_parsed_options_snapshot()
+                if parsed is not None:
+                    return get_nested_dict_item(parsed, self.__keylist__)[name]
                 return self.__parse__(val)
 
     ####### SERIALIZATION
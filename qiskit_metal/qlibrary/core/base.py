@@ -35,9 +35,11 @@ from qiskit_metal import is_design, logger
 import qiskit_metal.qlibrary as qlibrary
 from qiskit_metal import config
 from qiskit_metal.draw import BaseGeometry
-from qiskit_metal.toolbox_python.attr_dict import Dict
+from shapely.geometry import CAP_STYLE, JOIN_STYLE
+from qiskit_metal.toolbox_python.attr_dict import Dict, VersionedDict
 from qiskit_metal.toolbox_python.display import format_dict_ala_z
 from qiskit_metal.qlibrary.core._parsed_dynamic_attrs import ParsedDynamicAttributes_Component
+from qiskit_metal.qlibrary.core._parsed_dynamic_attrs import ParsedOptionsSnapshot
 
 if not config.is_building_docs():
     from ...draw import Vector
@@ -185,6 +187,12 @@ class QComponent():
         self._id = None
         self._made = False
 
+        # Parsed options, only set while the component is being made.
+        self._options_snapshot = None
+
+        # Merged keep-out geometry, see qgeometry_keepout().
+        self._keepout_cache = dict()
+
         self._component_template = component_template
 
         # Status: used to handle building of a component and checking if it succeeded or failed.
@@ -206,8 +214,10 @@ class QComponent():
         #: A dictionary of the component-designer-defined options.
         #: These options are used in the make function to create the QGeometry and QPins.
         #: All options should have string keys and preferrable string values.
-        self.options = self.get_template_options(
-            design=design, component_template=component_template)
+        #: Versioned, so that the parsed options can be cached during a build.
+        self.options = VersionedDict(
+            self.get_template_options(design=design,
+                                      component_template=component_template))
         if options:
             self.options.update(options)
 
@@ -707,9 +717,14 @@ name='{strname}'{other_args}
                 # pylint: disable=protected-access
                 self.design._delete_all_pins_for_component(self.id)
 
+            # pylint: disable=protected-access
+            self.design._clear_pin_dependencies(self.id)
+            self._keepout_cache.clear()
+            self._options_snapshot = ParsedOptionsSnapshot(self)
             self.make()
             self._made = True
             self.status = 'good'
+            self.design._record_build_signature(self)
 
             self.design.build_logs.add_success(
                 f"{str(datetime.now())} -- Component: {self.name} successfully built"
@@ -723,6 +738,9 @@ name='{strname}'{other_args}
             )
             raise error
 
+        finally:
+            self._options_snapshot = None
+
     def delete(self):
         """Delete the QComponent.
 
@@ -794,10 +812,34 @@ name='{strname}'{other_args}
 
         Calls `self.design.parse_options`.
 
+        While the component is being made, the parsed `self.options` are
+        computed once and the same Dict is returned by every call.
+        Treat it as read only.
+
         See `self.parse_value` for more information.
         """
+        if not options:
+            parsed = self._get_parsed_options_snapshot()
+            if parsed is not None:
+                return parsed
         return self.design.parse_value(options if options else self.options)
 
+    def _get_parsed_options_snapshot(self) -> Union[Dict, None]:
+        """Get the parsed options of the build in progress. The snapshot is
+        taken again if the options or design variables have changed since.
+
+        Returns:
+            Union[Dict, None]: Parsed options, or None outside of a build.
+        """
+        snapshot = getattr(self, '_options_snapshot', None)
+        if snapshot is None or snapshot.options_version is None:
+            # Options replaced by a Dict that can't be tracked
+            return None
+        if not snapshot.is_valid(self):
+            snapshot = ParsedOptionsSnapshot(self)
+            self._options_snapshot = snapshot
+        return snapshot.parsed
+
     def _is_name_used(self, check_name: str) -> int:
         """Used to check if name of component already exists.
 
@@ -1131,6 +1173,7 @@ name='{strname}'{other_args}
         # When self.options is instantiated, the template_options are populated.
         # renderer_and_options = {**self.options, **kwargs}
 
+        self._keepout_cache.clear()
         self.design.qgeometry.add_qgeometry(kind,
                                             self.id,
                                             geometry,
@@ -1294,6 +1337,68 @@ name='{strname}'{other_args}
         bounds = self.design.qgeometry.get_component_bounds(self.name)
         return bounds
 
+    def qgeometry_keepout(self,
+                          clearance: float = 0,
+                          chip: str = None,
+                          layer: int = None,
+                          subtract: bool = None,
+                          cap_style: int = CAP_STYLE.flat,
+                          join_style: int = JOIN_STYLE.round) -> BaseGeometry:
+        """Get the keep-out area of the component: the union of its polys and
+        of its paths buffered to their width, grown by a clearance.
+
+        The result is cached for each set of arguments, until the component
+        is rebuilt or adds qgeometry. Use it to test collisions, rather than
+        merging the qgeometry again.
+
+        Args:
+            clearance (float): Distance to grow the outline by, in design
+                units.  Defaults to 0.
+            chip (str): Only use the qgeometry on this chip.  Defaults to None,
+                which uses all the chips.
+            layer (int): Only use the qgeometry on this layer.  Defaults to
+                None, which uses all the layers.
+            subtract (bool): Only use the qgeometry with this subtract value.
+                Defaults to None, which uses both.
+            cap_style (int): Shapely cap style of the buffered paths.
+                Defaults to CAP_STYLE.flat.
+            join_style (int): Shapely join style of the buffered paths and
+                of the clearance.  Defaults to JOIN_STYLE.round.
+
+        Returns:
+            BaseGeometry: A Polygon or MultiPolygon, empty if the component
+            has no qgeometry.  Do not modify it, it is shared.
+        """
+        key = (clearance, chip, layer, subtract, cap_style, join_style)
+        if key in self._keepout_cache:
+            return self._keepout_cache[key]
+
+        columns = ['geometry', 'chip', 'layer', 'subtract']
+        shapes = []
+        for table_name in ['poly', 'path']:
+            # pylint: disable=protected-access
+            rows = self.design.qgeometry._get_component_rows(
+                table_name, self.id,
+                columns + (['width'] if table_name == 'path' else []))
+            for index, geometry in enumerate(rows['geometry']):
+                if ((chip is not None and rows['chip'][index] != chip) or
+                    (layer is not None and rows['layer'][index] != layer) or
+                    (subtract is not None and
+                     bool(rows['subtract'][index]) != subtract)):
+                    continue
+                if table_name == 'path':
+                    geometry = geometry.buffer(rows['width'][index] / 2,
+                                               cap_style=cap_style,
+                                               join_style=join_style)
+                shapes.append(geometry)
+
+        keepout = draw.union(shapes)
+        if clearance and not keepout.is_empty:
+            keepout = keepout.buffer(clearance, join_style=join_style)
+
+        self._keepout_cache[key] = keepout
+        return keepout
+
     def qgeometry_plot(self,
                        ax: 'matplotlib.axes.Axes' = None,
                        plot_kw: dict = None) -> List:
@@ -1326,5 +1431,5 @@ name='{strname}'{other_args}
         add_qgeometry(). This dict is used to get a summary tables used
         for this component.
         """
-        for table_name in self.design.qgeometry.tables.keys():
+        for table_name in self.qgeometry_types:
             self.qgeometry_table_usage[table_name] = False
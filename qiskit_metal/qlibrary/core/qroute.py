@@ -215,9 +215,13 @@ class QRoute(QComponent):
         Args:
             pin_data: dict {component: string, pin: string}
 
+        Records that this route depends on the component owning the pin.
+
         Return:
             The actual pin object.
         """
+        # pylint: disable=protected-access
+        self.design._add_pin_dependency(pin_data.component, self.id)
         return self.design.components[pin_data.component].pins[pin_data.pin]
 
     def set_pin(self, name: str) -> QRoutePoint:
@@ -153,22 +153,16 @@ class RouteAnchors(QRoute):
         Returns:
             bool: True is no obstacles
         """
-        # transform path to polygons
-        paths_converted = []
-        paths = self.design.components[component_name].qgeometry_table('path')
-        for _, row in paths.iterrows():
-            paths_converted.append(row['geometry'].buffer(
-                row['width'] / 2, cap_style=CAP_STYLE.flat))
-        # merge all the polygons
-        polygons = self.design.components[component_name].qgeometry_list('poly')
-        boundary = gpd.GeoSeries(unary_union(polygons + paths_converted))
-        boundary_coords = list(boundary.geometry.exterior[0].coords)
-        if any(
-                intersecting(segment[0], segment[1], boundary_coords[i],
-                             boundary_coords[i + 1])
-                for i in range(len(boundary_coords) - 1)):
-            # At least 1 intersection with the actual component contour; do not proceed!
-            return False
+        # outline of the merged polys and buffered paths, cached by the design
+        component_id = self.design.components[component_name].id
+        for boundary_coords in self.design.qgeometry.spatial_index.get_outline(
+                component_id):
+            if any(
+                    intersecting(segment[0], segment[1], boundary_coords[i],
+                                 boundary_coords[i + 1])
+                    for i in range(len(boundary_coords) - 1)):
+                # At least 1 intersection with the actual component contour; do not proceed!
+                return False
         # All clear, no intersections
         return True
 
@@ -184,11 +178,14 @@ class RouteAnchors(QRoute):
         """
 
         # assumes rectangular bounding boxes
-        for component in self.design.components:
-            if component == self.name:
+        # only the components whose bounding box overlaps the segment can block it
+        spatial_index = self.design.qgeometry.spatial_index
+        (x_0, y_0), (x_1, y_1) = segment
+        for component_id in spatial_index.query(
+            (min(x_0, x_1), min(y_0, y_1), max(x_0, x_1), max(y_0, y_1))):
+            if component_id == self.id:
                 continue
-            xmin, ymin, xmax, ymax = self.design.components[
-                component].qgeometry_bounds()
+            xmin, ymin, xmax, ymax = spatial_index.get_bounds(component_id)
             # p, q, r, s are corner coordinates of each bounding box
             p, q, r, s = [
                 np.array([xmin, ymin]),
@@ -200,7 +197,8 @@ class RouteAnchors(QRoute):
                     intersecting(segment[0], segment[1], k, l)
                     for k, l in [(p, q), (p, r), (r, s), (q, s)]):
                 # At least 1 intersection with the component bounding box. Check the actual contour.
-                if not self.unobstructed_close_up(segment, component):
+                if not self.unobstructed_close_up(
+                        segment, self.design._components[component_id].name):  # pylint: disable=protected-access
                     # At least 1 intersection with the actual component contour; do not proceed!
                     return False
         # All clear, no intersections
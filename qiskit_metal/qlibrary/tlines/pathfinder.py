@@ -14,6 +14,8 @@
 
 import heapq
 import numpy as np
+import shapely
+from shapely.strtree import STRtree
 from qiskit_metal import Dict
 from qiskit_metal.qlibrary.core import QRoutePoint
 from .anchored_path import RouteAnchors
@@ -40,12 +42,19 @@ class RoutePathfinder(RouteAnchors):
 
     Default Options:
         * step_size: '0.25mm' -- Length of the step for the A* pathfinding algorithm
+        * engine: 'segment' -- segment/grid, defines how A* looks for obstacles.
+          'segment' checks each step against the qgeometry of the components.
+          'grid' marks the blocked steps of a grid of pitch step_size once,
+          then searches it
         * advanced: Dict
             * avoid_collision: 'true' -- true/false, defines if the route needs to avoid collisions
+            * turn_penalty: '0.25mm' -- Length added to a path for each turn, 'grid' engine only
     """
 
     default_options = Dict(step_size='0.25mm',
-                           advanced=Dict(avoid_collision='true'))
+                           engine='segment',
+                           advanced=Dict(avoid_collision='true',
+                                         turn_penalty='0.25mm'))
     """Default options"""
 
     TOOLTIP = """ Non-meandered CPW class that combines A* pathfinding algorithm with
@@ -158,6 +167,277 @@ class RoutePathfinder(RouteAnchors):
         return [
         ]  # Shouldn't actually reach here - if it fails, there's a convergence issue
 
+    # Unit displacement of each grid direction: +x, -x, +y, -y
+    _GRID_DIRECTIONS = np.array([[1, 0], [-1, 0], [0, 1], [0, -1]])
+
+    def _get_grid_lines(self, start: np.ndarray, end: np.ndarray,
+                        step_size: float, margin: float) -> tuple:
+        """Place the lines of the search grid, a step_size apart, through the
+        start, with extra lines through the end.
+
+        The grid covers the box of the start and end, grown on each side by
+        margin, and clipped to a step around the qgeometry of the design.
+
+        Args:
+            start (np.array): 2-D coordinates of the first point
+            end (np.array): 2-D coordinates of the last point
+            step_size (float): Distance between the grid lines
+            margin (float): Distance to grow the box by
+
+        Returns:
+            tuple: Coordinates of the vertical lines and of the horizontal
+            lines, as sorted 1-D arrays, and True if the grid covers all
+            the qgeometry of the design.
+        """
+        low = np.minimum(start, end) - margin
+        high = np.maximum(start, end) + margin
+
+        covers_all = True
+        total_bounds = self.design.qgeometry.spatial_index.get_total_bounds()
+        if total_bounds is not None:
+            total_low = np.array(total_bounds[:2]) - step_size
+            total_high = np.array(total_bounds[2:]) + step_size
+            covers_all = bool(
+                np.all(low <= total_low) and np.all(high >= total_high))
+            low = np.minimum(np.maximum(low, total_low), np.minimum(start, end))
+            high = np.maximum(np.minimum(high, total_high),
+                              np.maximum(start, end))
+
+        grid_lines = []
+        for axis in range(2):
+            first = np.floor((low[axis] - start[axis]) / step_size)
+            last = np.ceil((high[axis] - start[axis]) / step_size)
+            lines = start[axis] + step_size * np.arange(first, last + 1)
+            if np.abs(lines - end[axis]).min() > 10**-8:
+                lines = np.append(lines, end[axis])
+            lines = np.sort(lines)
+            # Snap the closest lines onto the start and end exactly
+            lines[np.abs(lines - start[axis]).argmin()] = start[axis]
+            lines[np.abs(lines - end[axis]).argmin()] = end[axis]
+            grid_lines.append(lines)
+        return (*grid_lines, covers_all)
+
+    def get_occupancy_grid(self, x_lines: np.ndarray,
+                           y_lines: np.ndarray) -> tuple:
+        """Find the steps of the grid blocked by other components.
+
+        A step is blocked if it crosses, or lies inside, the keep-out area of
+        a component. Running along an edge of the area is allowed.
+
+        Args:
+            x_lines (np.ndarray): Coordinates of the vertical grid lines
+            y_lines (np.ndarray): Coordinates of the horizontal grid lines
+
+        Returns:
+            tuple: Two boolean arrays. The first, of shape
+            (len(x_lines) - 1, len(y_lines)), is True if the step from
+            (x_lines[i], y_lines[j]) to (x_lines[i + 1], y_lines[j]) is
+            blocked. The second, of shape (len(x_lines), len(y_lines) - 1),
+            is the same for the steps along y.
+        """
+        spatial_index = self.design.qgeometry.spatial_index
+        components = self.design._components  # pylint: disable=protected-access
+        keepouts = [
+            components[component_id].qgeometry_keepout()
+            for component_id in spatial_index.query((x_lines[0], y_lines[0],
+                                                     x_lines[-1], y_lines[-1]))
+            if component_id != self.id
+        ]
+
+        blocked = []
+        for along_x in (True, False):
+            if along_x:
+                x_0, y_0 = np.meshgrid(x_lines[:-1], y_lines, indexing='ij')
+                x_1, y_1 = np.meshgrid(x_lines[1:], y_lines, indexing='ij')
+            else:
+                x_0, y_0 = np.meshgrid(x_lines, y_lines[:-1], indexing='ij')
+                x_1, y_1 = np.meshgrid(x_lines, y_lines[1:], indexing='ij')
+            steps_blocked = np.zeros(x_0.shape, dtype=bool)
+            if keepouts:
+                steps = shapely.linestrings(
+                    np.stack([x_0, y_0, x_1, y_1], axis=-1).reshape(-1, 2, 2))
+                tree = STRtree(keepouts)
+                for predicate in ('crosses', 'within'):
+                    hits = tree.query(steps, predicate=predicate)[0]
+                    steps_blocked.flat[hits] = True
+            blocked.append(steps_blocked)
+        return tuple(blocked)
+
+    def connect_grid_astar(self, start_pt: QRoutePoint,
+                           end_pt: QRoutePoint) -> list:
+        """Connect start and end via A* over an occupancy grid.
+
+        Each turn adds advanced.turn_penalty to the length of a path, so the
+        route with the fewest turns is preferred among the shortest ones.
+        The route never steps back, leaves the start along its direction or
+        sideways, and does not arrive at the end along the end direction.
+        The grid starts around the start and end, and grows until a path is
+        found or it covers the design.
+
+        Args:
+            start_pt (QRoutePoint): First anchor, with its direction
+            end_pt (QRoutePoint): Second anchor, direction may be None
+
+        Returns:
+            list: Vertices of a CPW going from start to end, starting with
+            start and excluding end. None if the grid has no path.
+        """
+        start = start_pt.position
+        end = end_pt.position
+        step_size = self.parse_options().step_size
+
+        margin = max(np.abs(end - start)) + 2 * step_size
+        while True:
+            x_lines, y_lines, covers_all = self._get_grid_lines(
+                start, end, step_size, margin)
+            path = self._search_grid(start_pt, end_pt, x_lines, y_lines)
+            if path is not None or covers_all:
+                return path
+            margin *= 2
+
+    def _search_grid(self, start_pt: QRoutePoint, end_pt: QRoutePoint,
+                     x_lines: np.ndarray, y_lines: np.ndarray) -> list:
+        """Run A* over the grid, see connect_grid_astar.
+
+        Args:
+            start_pt (QRoutePoint): First anchor, with its direction
+            end_pt (QRoutePoint): Second anchor, direction may be None
+            x_lines (np.ndarray): Coordinates of the vertical grid lines
+            y_lines (np.ndarray): Coordinates of the horizontal grid lines
+
+        Returns:
+            list: Vertices of a CPW going from start to end, starting with
+            start and excluding end. None if the grid has no path.
+        """
+        start = start_pt.position
+        end = end_pt.position
+        turn_penalty = self.parse_options().advanced.turn_penalty
+        directions = self._GRID_DIRECTIONS
+
+        blocked_x, blocked_y = self.get_occupancy_grid(x_lines, y_lines)
+        num_x, num_y = len(x_lines), len(y_lines)
+
+        start_ij = (int(np.abs(x_lines - start[0]).argmin()),
+                    int(np.abs(y_lines - start[1]).argmin()))
+        end_ij = (int(np.abs(x_lines - end[0]).argmin()),
+                  int(np.abs(y_lines - end[1]).argmin()))
+
+        # Directions allowed for the first step and for the last step
+        start_ok = [
+            start_pt.direction is None or mao.dot(disp, start_pt.direction) >= 0
+            for disp in directions
+        ]
+        end_ok = [
+            end_pt.direction is None or mao.dot(disp, end_pt.direction) <= 0
+            for disp in directions
+        ]
+
+        # A state is a grid point with the direction of the step reaching it
+        cost = np.full((num_x, num_y, 4), np.inf)
+        parent = np.full((num_x, num_y, 4), -1, dtype=int)
+        priority_queue = []
+
+        def heuristic(i: int, j: int) -> float:
+            return abs(x_lines[i] - end[0]) + abs(y_lines[j] - end[1])
+
+        def push(i: int, j: int, direction: int, new_cost: float,
+                 from_state: int):
+            if new_cost < cost[i, j, direction]:
+                cost[i, j, direction] = new_cost
+                parent[i, j, direction] = from_state
+                heapq.heappush(
+                    priority_queue,
+                    (new_cost + heuristic(i, j), new_cost, i, j, direction))
+
+        def step(i: int, j: int, direction: int) -> tuple:
+            """Grid point reached from (i, j), or None if blocked."""
+            d_i, d_j = directions[direction]
+            n_i, n_j = i + d_i, j + d_j
+            if not (0 <= n_i < num_x and 0 <= n_j < num_y):
+                return None
+            if d_i != 0 and blocked_x[min(i, n_i), j]:
+                return None
+            if d_j != 0 and blocked_y[i, min(j, n_j)]:
+                return None
+            length = abs(x_lines[n_i] - x_lines[i]) + abs(y_lines[n_j] -
+                                                          y_lines[j])
+            return n_i, n_j, length
+
+        for direction in range(4):
+            if start_ok[direction]:
+                reached = step(*start_ij, direction)
+                if reached is not None:
+                    n_i, n_j, length = reached
+                    turn = (start_pt.direction is not None and not np.allclose(
+                        directions[direction], start_pt.direction))
+                    push(n_i, n_j, direction, length + turn * turn_penalty, -1)
+
+        found = None
+        while priority_queue:
+            _, path_cost, i, j, direction = heapq.heappop(priority_queue)
+            if path_cost > cost[i, j, direction]:
+                continue  # Superseded by a cheaper path
+            if (i, j) == end_ij and end_ok[direction]:
+                found = (i, j, direction)
+                break
+            state = np.ravel_multi_index((i, j, direction), cost.shape)
+            for new_direction in range(4):
+                if new_direction == direction ^ 1:
+                    continue  # Never step back
+                reached = step(i, j, new_direction)
+                if reached is not None:
+                    n_i, n_j, length = reached
+                    push(
+                        n_i, n_j, new_direction, path_cost + length +
+                        (new_direction != direction) * turn_penalty, state)
+
+        if found is None:
+            return None
+
+        # Walk the parent pointers back, keeping only the corners
+        states = [found]
+        while parent[states[-1]] != -1:
+            states.append(np.unravel_index(parent[states[-1]], cost.shape))
+        states.reverse()
+        corners = [start]
+        for (i, j, direction), next_state in zip(states, states[1:]):
+            if direction != next_state[2]:
+                corners.append(np.array([x_lines[i], y_lines[j]]))
+        return corners
+
+    def connect_grid_astar_or_simple(self, start_pt: QRoutePoint,
+                                     end_pt: QRoutePoint) -> list:
+        """Connect start and end via A* over an occupancy grid if
+        connect_simple doesn't work.
+
+        Falls back to connect_astar_or_simple if the grid has no path.
+
+        Args:
+            start_pt (QRoutePoint): First anchor, with its direction
+            end_pt (QRoutePoint): Second anchor, direction may be None
+
+        Returns:
+            List of vertices of a CPW going from start to end
+        """
+        # connect_simple assigns a direction to anchors, keep end_pt as is
+        try:
+            simple_path = self.connect_simple(
+                QRoutePoint(start_pt.position, start_pt.direction),
+                QRoutePoint(end_pt.position, end_pt.direction))
+        except QiskitMetalDesignError:
+            simple_path = None
+        if simple_path is not None:
+            return [start_pt.position] + list(simple_path)
+
+        grid_path = self.connect_grid_astar(start_pt, end_pt)
+        if grid_path is not None:
+            return grid_path
+
+        self.logger.warning(
+            f'Component {self.name}: the grid engine found no path; '
+            'using the segment engine instead.')
+        return self.connect_astar_or_simple(start_pt, end_pt)
+
     def make(self):
         """Generates path from start pin to end pin."""
         p = self.parse_options()
@@ -171,16 +451,20 @@ class RoutePathfinder(RouteAnchors):
         start_point = self.set_lead("start")
         end_point = self.set_lead("end")
 
+        if p.engine == 'grid':
+            connect = self.connect_grid_astar_or_simple
+        else:
+            connect = self.connect_astar_or_simple
+
         self.intermediate_pts = OrderedDict()
         for arc_num, coord in anchors.items():
-            arc_pts = self.connect_astar_or_simple(self.get_tip(),
-                                                   QRoutePoint(coord))
+            arc_pts = connect(self.get_tip(), QRoutePoint(coord))
             if arc_pts is None:
                 self.intermediate_pts[arc_num] = [coord]
             else:
                 self.intermediate_pts[arc_num] = np.concatenate(
                     [arc_pts, [coord]], axis=0)
-        arc_pts = self.connect_astar_or_simple(self.get_tip(), end_point)
+        arc_pts = connect(self.get_tip(), end_point)
         if arc_pts is not None:
             self.intermediate_pts[len(anchors)] = np.array(arc_pts)
 
@@ -1,8 +1,10 @@
-from typing import Union, Optional
+from typing import Iterable, Union, Optional
+import hashlib
 import os
 import pandas as pd
 
 from qiskit_metal import Dict, draw
+from qiskit_metal.qgeometries import get_galvanic_net_ids
 from qiskit_metal.renderers.renderer_base import QRendererAnalysis
 from qiskit_metal.renderers.renderer_gmsh.gmsh_renderer import QGmshRenderer
 from qiskit_metal.renderers.renderer_elmer.elmer_runner import ElmerRunner
@@ -132,6 +134,9 @@ class QElmerRenderer(QRendererAnalysis):
         default_layer_types = dict(metal=[1], dielectric=[3])
         self.layer_types = default_layer_types if layer_types is None else layer_types
 
+        # (sim_dir, mesh_file, digest of the mesh file) of the last ElmerGrid run
+        self._elmergrid_input = None
+
         super().__init__(design=design, initiate=initiate, options=options)
 
     @property
@@ -251,10 +256,6 @@ class QElmerRenderer(QRendererAnalysis):
         mask = lambda table: table["component"].isin(qcomp_ids) & ~table[
             "subtract"] & table["layer"].isin(metal_layers)
 
-        min_z = lambda layer: min(
-            sum(self.gmsh.get_thickness_zcoord_for_layer_datatype(layer)),
-            self.gmsh.get_thickness_zcoord_for_layer_datatype(layer)[1])
-
         path_table = self.design.qgeometry.tables["path"]
         poly_table = self.design.qgeometry.tables["poly"]
         qcomp_paths = path_table[mask(table=path_table)]
@@ -262,13 +263,32 @@ class QElmerRenderer(QRendererAnalysis):
         qcomp_geom_table = pd.concat([qcomp_paths, qcomp_polys],
                                      ignore_index=True)
 
-        qcomp_geom_table['min_z'] = qcomp_geom_table['layer'].apply(min_z)
+        min_z = {
+            layer: min(sum(thick_z), thick_z[1]) for layer, thick_z in
+            self.get_layer_thickness_z(qcomp_geom_table['layer']).items()
+        }
+        qcomp_geom_table['min_z'] = qcomp_geom_table['layer'].map(min_z)
         qcomp_geom_table.sort_values(by=['min_z'],
                                      inplace=True,
                                      ignore_index=True)
 
         return qcomp_geom_table
 
+    def get_layer_thickness_z(
+            self, layers: Iterable[int]) -> dict[int, tuple[float, float]]:
+        """Look up the thickness and z coordinate of each unique layer once.
+
+        Args:
+            layers (Iterable[int]): Layer numbers, which may repeat.
+
+        Returns:
+            dict[int, tuple[float, float]]: key=layer, value=(thickness, z_coord)
+        """
+        return {
+            layer: self.gmsh.get_thickness_zcoord_for_layer_datatype(layer)
+            for layer in pd.unique(pd.Series(layers))
+        }
+
     def assign_nets(
         self,
         open_pins: Union[list,
@@ -287,55 +307,18 @@ class QElmerRenderer(QRendererAnalysis):
         """
 
         netlists = dict()
-        netlist_id = 0
 
-        qgeom_names = self.qcomp_geom_table["name"]
-        qcomp_names_for_qgeom = [
-            list(self.design.components.keys())[i - 1]
-            for i in self.qcomp_geom_table["component"]
-        ]
+        qcomp_names = list(self.design.components.keys())
         phys_grps = [
-            s1 + '_' + s2 for s1, s2 in zip(qcomp_names_for_qgeom, qgeom_names)
+            qcomp_names[i - 1] + '_' + name
+            for i, name in zip(self.qcomp_geom_table["component"],
+                               self.qcomp_geom_table["name"])
         ]
-        qgeom_idxs = list(range(len(self.qcomp_geom_table)))
-        id_net_dict = {k: -1 for k in phys_grps}
-
-        while len(qgeom_idxs) != 0:
-            i = qgeom_idxs.pop(0)
-            shape_i = self.qcomp_geom_table.iloc[[i]]["geometry"][i]
-            chip_i = self.qcomp_geom_table.iloc[[i]]["chip"][i]
-            layer_i = self.qcomp_geom_table.iloc[[i]]["layer"][i]
-            thick_i, z_coord_i = self.gmsh.get_thickness_zcoord_for_layer_datatype(
-                layer_i)
-            id_net_dict[phys_grps[i]] = netlist_id if (
-                id_net_dict[phys_grps[i]] == -1) else id_net_dict[phys_grps[i]]
-            for j in qgeom_idxs:
-                shape_j = self.qcomp_geom_table.iloc[[j]]["geometry"][j]
-                chip_j = self.qcomp_geom_table.iloc[[j]]["chip"][j]
-                layer_j = self.qcomp_geom_table.iloc[[j]]["layer"][j]
-                thick_j, z_coord_j = self.gmsh.get_thickness_zcoord_for_layer_datatype(
-                    layer_j)
-                dist = shape_i.distance(shape_j)
-
-                layers_touch = False
-                if (layer_i == layer_j or z_coord_j == z_coord_i or
-                        z_coord_i + thick_i == z_coord_j or
-                        z_coord_j + thick_j == z_coord_i):
-                    layers_touch = True
-
-                if dist == 0.0 and chip_i == chip_j and layers_touch:
-                    if id_net_dict[phys_grps[j]] == -1:
-                        id_net_dict[phys_grps[j]] = id_net_dict[phys_grps[i]]
-                    elif id_net_dict[phys_grps[j]] != id_net_dict[phys_grps[i]]:
-                        net_id_i = id_net_dict[phys_grps[i]]
-                        for k, v in id_net_dict.items():
-                            if v == net_id_i:
-                                id_net_dict[k] = id_net_dict[phys_grps[j]]
-
-            if -1 not in id_net_dict.values():
-                break
-
-            netlist_id = max(list(id_net_dict.values())) + 1
+        net_ids = get_galvanic_net_ids(self.qcomp_geom_table,
+                                       self.get_layer_thickness_z(
+                                           self.qcomp_geom_table["layer"]),
+                                       groups=phys_grps)
+        id_net_dict = dict(zip(phys_grps, net_ids.tolist()))
 
         gnd_phys_grps = self.get_gnd_qgeoms(open_pins)
         gnd_netlist = list({
@@ -431,8 +414,16 @@ class QElmerRenderer(QRendererAnalysis):
             cap_matrix_file = os.path.join(self._options["simulation_dir"],
                                            setup["Capacitance_Matrix_Filename"])
 
-        self.logger.info("Running ElmerGrid on input mesh from Gmsh...")
-        self._elmer_runner.run_elmergrid(sim_dir, meshfile)
+        # ElmerGrid is skipped when the mesh is the same as on the last run,
+        # such as when it was loaded from the mesh cache of the Gmsh renderer.
+        elmergrid_input = (sim_dir, meshfile, self._get_file_digest(meshfile))
+        if (elmergrid_input == self._elmergrid_input and
+                os.path.exists(os.path.join(sim_dir, "mesh.header"))):
+            self.logger.info("Mesh unchanged, skipping ElmerGrid...")
+        else:
+            self.logger.info("Running ElmerGrid on input mesh from Gmsh...")
+            self._elmer_runner.run_elmergrid(sim_dir, meshfile)
+            self._elmergrid_input = elmergrid_input
         self.logger.info(f"Running ElmerSolver for solver type: '{sim_type}'")
         self._elmer_runner.run_elmersolver(sim_dir, sif_name)
 
@@ -440,6 +431,24 @@ class QElmerRenderer(QRendererAnalysis):
         if display_cap_matrix:
             return self.capacitance_matrix
 
+    @staticmethod
+    def _get_file_digest(filename: str) -> Union[bytes, None]:
+        """Digest of the content of a file.
+
+        Args:
+            filename (str): Path of the file.
+
+        Returns:
+            Union[bytes, None]: Digest, or None if the file does not exist.
+        """
+        if not os.path.exists(filename):
+            return None
+        digest = hashlib.blake2b()
+        with open(filename, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.digest()
+
     def save_capacitance_matrix(self, path: str):
         """Saves capacitance matrix to file.
 
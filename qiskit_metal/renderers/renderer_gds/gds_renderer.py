@@ -14,13 +14,17 @@
 """ This module has a QRenderer to export QDesign to a GDS file."""
 # pylint: disable=too-many-lines
 
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
 from operator import itemgetter
 from typing import TYPE_CHECKING
-#from typing import Dict as Dict_
-from typing import Tuple, Union
+from typing import Dict as Dict_
+from typing import Callable, List, Tuple, Union
 #from typing import List, Any, Iterable
+import hashlib
 import math
+import multiprocessing
 import os
 from shapely.geometry import LineString
 #from pandas.api.types import is_numeric_dtype
@@ -34,6 +38,7 @@ import numpy as np
 
 from qiskit_metal.renderers.renderer_base import QRenderer
 from qiskit_metal.renderers.renderer_gds.make_cheese import Cheesing
+from qiskit_metal.renderers.renderer_gds.tiled_boolean import tiled_boolean
 from qiskit_metal.toolbox_metal.parsing import is_true
 from qiskit_metal import draw
 
@@ -43,6 +48,7 @@ from .. import config
 if not config.is_building_docs():
     from qiskit_metal.toolbox_python.utility_functions import can_write_to_path
     from qiskit_metal.toolbox_python.utility_functions import get_range_of_vertex_to_not_fillet
+    from qiskit_metal.toolbox_python.utility_functions import bad_fillet_mask
 
 if TYPE_CHECKING:
     # For linting typechecking, import modules that can't be loaded here under normal conditions.
@@ -50,6 +56,12 @@ if TYPE_CHECKING:
     # chicken and egg issue.
     from qiskit_metal.designs import QDesign
 
+# The junction files read by QGDSRenderer._import_junction_gds_file(), shared
+# by the renderers of this process.  key=(absolute path, unit, precision),
+# value=(modification time and size of the file, name of its library,
+# list of its cells)
+_JUNCTION_GDS_CACHE = dict()
+
 
 class QGDSRenderer(QRenderer):
     """Extends QRenderer to export GDS formatted files. The methods which a
@@ -143,6 +155,33 @@ class QGDSRenderer(QRenderer):
         # placed placed in same layer as ground_plane.
         ground_plane='True',
 
+        # If true, the components which only differ by their position and
+        # orientation are converted once, into a cell for each layer, and
+        # placed with a CellReference.  Components are compared by their class
+        # and parsed options, then by their qgeometry.  The ground plane is
+        # still subtracted using every component, so the hierarchy is kept
+        # for the subtract=False qgeometry of the positive masks.
+        hierarchical='False',
+
+        # The ground plane booleans of each chip and layer can be split into
+        # square tiles, no larger than tile_size, which are processed by
+        # max_workers processes.  The resulting polygons are cut at the edges
+        # of the tiles.  If tile_size is zero, each boolean is done at once.
+        tiled_boolean=Dict(tile_size='0um', max_workers='4'),
+
+        # If true, export_to_gds() writes the cells of each chip and layer to
+        # the file as soon as they are complete, then frees them.  Then
+        # self.lib does not hold the geometry of the layers after the export.
+        # Used when ground_plane is true.
+        streaming='False',
+
+        # If true, and there is more than one chip, export_to_gds() builds the
+        # cells of each chip in a separate process, with up to max_workers
+        # processes, then adds them to self.lib.  Used when ground_plane is
+        # true and streaming is false.  The processes are forked, so the
+        # chips are exported one after another where fork is not available.
+        parallel_chips=Dict(enable='False', max_workers='4'),
+
         # By default, export_to_gds() will create a positive_mask for every
         # chip and layer.  Within the Dict, there needs to be an entry for each
         # chip.  Each chip has a list of layers that should export as a
@@ -237,7 +276,12 @@ class QGDSRenderer(QRenderer):
 
             # Keep a buffer around the perimeter of chip, that will
             # not need cheesing.
-            edge_nocheese='200um'),
+            edge_nocheese='200um',
+
+            # 'boolean' subtracts the no-cheese region from every hole.
+            # 'array' places the holes clear of the no-cheese region with
+            # CellArrays, and subtracts it only from the holes on its boundary.
+            engine='boolean'),
 
         # Think of this as a keep-out region for cheesing.
         no_cheese=Dict(
@@ -330,6 +374,14 @@ class QGDSRenderer(QRenderer):
         # if imported, hold the path to file name, otherwise None.
         self.imported_junction_gds = None
 
+        # The gdspy elements and ground plane booleans of the last export,
+        # to convert again only what changed.  Set by clear_cache().
+        self._element_cache = dict()
+        self._boolean_cache = dict()
+        self._element_cache_used = set()
+        self._cache_stats = Dict()
+        self.clear_cache()
+
         QGDSRenderer.load()
 
     def _initiate_renderer(self):
@@ -690,31 +742,28 @@ class QGDSRenderer(QRenderer):
             self.options.short_segments_to_not_fillet)
         all_layers = self.design.qgeometry.get_all_unique_layers(chip_name)
 
-        for chip_layer in all_layers:
-            copy_subtract = []
-            copy_no_subtract = []
-            copy_subtract = deepcopy(all_table_subtracts)
-            copy_no_subtract = deepcopy(all_table_no_subtracts)
-
-            for item in copy_subtract:
-                item.drop(item.index[item['layer'] != chip_layer], inplace=True)
+        # Concatenate the tables once, then slice the rows of each layer.
+        all_subtract = geopandas.GeoDataFrame(
+            pd.concat(all_table_subtracts, ignore_index=False))
+        all_no_subtract = geopandas.GeoDataFrame(
+            pd.concat(all_table_no_subtracts, ignore_index=False))
+        subtract_rows = self._get_rows_by_layer(all_subtract)
+        no_subtract_rows = self._get_rows_by_layer(all_no_subtract)
+        no_rows = np.empty(0, dtype=int)
 
-            for item_no in copy_no_subtract:
-                item_no.drop(item_no.index[item_no['layer'] != chip_layer],
-                             inplace=True)
-
-            self.chip_info[chip_name][chip_layer][
-                'all_subtract_true'] = geopandas.GeoDataFrame(
-                    pd.concat(copy_subtract, ignore_index=False))
+        variants = dict()
+        if is_true(self.options.hierarchical):
+            variants = self._get_component_variants(
+                pd.concat([all_subtract, all_no_subtract]))
 
+        for chip_layer in all_layers:
             self.chip_info[chip_name][chip_layer][
-                'all_subtract_false'] = geopandas.GeoDataFrame(
-                    pd.concat(copy_no_subtract, ignore_index=False))
+                'all_subtract_true'] = all_subtract.iloc[subtract_rows.get(
+                    chip_layer, no_rows)].reset_index()
 
             self.chip_info[chip_name][chip_layer][
-                'all_subtract_true'].reset_index(inplace=True)
-            self.chip_info[chip_name][chip_layer][
-                'all_subtract_false'].reset_index(inplace=True)
+                'all_subtract_false'] = all_no_subtract.iloc[
+                    no_subtract_rows.get(chip_layer, no_rows)].reset_index()
 
             if is_true(fix_short_segments):
                 self._fix_short_segments_within_table(chip_name, chip_layer,
@@ -722,13 +771,343 @@ class QGDSRenderer(QRenderer):
                 self._fix_short_segments_within_table(chip_name, chip_layer,
                                                       'all_subtract_false')
 
-            self.chip_info[chip_name][chip_layer][
-                'q_subtract_true'] = self.chip_info[chip_name][chip_layer][
-                    'all_subtract_true'].apply(self._qgeometry_to_gds, axis=1)
+            for subtract in ('true', 'false'):
+                table = self.chip_info[chip_name][chip_layer][
+                    f'all_subtract_{subtract}']
+                digests = self._get_row_digests(table)
+                self.chip_info[chip_name][chip_layer][
+                    f'digest_{subtract}'] = hashlib.blake2b(
+                        b''.join(digests)).digest()
+
+                if variants:
+                    self.chip_info[chip_name][chip_layer][
+                        f'q_subtract_{subtract}'] = self._variants_to_gds(
+                            table, variants,
+                            f'VARIANT_{subtract}_{chip_name}_{chip_layer}')
+                else:
+                    self.chip_info[chip_name][chip_layer][
+                        f'q_subtract_{subtract}'] = self._qgeometry_table_to_gds(
+                            table, digests)
 
-            self.chip_info[chip_name][chip_layer][
-                'q_subtract_false'] = self.chip_info[chip_name][chip_layer][
-                    'all_subtract_false'].apply(self._qgeometry_to_gds, axis=1)
+    @staticmethod
+    def _get_rows_by_layer(table: geopandas.GeoDataFrame) -> dict:
+        """Group the rows of a table by layer, in a single pass.
+
+        Args:
+            table (geopandas.GeoDataFrame): Table with a 'layer' column.
+
+        Returns:
+            dict: key=layer number, value=positions of the rows of the
+            layer within table, in the order of table.
+        """
+        return table.groupby('layer', sort=False).indices
+
+    # Cache of the conversions, for the next export.
+
+    def clear_cache(self):
+        """Forget the gdspy elements and ground plane booleans kept from the
+        previous exports, and reset the statistics of get_cache_stats().
+
+        The next export_to_gds() converts every component again.
+        """
+        # key=(component id, digest of its rows, digest of the options),
+        # value=list of the gdspy elements of the rows
+        self._element_cache = dict()
+        # key=(chip name, layer), value=(signature of the input, gdspy result)
+        self._boolean_cache = dict()
+        # Keys of self._element_cache used by the export in progress
+        self._element_cache_used = set()
+        self._cache_stats = Dict(element_hits=0,
+                                 element_misses=0,
+                                 boolean_hits=0,
+                                 boolean_misses=0)
+
+    def get_cache_stats(self) -> Dict:
+        """Get the use of the cache by export_to_gds(), since the renderer was
+        created or clear_cache() was called.
+
+        Returns:
+            Dict: element_hits and element_misses count the components of a
+            chip layer whose qgeometry was, or was not, converted by a previous
+            export.  boolean_hits and boolean_misses count the chip layers
+            whose ground plane boolean was, or was not, reused.
+        """
+        return Dict(self._cache_stats)
+
+    def _prune_cache(self):
+        """Drop the gdspy elements which were not used by the last export."""
+        self._element_cache = {
+            key: value
+            for key, value in self._element_cache.items()
+            if key in self._element_cache_used
+        }
+        self._element_cache_used = set()
+
+    def _get_conversion_options(self) -> tuple:
+        """Get the options which change the result of _qgeometry_to_gds().
+
+        Returns:
+            tuple: Parsed values of the options.
+        """
+        return tuple(
+            repr(self.parse_value(self.options[name]))
+            for name in ('corners', 'tolerance', 'precision', 'max_points',
+                         'width_LineString'))
+
+    @staticmethod
+    def _get_row_digests(table: geopandas.GeoDataFrame) -> List[bytes]:
+        """Get a digest of the content of each row of a table.
+
+        Args:
+            table (geopandas.GeoDataFrame): Rows of qgeometry.
+
+        Returns:
+            List[bytes]: Digest of each row.  The 'index' column, added by
+            reset_index(), is left out.
+        """
+        all_wkb = shapely.to_wkb(table.geometry.values.data)
+        other_columns = [
+            position for position, column in enumerate(table.columns)
+            if column not in ('geometry', 'index')
+        ]
+        all_values = table.to_numpy(dtype=object)[:, other_columns].tolist()
+        return [
+            hashlib.blake2b(wkb + repr(values).encode(),
+                            digest_size=16).digest()
+            for wkb, values in zip(all_wkb, all_values)
+        ]
+
+    def _qgeometry_table_to_gds(self,
+                                table: geopandas.GeoDataFrame,
+                                digests: List[bytes] = None) -> list:
+        """Convert a table with _qgeometry_batch_to_gds(), but the gdspy
+        elements of each component are kept for the next export, until its
+        rows or the options change.
+
+        Args:
+            table (geopandas.GeoDataFrame): Rows for a chip and layer.
+            digests (List[bytes], optional): From _get_row_digests(table).
+                Defaults to None, to compute them.
+
+        Returns:
+            list: The gdspy elements of the components, in the order of the
+            table.
+        """
+        if digests is None:
+            digests = self._get_row_digests(table)
+        options = self._get_conversion_options()
+
+        # Positions of the rows of each component, in the order of the table.
+        component_ids, first, inverse = np.unique(table['component'].to_numpy(),
+                                                  return_index=True,
+                                                  return_inverse=True)
+        all_positions = np.split(
+            np.argsort(inverse, kind='stable'),
+            np.cumsum(np.bincount(inverse, minlength=len(component_ids)))[:-1])
+
+        keys = list()
+        missing = list()
+        for index in np.argsort(first):
+            component_id = component_ids[index]
+            positions = all_positions[index]
+            digest = hashlib.blake2b(b''.join(
+                digests[position] for position in positions)).digest()
+            key = (component_id, digest, options)
+            keys.append(key)
+            self._element_cache_used.add(key)
+            if key in self._element_cache:
+                self._cache_stats.element_hits += 1
+            else:
+                self._cache_stats.element_misses += 1
+                missing.append(positions)
+
+        if missing:
+            if len(missing) < len(keys):
+                table = table.iloc[np.sort(np.concatenate(missing))]
+            converted = self._qgeometry_batch_to_gds(table)
+            for key in keys:
+                if key not in self._element_cache:
+                    self._element_cache[key] = converted.get(key[0], [])
+
+        return [element for key in keys for element in self._element_cache[key]]
+
+    def _cached_ground_boolean(
+        self, chip_name: str, chip_layer: int, precision: float,
+        max_points: int, subtract: Callable[[], Union[gdspy.PolygonSet, None]]
+    ) -> Union[gdspy.PolygonSet, None]:
+        """Get the ground plane boolean of a chip layer from the previous
+        export, if its qgeometry and options have not changed.
+
+        Args:
+            chip_name (str): Name of chip to render.
+            chip_layer (int): Layer of the chip to render.
+            precision (float): Used for gdspy.
+            max_points (int): Used for gdspy. GDSpy uses 199 as the default.
+            subtract (Callable[[], Union[gdspy.PolygonSet, None]]): Does the
+                boolean, when it is not in the cache.
+
+        Returns:
+            Union[gdspy.PolygonSet, None]: The result of subtract().
+        """
+        if is_true(self.options.streaming):
+            # Keeping the result would hold the ground of every layer.
+            self._boolean_cache.pop((chip_name, chip_layer), None)
+            return subtract()
+
+        signature = (
+            self._is_negative_mask(chip_name, chip_layer),
+            self.chip_info[chip_name][chip_layer]['digest_true'],
+            self.chip_info[chip_name][chip_layer]['digest_false'],
+            self.chip_info[chip_name]['subtract_poly'].polygons[0].tobytes(),
+            precision, max_points, self._get_tiled_boolean_options(),
+            self._get_conversion_options())
+        cached = self._boolean_cache.get((chip_name, chip_layer))
+        if cached is not None and cached[0] == signature:
+            self._cache_stats.boolean_hits += 1
+            return cached[1]
+
+        self._cache_stats.boolean_misses += 1
+        result = subtract()
+        self._boolean_cache[(chip_name, chip_layer)] = (signature, result)
+        return result
+
+    # Hierarchical export.
+
+    @staticmethod
+    def _get_local_geometry(table: geopandas.GeoDataFrame, origin: tuple,
+                            rotation: float) -> np.ndarray:
+        """Move the geometry of a component to its own frame, that is, undo
+        the translation to origin and the rotation about it.
+
+        Args:
+            table (geopandas.GeoDataFrame): Rows of the component.
+            origin (tuple): (x, y) position of the component.
+            rotation (float): Orientation of the component in degrees.
+
+        Returns:
+            np.ndarray: The shapely geometry of each row, in its own frame.
+        """
+        cos, sin = np.cos(np.radians(rotation)), np.sin(np.radians(rotation))
+        matrix = np.array([[cos, -sin], [sin, cos]])
+
+        def to_local(coords: np.ndarray) -> np.ndarray:
+            return (coords - origin) @ matrix
+
+        return shapely.transform(table.geometry.values.data, to_local)
+
+    def _get_component_variants(self, table: geopandas.GeoDataFrame) -> dict:
+        """Find the components which only differ by their position and
+        orientation.
+
+        Components of the same class with the same parsed options, apart from
+        pos_x, pos_y and orientation, are expected to have the same qgeometry
+        in their own frame.  This is checked, so a component whose qgeometry
+        also depends on other components is exported as usual.
+
+        Args:
+            table (geopandas.GeoDataFrame): The qgeometry of a chip to export.
+
+        Returns:
+            dict: key=component id, value=(variant number, component id of the
+            first component of the variant, (pos_x, pos_y), orientation).
+            Only the components which share their variant are included.
+        """
+        # pylint: disable=protected-access
+        placement_keys = ('pos_x', 'pos_y', 'orientation')
+        precision = float(self.parse_value(self.options.precision))
+        rows = table.groupby('component', sort=False).indices
+
+        candidates = dict()
+        placements = dict()
+        for component_id in rows:
+            component = self.design._components.get(component_id)
+            if component is None:
+                continue
+            options = component.parse_options()
+            if not all(key in options for key in placement_keys):
+                continue
+            key = (type(component),
+                   self.design._freeze_value({
+                       name: value
+                       for name, value in options.items()
+                       if name not in placement_keys
+                   }))
+            try:
+                candidates.setdefault(key, []).append(component_id)
+            except TypeError:
+                # An option value which cannot be hashed.
+                continue
+            placements[component_id] = ((float(options.pos_x),
+                                         float(options.pos_y)),
+                                        float(options.orientation))
+
+        columns = [
+            name for name in ('name', 'layer', 'subtract', 'width', 'fillet')
+            if name in table.columns
+        ]
+        variants = dict()
+        for component_ids in candidates.values():
+            if len(component_ids) < 2:
+                continue
+            first_id = component_ids[0]
+            first = table.iloc[rows[first_id]]
+            first_geometry = self._get_local_geometry(first,
+                                                      *placements[first_id])
+            members = [first_id]
+            for component_id in component_ids[1:]:
+                other = table.iloc[rows[component_id]]
+                if not other[columns].reset_index(drop=True).equals(
+                        first[columns].reset_index(drop=True)):
+                    continue
+                other_geometry = self._get_local_geometry(
+                    other, *placements[component_id])
+                if shapely.equals_exact(other_geometry, first_geometry,
+                                        precision).all():
+                    members.append(component_id)
+
+            if len(members) > 1:
+                number = len({variant[0] for variant in variants.values()})
+                for component_id in members:
+                    variants[component_id] = (number, first_id,
+                                              *placements[component_id])
+        return variants
+
+    def _variants_to_gds(self, table: geopandas.GeoDataFrame, variants: dict,
+                         cell_name: str) -> list:
+        """Convert the rows of a table to gdspy, as _qgeometry_table_to_gds()
+        does, except for the components of a variant.  The rows of the first
+        component of each variant are converted once, in its own frame, into
+        a cell.  Each component of the variant is then a CellReference.
+
+        Args:
+            table (geopandas.GeoDataFrame): Rows for a chip and layer.
+            variants (dict): From _get_component_variants().
+            cell_name (str): Prefix for the name of the cell of each variant.
+
+        Returns:
+            list: The gdspy elements and references.
+        """
+        in_variant = table['component'].isin(list(variants))
+        elements = self._qgeometry_table_to_gds(table[~in_variant])
+
+        table = table[in_variant]
+        rows = table.groupby('component', sort=False).indices
+        cells = dict()
+        for component_id in rows:
+            number, first_id, origin, rotation = variants[component_id]
+            if number not in cells:
+                first = table.iloc[rows[first_id]].copy()
+                first['geometry'] = self._get_local_geometry(
+                    first, *variants[first_id][2:])
+                cells[number] = gdspy.Cell(f'{cell_name}_{number}',
+                                           exclude_from_current=True)
+                cells[number].add(
+                    self._qgeometry_batch_to_gds(first).get(first_id, []))
+            elements.append(
+                gdspy.CellReference(cells[number],
+                                    origin=origin,
+                                    rotation=rotation))
+        return elements
 
     # Handling Fillet issues.
 
@@ -736,10 +1115,12 @@ class QGDSRenderer(QRenderer):
                                          all_sub_true_or_false: str):
         """Update self.chip_info geopandas.GeoDataFrame.
 
-        Will iterate through the rows to examine the LineString.
-        Then determine if there is a segment that is shorter than the criteria
-        based on default_options. If so, then remove the row, and append
-        shorter LineString with no fillet, within the dataframe.
+        Flag the vertices of every filleted LineString at once, using
+        bad_fillet_mask. Then, only the LineStrings with a segment that is
+        shorter than the criteria based on the fillet are split into shorter
+        LineStrings, with and without fillet.  The rows of the split
+        LineStrings are removed, and the rows of the shorter LineStrings are
+        added at the end of the dataframe, with one concat.
 
         Args:
             chip_name (str): The name of chip.
@@ -750,39 +1131,48 @@ class QGDSRenderer(QRenderer):
         # pylint: disable=too-many-locals
         data_frame = self.chip_info[chip_name][chip_layer][
             all_sub_true_or_false]
-        df_fillet = data_frame[-data_frame['fillet'].isnull()]
-
-        if not df_fillet.empty:
-            # Don't edit the table when iterating through the rows.
-            # Save info in dict and then edit the table.
-            edit_index = dict()
-            for index, row in df_fillet.iterrows():
-                # print(
-                #     f'With parse_value: {self.parse_value(row.fillet)}, '
-                #     f'row.fillet: {row.fillet}')
-                status, all_shapelys = self._check_length(
-                    row.geometry, row.fillet)
-                if status > 0:
-                    edit_index[index] = all_shapelys
-
-            df_copy = self.chip_info[chip_name][chip_layer][
-                all_sub_true_or_false].copy(deep=True)
-            for del_key, the_shapes in edit_index.items():
-                # copy row "index" into a new data-frame "status" times.
-                # Then replace the LONG shapely with all_shapelys.
-                # For any entries in edit_index, edit table here.
-                orig_row = df_copy.loc[del_key].copy(deep=True)
-                df_copy = df_copy.drop(index=del_key)
-
-                for dummy_new_row, short_shape in the_shapes.items():
-                    orig_row['geometry'] = short_shape['line']
-                    orig_row['fillet'] = short_shape['fillet']
-                    # Keep ignore_index=False, otherwise,
-                    # the other del_key will not be found.
-                    df_copy = df_copy.append(orig_row, ignore_index=False)
-
-            self.chip_info[chip_name][chip_layer][
-                all_sub_true_or_false] = df_copy.copy(deep=True)
+        fillet_rows = np.flatnonzero(data_frame['fillet'].notnull().to_numpy())
+        if not len(fillet_rows):
+            return
+
+        geometry = data_frame.geometry.to_numpy()[fillet_rows]
+        fillet = data_frame['fillet'].to_numpy()[fillet_rows]
+        num_coords = shapely.get_num_coordinates(geometry)
+        offsets = np.concatenate(([0], np.cumsum(num_coords)))
+        bad_vertex = bad_fillet_mask(
+            shapely.get_coordinates(geometry),
+            offsets,
+            fillet.astype(float),
+            precision=self.design.template_options.PRECISION)
+        num_bad = np.bincount(np.repeat(np.arange(len(fillet_rows)),
+                                        num_coords)[bad_vertex],
+                              minlength=len(fillet_rows))
+
+        # Split only the LineStrings with short segments.
+        split_rows = list()
+        new_lines = list()
+        new_fillets = list()
+        for idx in np.flatnonzero(num_bad):
+            status, all_shapelys = self._check_length(geometry[idx],
+                                                      fillet[idx])
+            if status > 0:
+                split_rows += [fillet_rows[idx]] * len(all_shapelys)
+                for short_shape in all_shapelys.values():
+                    new_lines.append(short_shape['line'])
+                    new_fillets.append(short_shape['fillet'])
+        if not split_rows:
+            return
+
+        # Copy the row of a split LineString once for each shorter LineString.
+        # The copies keep the index of the original row.
+        new_rows = data_frame.iloc[split_rows].copy()
+        new_rows['geometry'] = new_lines
+        new_rows['fillet'] = new_fillets
+        keep = np.ones(len(data_frame), dtype=bool)
+        keep[split_rows] = False
+        self.chip_info[chip_name][chip_layer][
+            all_sub_true_or_false] = pd.concat(
+                [data_frame.iloc[keep], new_rows])
 
     def _check_length(self, a_shapely: shapely.geometry.LineString,
                       a_fillet: float) -> Tuple[int, Dict]:
@@ -1226,26 +1616,34 @@ class QGDSRenderer(QRenderer):
         """Iterate through each chip, then layer to determine the cheesing
         geometry."""
 
-        # lib = self.lib
-        cheese_sub_layer = int(self.parse_value(self.options.cheese.datatype))
-        nocheese_sub_layer = int(
-            self.parse_value(self.options.no_cheese.datatype))
-
         for chip_name in self.chip_info:
             layers_in_chip = self.design.qgeometry.get_all_unique_layers(
                 chip_name)
 
             for chip_layer in layers_in_chip:
-                code = self._check_cheese(chip_name, chip_layer)
-                if code == 1:
-                    chip_box, status = self.design.get_x_y_for_chip(chip_name)
-                    if status == 0:
-                        minx, miny, maxx, maxy = chip_box
+                self._cheese_for_layer(chip_name, chip_layer)
+
+    def _cheese_for_layer(self, chip_name: str, chip_layer: int):
+        """Same as _populate_cheese(), for one chip and layer.
+
+        Args:
+            chip_name (str): Name of chip to render.
+            chip_layer (int): Layer of the chip to render.
+        """
+        # lib = self.lib
+        cheese_sub_layer = int(self.parse_value(self.options.cheese.datatype))
+        nocheese_sub_layer = int(
+            self.parse_value(self.options.no_cheese.datatype))
 
-                        self._cheese_based_on_shape(minx, miny, maxx, maxy,
-                                                    chip_name, chip_layer,
-                                                    cheese_sub_layer,
-                                                    nocheese_sub_layer)
+        code = self._check_cheese(chip_name, chip_layer)
+        if code == 1:
+            chip_box, status = self.design.get_x_y_for_chip(chip_name)
+            if status == 0:
+                minx, miny, maxx, maxy = chip_box
+
+                self._cheese_based_on_shape(minx, miny, maxx, maxy, chip_name,
+                                            chip_layer, cheese_sub_layer,
+                                            nocheese_sub_layer)
 
     def _cheese_based_on_shape(self, minx: float, miny: float, maxx: float,
                                maxy: float, chip_name: str, chip_layer: int,
@@ -1279,6 +1677,8 @@ class QGDSRenderer(QRenderer):
         precision = float(self.parse_value(self.options.precision))
         is_neg_mask = self._is_negative_mask(chip_name, chip_layer)
         fab = is_true(self.options.fabricate)
+        tile_size, max_workers = self._get_tiled_boolean_options()
+        engine = self.options.cheese.engine
 
         if cheese_shape == 0:
             cheese_x = float(self.parse_value(self.options.cheese.cheese_0_x))
@@ -1304,7 +1704,10 @@ class QGDSRenderer(QRenderer):
                                 shape_0_x=cheese_x,
                                 shape_0_y=cheese_y,
                                 delta_x=delta_x,
-                                delta_y=delta_y)
+                                delta_y=delta_y,
+                                tile_size=tile_size,
+                                max_workers=max_workers,
+                                engine=engine)
         elif cheese_shape == 1:
             cheese_radius = float(
                 self.parse_value(self.options.cheese.cheese_1_radius))
@@ -1328,7 +1731,10 @@ class QGDSRenderer(QRenderer):
                                 cheese_shape=cheese_shape,
                                 shape_1_radius=cheese_radius,
                                 delta_x=delta_x,
-                                delta_y=delta_y)
+                                delta_y=delta_y,
+                                tile_size=tile_size,
+                                max_workers=max_workers,
+                                engine=engine)
         else:
             self.logger.warning(
                 f'The cheese_shape={cheese_shape} is unknown in QGDSRenderer.')
@@ -1348,8 +1754,20 @@ class QGDSRenderer(QRenderer):
         is data_type and denoted in the options.
         """
 
-        # pylint: disable=too-many-nested-blocks
+        for chip_name, _ in self.chip_info.items():
+            layers_in_chip = self.design.qgeometry.get_all_unique_layers(
+                chip_name)
+
+            for chip_layer in layers_in_chip:
+                self._no_cheese_for_layer(chip_name, chip_layer)
+
+    def _no_cheese_for_layer(self, chip_name: str, chip_layer: int):
+        """Same as _populate_no_cheese(), for one chip and layer.
 
+        Args:
+            chip_name (str): Name of chip to render.
+            chip_layer (int): Layer of the chip to render.
+        """
         no_cheese_buffer = float(self.parse_value(
             self.options.no_cheese.buffer))
         sub_layer = int(self.parse_value(self.options.no_cheese.datatype))
@@ -1357,56 +1775,47 @@ class QGDSRenderer(QRenderer):
 
         fab = is_true(self.options.fabricate)
 
-        for chip_name, _ in self.chip_info.items():
-            layers_in_chip = self.design.qgeometry.get_all_unique_layers(
-                chip_name)
+        code = self._check_either_cheese(chip_name, chip_layer)
 
-            for chip_layer in layers_in_chip:
-                code = self._check_either_cheese(chip_name, chip_layer)
-
-                if code in (1, 2, 3):
-                    if len(self.chip_info[chip_name][chip_layer]
-                           ['all_subtract_true']) != 0:
-
-                        sub_df = self.chip_info[chip_name][chip_layer][
-                            'all_subtract_true']
-                        no_cheese_multipolygon = self._cheese_buffer_maker(
-                            sub_df, chip_name, no_cheese_buffer)
-
-                        if no_cheese_multipolygon is not None:
-                            self.chip_info[chip_name][chip_layer][
-                                'no_cheese'] = no_cheese_multipolygon
-                            sub_layer = int(
-                                self.parse_value(
-                                    self.options.no_cheese.datatype))
-                            all_nocheese_gds = self._multipolygon_to_gds(
-                                no_cheese_multipolygon, chip_layer, sub_layer,
-                                no_cheese_buffer)
-                            self.chip_info[chip_name][chip_layer][
-                                'no_cheese_gds'] = all_nocheese_gds
-
-                            # If fabricate.fab is true, then
-                            # do not put nocheese in gds file.
-                            if self._check_no_cheese(
-                                    chip_name, chip_layer) == 1 and not fab:
-                                no_cheese_subtract_cell_name = (
-                                    f'TOP_{chip_name}_{chip_layer}'
-                                    f'_NoCheese_{sub_layer}')
-                                no_cheese_cell = lib.new_cell(
-                                    no_cheese_subtract_cell_name,
-                                    overwrite_duplicate=True)
-
-                                no_cheese_cell.add(all_nocheese_gds)
-
-                                # Keep the cell out to layer, it becomes part of ground.
-                                chip_only_top_name = f'TOP_{chip_name}'
-
-                                if no_cheese_cell.get_bounding_box(
-                                ) is not None:
-                                    lib.cells[chip_only_top_name].add(
-                                        gdspy.CellReference(no_cheese_cell))
-                                else:
-                                    lib.remove(no_cheese_cell)
+        if code in (1, 2, 3):
+            if len(self.chip_info[chip_name][chip_layer]
+                   ['all_subtract_true']) != 0:
+
+                sub_df = self.chip_info[chip_name][chip_layer][
+                    'all_subtract_true']
+                no_cheese_multipolygon = self._cheese_buffer_maker(
+                    sub_df, chip_name, no_cheese_buffer)
+
+                if no_cheese_multipolygon is not None:
+                    self.chip_info[chip_name][chip_layer][
+                        'no_cheese'] = no_cheese_multipolygon
+                    all_nocheese_gds = self._multipolygon_to_gds(
+                        no_cheese_multipolygon, chip_layer, sub_layer,
+                        no_cheese_buffer)
+                    self.chip_info[chip_name][chip_layer][
+                        'no_cheese_gds'] = all_nocheese_gds
+
+                    # If fabricate.fab is true, then
+                    # do not put nocheese in gds file.
+                    if self._check_no_cheese(chip_name,
+                                             chip_layer) == 1 and not fab:
+                        no_cheese_subtract_cell_name = (
+                            f'TOP_{chip_name}_{chip_layer}'
+                            f'_NoCheese_{sub_layer}')
+                        no_cheese_cell = lib.new_cell(
+                            no_cheese_subtract_cell_name,
+                            overwrite_duplicate=True)
+
+                        no_cheese_cell.add(all_nocheese_gds)
+
+                        # Keep the cell out to layer, it becomes part of ground.
+                        chip_only_top_name = f'TOP_{chip_name}'
+
+                        if no_cheese_cell.get_bounding_box() is not None:
+                            lib.cells[chip_only_top_name].add(
+                                gdspy.CellReference(no_cheese_cell))
+                        else:
+                            lib.remove(no_cheese_cell)
 
     def _cheese_buffer_maker(
         self, sub_df: geopandas.GeoDataFrame, chip_name: str,
@@ -1614,30 +2023,35 @@ class QGDSRenderer(QRenderer):
         """
         if len(self.chip_info[chip_name][chip_layer]['q_subtract_true']) != 0:
 
-            # When subtract==True for chip and layer.
-            subtract_true_cell_name = f'SUBTRACT_true_{chip_name}_{chip_layer}'
-            subtract_true_cell = lib.new_cell(subtract_true_cell_name,
-                                              overwrite_duplicate=True)
-            subtract_true_cell.add(
-                self.chip_info[chip_name][chip_layer]['q_subtract_true'])
-
-            #When subtract==False for chip and layer.
-            subtract_false_cell_name = f'SUBTRACT_false_{chip_name}_{chip_layer}'
-            subtract_false_cell = lib.new_cell(subtract_false_cell_name,
-                                               overwrite_duplicate=True)
-            subtract_false_cell.add(
-                self.chip_info[chip_name][chip_layer]['q_subtract_false'])
-
-            # Difference for True-False.
-            diff_geometry = gdspy.boolean(subtract_true_cell.get_polygons(),
-                                          subtract_false_cell.get_polygons(),
-                                          'not',
-                                          max_points=max_points,
-                                          precision=precision,
-                                          layer=chip_layer)
+            def subtract() -> Union[gdspy.PolygonSet, None]:
+                # When subtract==True for chip and layer.
+                subtract_true_cell_name = (f'SUBTRACT_true_{chip_name}_'
+                                           f'{chip_layer}')
+                subtract_true_cell = lib.new_cell(subtract_true_cell_name,
+                                                  overwrite_duplicate=True)
+                subtract_true_cell.add(
+                    self.chip_info[chip_name][chip_layer]['q_subtract_true'])
+
+                #When subtract==False for chip and layer.
+                subtract_false_cell_name = (f'SUBTRACT_false_{chip_name}_'
+                                            f'{chip_layer}')
+                subtract_false_cell = lib.new_cell(subtract_false_cell_name,
+                                                   overwrite_duplicate=True)
+                subtract_false_cell.add(
+                    self.chip_info[chip_name][chip_layer]['q_subtract_false'])
+
+                # Difference for True-False.
+                diff = self._ground_boolean(subtract_true_cell.get_polygons(),
+                                            subtract_false_cell.get_polygons(),
+                                            chip_layer, precision, max_points)
 
-            lib.remove(subtract_true_cell)
-            lib.remove(subtract_false_cell)
+                lib.remove(subtract_true_cell)
+                lib.remove(subtract_false_cell)
+                return diff
+
+            diff_geometry = self._cached_ground_boolean(chip_name, chip_layer,
+                                                        precision, max_points,
+                                                        subtract)
 
             if diff_geometry is None:
                 self.design.logger.warning(
@@ -1664,27 +2078,32 @@ class QGDSRenderer(QRenderer):
             max_points (int): Used for gdspy. GDSpy uses 199 as the default.
         """
         if len(self.chip_info[chip_name][chip_layer]['q_subtract_true']) != 0:
-            subtract_cell_name = f'SUBTRACT_{chip_name}_{chip_layer}'
-            subtract_cell = lib.new_cell(subtract_cell_name,
-                                         overwrite_duplicate=True)
-            subtract_cell.add(
-                self.chip_info[chip_name][chip_layer]['q_subtract_true'])
-
-            # gdspy.boolean() is not documented clearly.  If there are multiple
-            # elements to subtract (both poly & path), the way I could
-            # make it work is to put them into a cell, within lib. I used
-            # the method cell_name.get_polygons(), which appears to convert
-            # all elements within the cell to poly. After the boolean(),
-            # I deleted the cell from lib. The memory is freed up then.
-            diff_geometry = gdspy.boolean(
-                self.chip_info[chip_name]['subtract_poly'],
-                subtract_cell.get_polygons(),
-                'not',
-                max_points=max_points,
-                precision=precision,
-                layer=chip_layer)
-
-            lib.remove(subtract_cell)
+
+            def subtract() -> Union[gdspy.PolygonSet, None]:
+                subtract_cell_name = f'SUBTRACT_{chip_name}_{chip_layer}'
+                subtract_cell = lib.new_cell(subtract_cell_name,
+                                             overwrite_duplicate=True)
+                subtract_cell.add(
+                    self.chip_info[chip_name][chip_layer]['q_subtract_true'])
+
+                # gdspy.boolean() is not documented clearly.  If there are
+                # multiple elements to subtract (both poly & path), the way I
+                # could make it work is to put them into a cell, within lib.
+                # I used the method cell_name.get_polygons(), which appears to
+                # convert all elements within the cell to poly. After the
+                # boolean(), I deleted the cell from lib. The memory is freed
+                # up then.
+                diff = self._ground_boolean(
+                    self.chip_info[chip_name]['subtract_poly'],
+                    subtract_cell.get_polygons(), chip_layer, precision,
+                    max_points)
+
+                lib.remove(subtract_cell)
+                return diff
+
+            diff_geometry = self._cached_ground_boolean(chip_name, chip_layer,
+                                                        precision, max_points,
+                                                        subtract)
 
             if diff_geometry is None:
                 self.design.logger.warning(
@@ -1696,15 +2115,52 @@ class QGDSRenderer(QRenderer):
                 ground_chip_layer.add(diff_geometry)
                 ground_cell.add(gdspy.CellReference(ground_chip_layer))
 
-        self._handle_q_subtract_false(chip_name, chip_layer, ground_cell)
+        self._handle_q_subtract_false(lib, chip_name, chip_layer, ground_cell)
         QGDSRenderer._add_groundcell_to_chip_only_top(lib, chip_only_top,
                                                       ground_cell)
 
-    def _handle_q_subtract_false(self, chip_name: str, chip_layer: int,
+    def _ground_boolean(self, operand1, operand2, chip_layer: int,
+                        precision: float,
+                        max_points: int) -> Union[gdspy.PolygonSet, None]:
+        """Subtract operand2 from operand1 for the ground plane of a layer,
+        split into tiles if requested by self.options.tiled_boolean.
+
+        Args:
+            operand1: Polygons to subtract from, as used for gdspy.boolean().
+            operand2: Polygons to subtract, as used for gdspy.boolean().
+            chip_layer (int): Layer of the chip to render.
+            precision (float): Used for gdspy.
+            max_points (int): Used for gdspy. GDSpy uses 199 as the default.
+
+        Returns:
+            Union[gdspy.PolygonSet, None]: The difference, or None if empty.
+        """
+        tile_size, max_workers = self._get_tiled_boolean_options()
+        return tiled_boolean(operand1,
+                             operand2,
+                             'not',
+                             precision,
+                             max_points,
+                             layer=chip_layer,
+                             tile_size=tile_size,
+                             max_workers=max_workers)
+
+    def _get_tiled_boolean_options(self) -> Tuple[float, int]:
+        """Parse self.options.tiled_boolean.
+
+        Returns:
+            Tuple[float, int]: The tile_size and max_workers.
+        """
+        return (float(self.parse_value(self.options.tiled_boolean.tile_size)),
+                int(self.parse_value(self.options.tiled_boolean.max_workers)))
+
+    def _handle_q_subtract_false(self, lib: gdspy.GdsLibrary, chip_name: str,
+                                 chip_layer: int,
                                  ground_cell: gdspy.library.Cell):
         """For each layer, add the subtract=false components to ground.
 
         Args:
+            lib (gdspy.GdsLibrary): The gdspy library to export.
             chip_name (str): Name of chip to render.
             chip_layer (int): Name of layer to render.
             ground_cell (gdspy.library.Cell): The cell in lib to add to.
@@ -1719,6 +2175,8 @@ class QGDSRenderer(QRenderer):
                    ['q_subtract_false']) != 0:
                 ground_cell.add(
                     self.chip_info[chip_name][chip_layer]['q_subtract_false'])
+                # Cells of the variants, when the export is hierarchical.
+                lib.add(ground_cell)
 
     @classmethod
     def _add_groundcell_to_chip_only_top(cls, lib: gdspy.GdsLibrary,
@@ -1837,7 +2295,6 @@ class QGDSRenderer(QRenderer):
 
         return rotation, center, pad_left, pad_right
 
-
 ############
 
     def _import_junction_gds_file(self, lib: gdspy.library,
@@ -1861,7 +2318,7 @@ class QGDSRenderer(QRenderer):
             return True
 
         if os.path.isfile(self.options.path_filename):
-            lib.read_gds(self.options.path_filename, units='convert')
+            self._read_junction_gds_file(lib, self.options.path_filename)
             self.imported_junction_gds = self.options.path_filename
             return True
         else:
@@ -1872,6 +2329,42 @@ class QGDSRenderer(QRenderer):
             self.logger.warning(message_str)
             return False
 
+    @staticmethod
+    def _read_junction_gds_file(lib: gdspy.GdsLibrary, path_filename: str):
+        """Same as lib.read_gds(path_filename, units='convert'), but the
+        file is only parsed once by the process, until it is modified.  The
+        cells are shared by every export, so they must not be edited.
+
+        Args:
+            lib (gdspy.GdsLibrary): The library used to export the entire
+                                    QDesign.
+            path_filename (str): The GDS file with the junctions.
+        """
+        path = os.path.abspath(path_filename)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        key = (path, lib.unit, lib.precision)
+
+        cached = _JUNCTION_GDS_CACHE.get(key)
+        if cached is None or cached[0] != version:
+            junction_lib = gdspy.GdsLibrary(unit=lib.unit,
+                                            precision=lib.precision)
+            junction_lib.read_gds(path, units='convert')
+            cached = (version, junction_lib.name,
+                      list(junction_lib.cells.values()))
+            _JUNCTION_GDS_CACHE[key] = cached
+
+        lib.name = cached[1]
+        lib.add(cached[2])
+
+    @staticmethod
+    def clear_junction_gds_cache():
+        """Forget the junction files which were read by the exports of this
+        process.  The next export reads path_filename again, even if the file
+        was not modified.
+        """
+        _JUNCTION_GDS_CACHE.clear()
+
     def _import_junctions_to_one_cell(self, chip_name: str, lib: gdspy.library,
                                       chip_only_top: gdspy.library.Cell,
                                       layers_in_chip: list):
@@ -1898,8 +2391,8 @@ class QGDSRenderer(QRenderer):
         # Make sure the file exists, before trying to read it.
         dummy_status, directory_name = can_write_to_path(
             self.options.path_filename)
-        layers_in_junction_table = set(
-            self.chip_info[chip_name]['junction']['layer'])
+        junction_table = self.chip_info[chip_name]['junction']
+        layers_in_junction_table = set(junction_table['layer'])
 
         if self._import_junction_gds_file(lib=lib,
                                           directory_name=directory_name):
@@ -1930,25 +2423,23 @@ class QGDSRenderer(QRenderer):
                                 hold_all_jj_cell)
                 else:
                     # By default, make a positive mask.
-                    for row in self.chip_info[chip_name]['junction'].itertuples(
-                    ):
-                        chip_layer = int(row.layer)
-                        ground_cell_name = f'TOP_{chip_name}_{chip_layer}'
-
-                        if ground_cell_name in lib.cells.keys(
-                        ) and chip_layer == iter_layer:
-                            chip_layer_cell = lib.cells[ground_cell_name]
-
-                            if row.gds_cell_name in lib.cells.keys():
-                                # When positive mask, just add the pads to chip_only_top
-                                self._add_positive_extension_to_jj(
-                                    lib, row, chip_layer_cell)
-                            else:
-                                self.logger.warning(
-                                    f'From the "junction" table, the cell named'
-                                    f' "{row.gds_cell_name}"",  is not in '
-                                    f'file: {self.options.path_filename}.'
-                                    f' The cell was not used.')
+                    ground_cell_name = f'TOP_{chip_name}_{iter_layer}'
+                    if ground_cell_name not in lib.cells.keys():
+                        continue
+                    chip_layer_cell = lib.cells[ground_cell_name]
+
+                    for row in junction_table[junction_table['layer'].astype(
+                            int) == iter_layer].itertuples():
+                        if row.gds_cell_name in lib.cells.keys():
+                            # When positive mask, just add the pads to chip_only_top
+                            self._add_positive_extension_to_jj(
+                                lib, row, chip_layer_cell)
+                        else:
+                            self.logger.warning(
+                                f'From the "junction" table, the cell named'
+                                f' "{row.gds_cell_name}"",  is not in '
+                                f'file: {self.options.path_filename}.'
+                                f' The cell was not used.')
 
     def _add_negative_extension_to_jj(self, chip_name: str, jj_layer: int,
                                       lib: gdspy.library,
@@ -2160,7 +2651,20 @@ class QGDSRenderer(QRenderer):
         # if imported, hold the path to file name, otherwise None.
         self.imported_junction_gds = None
 
+        if self._use_parallel_chips():
+            if self._populate_chips_in_parallel(highlight_qcomponents) == 0:
+                self.lib.write_gds(file_name)
+                self._prune_cache()
+                return 1
+            return 0
+
         if self._create_qgeometry_for_gds(highlight_qcomponents) == 0:
+            if is_true(self.options.streaming) and is_true(
+                    self.options.ground_plane):
+                self._stream_to_gds(file_name)
+                self._prune_cache()
+                return 1
+
             # Create self.lib and populate path and poly.
             self._populate_poly_path_for_export()
 
@@ -2176,11 +2680,229 @@ class QGDSRenderer(QRenderer):
 
             # Export the file to disk from self.lib
             self.lib.write_gds(file_name)
+            self._prune_cache()
+
+            return 1
+
+        return 0
+
+    def _use_parallel_chips(self) -> bool:
+        """Check self.options.parallel_chips, and if the chips can be
+        exported by separate processes.
+
+        Returns:
+            bool: True if export_to_gds() should use
+            _populate_chips_in_parallel().
+        """
+        if len(self.chip_info) < 2 or not is_true(
+                self.options.parallel_chips.enable):
+            return False
+        if not is_true(self.options.ground_plane) or is_true(
+                self.options.streaming):
+            return False
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            self.logger.warning(
+                'The option parallel_chips needs multiprocessing to fork, '
+                'which is not available.  The chips will be exported one '
+                'after another.')
+            return False
+        return True
+
+    def _populate_chips_in_parallel(self, highlight_qcomponents: list) -> int:
+        """Same as _create_qgeometry_for_gds(),
+        _populate_poly_path_for_export(), _populate_no_cheese() and
+        _populate_cheese(), but each chip is done by _populate_one_chip() in
+        a forked process.  The cells of the chips are then added to a new
+        self.lib, under TOP.  The chip_info, dict_bounds and cache of each
+        chip are copied back to this renderer.
 
+        Args:
+            highlight_qcomponents (list): List of strings which denote the name
+                            of QComponents to render.
+                            If empty, render all components in design.
+
+        Returns:
+            int: 0 if all ended well.
+            Otherwise, 1 if QComponent name(s) not in design.
+        """
+        dummy_unique_qcomponents, status = self._check_qcomps(
+            highlight_qcomponents)
+        if status == 1:
             return 1
 
+        chip_names = list(self.chip_info)
+        max_workers = min(
+            len(chip_names),
+            int(self.parse_value(self.options.parallel_chips.max_workers)))
+        # The forked processes get a copy of this renderer, so it is not
+        # pickled.  Only the results are.
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=multiprocessing.get_context('fork'),
+                                 initializer=_init_chip_worker,
+                                 initargs=(self,)) as executor:
+            results = list(
+                executor.map(_populate_chip_worker, chip_names,
+                             [highlight_qcomponents] * len(chip_names)))
+
+        self.dict_bounds.clear()
+        lib = self.new_gds_library()
+        all_chips_top = lib.new_cell('TOP', overwrite_duplicate=True)
+        for chip_name, result in zip(chip_names, results):
+            self.chip_info[chip_name] = result.chip_info
+            self.dict_bounds[chip_name] = result.dict_bounds
+            if result.imported_junction_gds is not None:
+                self.imported_junction_gds = result.imported_junction_gds
+
+            self._element_cache.update(result.element_cache)
+            self._element_cache_used |= result.element_cache_used
+            self._boolean_cache.update(result.boolean_cache)
+            for key, value in result.cache_stats.items():
+                self._cache_stats[key] += value
+
+            # The cells imported for the junctions are the same for every
+            # chip, so they are kept once.
+            lib.add(result.cells, overwrite_duplicate=True)
+            chip_only_top = lib.cells.get(f'TOP_{chip_name}')
+            if chip_only_top is not None:
+                all_chips_top.add(gdspy.CellReference(chip_only_top))
         return 0
 
+    def _populate_one_chip(self, chip_name: str,
+                           highlight_qcomponents: list) -> Dict:
+        """Build the cells of one chip, as export_to_gds() does for every
+        chip.  Used in the processes of _populate_chips_in_parallel().
+
+        Args:
+            chip_name (str): Name of chip to render.
+            highlight_qcomponents (list): List of strings which denote the name
+                            of QComponents to render.
+                            If empty, render all components in design.
+
+        Returns:
+            Dict: The cells of self.lib except TOP, the chip_info and
+            dict_bounds of the chip, imported_junction_gds, and the entries
+            and statistics which were added to the cache.
+        """
+        # A process can do more than one chip, so start from the same state.
+        self.chip_info = {chip_name: Dict()}
+        self.imported_junction_gds = None
+        self._element_cache_used = set()
+        cached_keys = set(self._element_cache)
+        cache_stats = Dict(self._cache_stats)
+
+        self._create_qgeometry_for_gds(highlight_qcomponents)
+        self._populate_poly_path_for_export()
+        self._populate_no_cheese()
+        self._populate_cheese()
+
+        cells = [
+            cell for cell_name, cell in self.lib.cells.items()
+            if cell_name != 'TOP'
+        ]
+        element_cache = {
+            key: self._element_cache[key]
+            for key in self._element_cache_used
+            if key not in cached_keys
+        }
+        boolean_cache = {
+            key: value
+            for key, value in self._boolean_cache.items()
+            if key[0] == chip_name
+        }
+        for key, value in self._cache_stats.items():
+            cache_stats[key] = value - cache_stats[key]
+
+        return Dict(cells=cells,
+                    chip_info=self.chip_info[chip_name],
+                    dict_bounds=self.dict_bounds[chip_name],
+                    imported_junction_gds=self.imported_junction_gds,
+                    element_cache=element_cache,
+                    element_cache_used=self._element_cache_used,
+                    boolean_cache=boolean_cache,
+                    cache_stats=cache_stats)
+
+    def _stream_to_gds(self, file_name: str):
+        """Same as _populate_poly_path_for_export(), _populate_no_cheese() and
+        _populate_cheese(), then self.lib.write_gds(), but one chip and layer
+        at a time.  The cells made for a layer are written to file_name with
+        gdspy.GdsWriter as soon as the layer is complete, then removed from
+        self.lib and emptied.  The cells of the chips, TOP, and the cells
+        imported for the junctions are written last.
+
+        Args:
+            file_name (str): The path and file name to write the gds file.
+        """
+        precision = float(self.parse_value(self.options.precision))
+        max_points = int(self.parse_value(self.options.max_points))
+
+        lib = self.new_gds_library()
+        writer = gdspy.GdsWriter(file_name,
+                                 name=lib.name,
+                                 unit=lib.unit,
+                                 precision=lib.precision)
+
+        all_chips_top = lib.new_cell('TOP', overwrite_duplicate=True)
+
+        # The junctions of every layer use the cells of the same file.
+        if any('junction' in self.chip_info[chip_name]
+               for chip_name in self.chip_info):
+            dummy_status, directory_name = can_write_to_path(
+                self.options.path_filename)
+            self._import_junction_gds_file(lib=lib,
+                                           directory_name=directory_name)
+
+        for chip_name in self.chip_info:
+            chip_only_top = lib.new_cell(f'TOP_{chip_name}',
+                                         overwrite_duplicate=True)
+            layers_in_chip, rectangle_points = self._get_rectangle_points(
+                chip_name)
+
+            for chip_layer in layers_in_chip:
+                previous_cells = set(lib.cells)
+
+                self._handle_photo_resist(lib, chip_only_top, chip_name,
+                                          chip_layer, rectangle_points,
+                                          precision, max_points)
+                if 'junction' in self.chip_info[chip_name]:
+                    self._import_junctions_to_one_cell(chip_name, lib,
+                                                       chip_only_top,
+                                                       [chip_layer])
+                self._no_cheese_for_layer(chip_name, chip_layer)
+                self._cheese_for_layer(chip_name, chip_layer)
+
+                for cell_name in [
+                        name for name in lib.cells if name not in previous_cells
+                ]:
+                    cell = lib.cells.pop(cell_name)
+                    writer.write_cell(cell)
+                    # chip_only_top only needs the name of the cell.
+                    cell.polygons = []
+                    cell.paths = []
+                    cell.labels = []
+                    cell.references = []
+                for key in ('q_subtract_true', 'q_subtract_false',
+                            'no_cheese_gds'):
+                    self.chip_info[chip_name][chip_layer].pop(key, None)
+
+                # gdspy also keeps every new cell in current_library, such as
+                # the temporary cells of the booleans and of the cheesing.
+                current_cells = gdspy.current_library.cells
+                for cell_name in [
+                        name for name, cell in current_cells.items()
+                        if lib.cells.get(name) is not cell
+                ]:
+                    del current_cells[cell_name]
+
+            # The cells under chip_only_top are empty now.
+            if chip_only_top.references:
+                all_chips_top.add(gdspy.CellReference(chip_only_top))
+            else:
+                lib.remove(chip_only_top)
+
+        for cell in lib.cells.values():
+            writer.write_cell(cell)
+        writer.close()
+
     def _multipolygon_to_gds(
             self, multi_poly: shapely.geometry.multipolygon.MultiPolygon,
             layer: int, data_type: int, no_cheese_buffer: float) -> list:
@@ -2373,6 +3095,125 @@ class QGDSRenderer(QRenderer):
             f'method can currently handle Polygon and FlexPath.')
         return None
 
+    def _qgeometry_batch_to_gds(
+            self, table: geopandas.GeoDataFrame) -> Dict_[int, list]:
+        """Convert the rows of a table to gdspy, as _qgeometry_to_gds() does
+        for each row, but with the options parsed once.
+
+        The polygons without holes of a component and layer are put into one
+        PolygonSet, which is fractured at once.  The LineStrings are grouped
+        by width, fillet and layer, to build their FlexPath with the same
+        arguments.  The coordinates of both are read from shapely in one call.
+
+        Args:
+            table (geopandas.GeoDataFrame): Rows of qgeometry.
+
+        Returns:
+            Dict_[int, list]: key=component id, value=gdspy elements of its
+            rows.  The components are in the order of the table.
+        """
+        # pylint: disable=too-many-locals
+        corners = self.options.corners
+        tolerance = self.parse_value(self.options.tolerance)
+        precision = self.parse_value(self.options.precision)
+        max_points = int(self.parse_value(self.options.max_points))
+        width_linestring = self.parse_value(self.options.width_LineString)
+
+        all_elements = {
+            component_id: [] for component_id in table['component'].unique()
+        }
+        if len(table) == 0:
+            return all_elements
+
+        all_geometry = table.geometry.values.data
+        components = table['component'].to_numpy()
+        layers = table['layer'].to_numpy()
+        type_ids = shapely.get_type_id(all_geometry)
+        is_polygon = type_ids == 3
+        has_holes = is_polygon & (shapely.get_num_interior_rings(all_geometry) >
+                                  0)
+        # LineString or LinearRing
+        is_line = (type_ids == 1) | (type_ids == 2)
+
+        # Polygons without holes: one PolygonSet by component and layer.
+        positions = np.flatnonzero(is_polygon & ~has_holes)
+        exteriors = shapely.get_exterior_ring(all_geometry[positions])
+        all_points = np.split(
+            shapely.get_coordinates(exteriors),
+            np.cumsum(shapely.get_num_coordinates(exteriors))[:-1])
+        polygons = defaultdict(list)
+        for position, points in zip(positions, all_points):
+            polygons[(components[position], layers[position])].append(points)
+        for (component_id, layer), points in polygons.items():
+            all_elements[component_id].append(
+                gdspy.PolygonSet(points, layer=layer,
+                                 datatype=0).fracture(max_points=max_points,
+                                                      precision=precision))
+
+        # Polygons with holes: the holes are removed by a boolean.
+        for position in np.flatnonzero(has_holes):
+            all_elements[components[position]].append(
+                self._qgeometry_to_gds(table.iloc[position]))
+
+        # LineStrings: FlexPath with the same arguments for each group.
+        positions = np.flatnonzero(is_line)
+        if len(positions) and 'fillet' not in table.columns:
+            # Could be junction table with a linestring.
+            for position in positions:
+                self.logger.warning(
+                    f'Linestring did not have fillet in column. '
+                    f'The qgeometry_element was not drawn.\n'
+                    f'The qgeometry_element within table is:\n'
+                    f'{table.iloc[position]}')
+        elif len(positions):
+            all_points = np.split(
+                shapely.get_coordinates(all_geometry[positions]),
+                np.cumsum(shapely.get_num_coordinates(
+                    all_geometry[positions]))[:-1])
+            widths = table['width'].to_numpy(dtype=float)
+            fillets = table['fillet'].to_numpy(dtype=float)
+            for position in positions[np.isnan(widths[positions])]:
+                self.logger.warning(
+                    f'Since width:{widths[position]} for a Path is not a '
+                    f'number, it will be exported using width_LineString:'
+                    f' {width_linestring}.  The component_id is:'
+                    f'{components[position]}, name is:'
+                    f'{table["name"].iloc[position]}, layer is: '
+                    f'{layers[position]}')
+
+            paths = defaultdict(list)
+            for position, points in zip(positions, all_points):
+                width = widths[position]
+                fillet = fillets[position]
+                use_width = width_linestring if math.isnan(width) else width
+                if math.isnan(fillet) or fillet <= 0 or fillet < width:
+                    fillet = None
+                paths[(use_width, fillet, layers[position])].append(
+                    (components[position], points))
+
+            for (use_width, fillet, layer), all_paths in paths.items():
+                if fillet is None:
+                    arguments = dict(layer=layer,
+                                     max_points=max_points,
+                                     datatype=0)
+                else:
+                    arguments = dict(layer=layer,
+                                     datatype=0,
+                                     max_points=max_points,
+                                     corners=corners,
+                                     bend_radius=fillet,
+                                     tolerance=tolerance,
+                                     precision=precision)
+                for component_id, points in all_paths:
+                    all_elements[component_id].append(
+                        gdspy.FlexPath(points, use_width, **arguments))
+
+        # Anything else is not drawn, with a warning.
+        for position in np.flatnonzero(~is_polygon & ~is_line):
+            self._qgeometry_to_gds(table.iloc[position])
+
+        return all_elements
+
     def _get_chip_names(self) -> Dict:
         """Returns a dict of unique chip names for ALL tables within QGeometry.
         In another words, for every "path" table, "poly" table ... etc, this
@@ -2394,3 +3235,33 @@ class QGDSRenderer(QRenderer):
         for chip in unique_list:
             unique_dict[chip] = Dict()
         return unique_dict
+
+
+# The renderer of the processes of QGDSRenderer._populate_chips_in_parallel().
+_CHIP_WORKER_RENDERER = None  # type: QGDSRenderer
+
+
+def _init_chip_worker(renderer: QGDSRenderer):
+    """Keep the renderer, copied by fork, for _populate_chip_worker().
+
+    Args:
+        renderer (QGDSRenderer): The renderer which started the process.
+    """
+    global _CHIP_WORKER_RENDERER  # pylint: disable=global-statement
+    _CHIP_WORKER_RENDERER = renderer
+
+
+def _populate_chip_worker(chip_name: str, highlight_qcomponents: list) -> Dict:
+    """Call QGDSRenderer._populate_one_chip() in a process.
+
+    Args:
+        chip_name (str): Name of chip to render.
+        highlight_qcomponents (list): List of strings which denote the name
+                        of QComponents to render.
+
+    Returns:
+        Dict: The result of QGDSRenderer._populate_one_chip().
+    """
+    # pylint: disable=protected-access
+    return _CHIP_WORKER_RENDERER._populate_one_chip(chip_name,
+                                                    highlight_qcomponents)
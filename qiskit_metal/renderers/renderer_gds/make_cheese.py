@@ -14,11 +14,13 @@
 """ For GDS export, separate the logic for cheesing."""
 
 import logging
-from typing import Union
+from typing import List, Tuple, Union
 import gdspy
 import shapely
 import numpy as np
 
+from qiskit_metal.renderers.renderer_gds.tiled_boolean import tiled_boolean
+
 
 class Cheesing():
     """Create a cheese cell based on input of no-cheese locations."""
@@ -62,6 +64,13 @@ class Cheesing():
         # delta spacing for holes
         delta_x: float = 0.00010,
         delta_y: float = 0.00010,
+
+        # Tiles for the boolean of the ground and holes
+        tile_size: float = 0,
+        max_workers: int = 1,
+
+        # How to remove the no-cheese region from the grid of holes
+        engine: str = 'boolean',
     ):
         """Create the cheesing based on the no-cheese multi_poly.
 
@@ -109,6 +118,17 @@ class Cheesing():
                                     Defaults to 0.000025.
             delta_x (float, optional): The spacing between holes in x.
             delta_y (float, optional): The spacing between holes in y.
+            tile_size (float, optional): Split the subtraction of the holes
+                                    from the ground into tiles of this size.
+                                    Defaults to 0, for no tiles.
+            max_workers (int, optional): Number of processes for the tiles.
+                                    Defaults to 1.
+            engine (str, optional): 'boolean' to subtract the no-cheese region
+                                    from every hole.  'array' to place the
+                                    holes clear of the no-cheese region with
+                                    CellArrays, and to subtract it only from
+                                    the holes on its boundary.
+                                    Defaults to 'boolean'.
         """
 
         # All the no-cheese locations.
@@ -149,6 +169,10 @@ class Cheesing():
         self.delta_x = delta_x
         self.delta_y = delta_y
 
+        self.tile_size = tile_size
+        self.max_workers = max_workers
+        self.engine = engine
+
         self.cheese_cell = None
 
         # max dimension of grid is chip size reduced by self.edge_nocheese
@@ -290,10 +314,13 @@ class Cheesing():
         geometry. The cells are added to the Top_<chip_name>.
         """
 
-        gather_holes_cell = self._get_all_holes()
-        diff_holes_cell = self._subtract_keepout_from_hole_grid(
-            gather_holes_cell)
-        self.lib.remove(gather_holes_cell)
+        if self.engine == 'array':
+            diff_holes_cell = self._get_hole_arrays()
+        else:
+            gather_holes_cell = self._get_all_holes()
+            diff_holes_cell = self._subtract_keepout_from_hole_grid(
+                gather_holes_cell)
+            self.lib.remove(gather_holes_cell)
 
         cell_name = f'TOP_{self.chip_name}_{self.layer}'
         cell_layer = self.lib.cells[cell_name]
@@ -403,23 +430,153 @@ class Cheesing():
         gather_holes_cell = self.lib.new_cell(gather_holes_cell_name,
                                               overwrite_duplicate=True)
 
+        x_holes, y_holes = self._get_hole_grid()
+
+        if self.one_hole_cell is not None:
+            for x_loc in x_holes.tolist():
+                for y_loc in y_holes.tolist():
+                    gather_holes_cell.add(
+                        gdspy.CellReference(self.one_hole_cell,
+                                            origin=(x_loc, y_loc)))
+
+        return gather_holes_cell
+
+    def _get_hole_grid(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the locations of the holes for cheesing.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The x and y locations of the grid.
+        """
         x_holes = np.arange(self.grid_minx,
                             self.grid_maxx,
                             self.delta_x,
-                            dtype=float).tolist()
+                            dtype=float)
         y_holes = np.arange(self.grid_miny,
                             self.grid_maxy,
                             self.delta_y,
-                            dtype=float).tolist()
+                            dtype=float)
+        return x_holes, y_holes
 
-        if self.one_hole_cell is not None:
-            for x_loc in x_holes:
-                for y_loc in y_holes:
-                    gather_holes_cell.add(
-                        gdspy.CellReference(self.one_hole_cell,
-                                            origin=(x_loc, y_loc)))
+    def _classify_holes(self, x_holes: np.ndarray,
+                        y_holes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the holes clear of the no-cheese region, and the holes on its
+        boundary, by the distance of their center to it.
 
-        return gather_holes_cell
+        Args:
+            x_holes (np.ndarray): The x locations of the grid.
+            y_holes (np.ndarray): The y locations of the grid.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Masks of the clear holes and of the
+            holes on the boundary, indexed by [x index, y index].  The other
+            holes are within the no-cheese region.
+        """
+        x_grid, y_grid = np.meshgrid(x_holes, y_holes, indexing='ij')
+        is_geometry = isinstance(self.multi_poly,
+                                 shapely.geometry.base.BaseGeometry)
+        if not is_geometry or self.multi_poly.is_empty:
+            all_holes = np.ones(x_grid.shape, dtype=bool)
+            return all_holes, ~all_holes
+
+        # Largest distance from the center of the hole to its outline,
+        # with a margin for the segments which approximate the buffers.
+        radius = np.hypot(*np.array(self.hole.exterior.coords).T).max()
+        radius = 1.01 * radius + self.precision
+
+        near_region = self.multi_poly.buffer(radius)
+        within_region = self.multi_poly.buffer(-radius)
+        shapely.prepare(near_region)
+        shapely.prepare(within_region)
+        near = shapely.contains_xy(near_region, x_grid, y_grid)
+        within = shapely.contains_xy(within_region, x_grid, y_grid)
+        return ~near, near & ~within
+
+    @staticmethod
+    def _get_rectangles(mask: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """Cover the True entries of a mask with rectangles.  The runs of
+        each column of the mask are extended over the next columns with the
+        same run.
+
+        Args:
+            mask (np.ndarray): 2D mask, indexed by [x index, y index].
+
+        Returns:
+            List[Tuple[int, int, int, int]]: (x index, y index, number of
+            columns, number of rows) of each rectangle.
+        """
+        rectangles = []
+        # key=(start, stop) of a run of x indices, value=first y index
+        open_runs = dict()
+        for y_index in range(mask.shape[1] + 1):
+            runs = set()
+            if y_index < mask.shape[1]:
+                padded = np.concatenate(([False], mask[:, y_index], [False]))
+                edges = np.flatnonzero(padded[1:] != padded[:-1]).tolist()
+                runs = set(zip(edges[::2], edges[1::2]))
+            for run in list(open_runs):
+                if run not in runs:
+                    first = open_runs.pop(run)
+                    rectangles.append(
+                        (run[0], first, run[1] - run[0], y_index - first))
+            for run in runs:
+                open_runs.setdefault(run, y_index)
+        return sorted(rectangles)
+
+    def _get_hole_arrays(self) -> gdspy.library.Cell:
+        """Same as _subtract_keepout_from_hole_grid(_get_all_holes()), without
+        a boolean for every hole.
+
+        The holes clear of the no-cheese region are placed with a CellArray
+        for each rectangle of them.  The no-cheese region is subtracted only
+        from the holes on its boundary.
+
+        Returns:
+            gdspy.library.Cell: Newly created cell that holds the difference
+                                        of holes minus the keep=out region.
+        """
+        diff_holes_cell_name = f'TOP_{self.chip_name}_{self.layer}_Cheese_diff'
+        diff_holes_cell = self.lib.new_cell(diff_holes_cell_name,
+                                            overwrite_duplicate=True)
+        if self.one_hole_cell is None:
+            return diff_holes_cell
+
+        x_holes, y_holes = self._get_hole_grid()
+        clear, boundary = self._classify_holes(x_holes, y_holes)
+        hole_points = self.one_hole_cell.get_polygons()
+
+        if clear.any():
+            hole_cell = self.lib.new_cell(f'{diff_holes_cell_name}_hole',
+                                          overwrite_duplicate=True)
+            hole_cell.add(
+                gdspy.PolygonSet(hole_points,
+                                 layer=self.layer,
+                                 datatype=self.datatype_cheese + 1))
+            for x_index, y_index, columns, rows in self._get_rectangles(clear):
+                diff_holes_cell.add(
+                    gdspy.CellArray(hole_cell,
+                                    columns,
+                                    rows, (self.delta_x, self.delta_y),
+                                    origin=(x_holes[x_index],
+                                            y_holes[y_index])))
+
+        if boundary.any():
+            x_indices, y_indices = np.nonzero(boundary)
+            boundary_holes = [
+                points + (x_holes[x_index], y_holes[y_index])
+                for x_index, y_index in zip(x_indices, y_indices)
+                for points in hole_points
+            ]
+            diff_holes = gdspy.boolean(boundary_holes,
+                                       self.nocheese_gds,
+                                       'not',
+                                       max_points=self.max_points,
+                                       precision=self.precision,
+                                       layer=self.layer,
+                                       datatype=self.datatype_cheese + 1)
+            if diff_holes is not None:
+                diff_holes_cell.add(diff_holes)
+
+        return diff_holes_cell
 
     def _subtract_holes_from_ground(
             self, diff_holes_cell) -> Union[gdspy.library.Cell, None]:
@@ -442,13 +599,15 @@ class Cheesing():
             ground_cell = self.lib.cells[ground_cell_name]
             # Need to keep the depth at 0, otherwise all the
             # cell references (junctions) will be added for boolean.
-            ground_cheese = gdspy.boolean(ground_cell.get_polygons(depth=0),
+            ground_cheese = tiled_boolean(ground_cell.get_polygons(depth=0),
                                           diff_holes_cell.get_polygonsets(),
                                           'not',
-                                          max_points=self.max_points,
-                                          precision=self.precision,
+                                          self.precision,
+                                          self.max_points,
                                           layer=self.layer,
-                                          datatype=self.datatype_cheese)
+                                          datatype=self.datatype_cheese,
+                                          tile_size=self.tile_size,
+                                          max_workers=self.max_workers)
             ground_cheese_cell_name = (f'TOP_{self.chip_name}_{self.layer}'
                                        f'_Cheese_{self.datatype_cheese}')
             ground_cheese_cell = self.lib.new_cell(ground_cheese_cell_name,
@@ -478,8 +637,9 @@ class Cheesing():
         """ For a lib, chip and layer, remove the Cheese_diff cell.
         """
         cell_name = f'TOP_{self.chip_name}_{self.layer}_Cheese_diff'
-        if cell_name in self.lib.cells:
-            self.lib.remove(cell_name)
+        for name in (cell_name, f'{cell_name}_hole'):
+            if name in self.lib.cells:
+                self.lib.remove(name)
 
     def _remove_ground_chip_layer(self):
         """[For a lib, chip and layer, remove the ground cell
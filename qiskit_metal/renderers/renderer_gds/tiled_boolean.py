@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2017, 2021.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+"""For GDS export, split the boolean operations of a chip layer into
+tiles, which can be processed in parallel."""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Union
+
+import gdspy
+import numpy as np
+
+
+def _get_points(operand) -> List[np.ndarray]:
+    """Get the vertices of each polygon of a boolean operand.
+
+    Args:
+        operand: PolygonSet, FlexPath, RobustPath, CellReference, array of
+            vertices, or list of them, as accepted by gdspy.boolean().
+
+    Returns:
+        List[np.ndarray]: The vertices of each polygon.
+    """
+    if operand is None:
+        return []
+    if isinstance(operand, gdspy.PolygonSet):
+        return list(operand.polygons)
+    if isinstance(operand, (gdspy.FlexPath, gdspy.RobustPath)):
+        return list(operand.to_polygonset().polygons)
+    if isinstance(operand, (gdspy.CellReference, gdspy.CellArray)):
+        return list(operand.get_polygons())
+    if isinstance(operand, np.ndarray) and operand.ndim == 2:
+        return [operand]
+    points = []
+    for item in operand:
+        points += _get_points(item)
+    return points
+
+
+def _get_bounds(points: List[np.ndarray]) -> np.ndarray:
+    """Get the bounding box of each polygon.
+
+    Args:
+        points (List[np.ndarray]): The vertices of each polygon.
+
+    Returns:
+        np.ndarray: One row of (minx, miny, maxx, maxy) for each polygon.
+    """
+    if not points:
+        return np.empty((0, 4))
+    return np.array([
+        (*polygon.min(axis=0), *polygon.max(axis=0)) for polygon in points
+    ])
+
+
+def _boolean_tile(tile: tuple, points1: List[np.ndarray],
+                  points2: List[np.ndarray], operation: str, precision: float,
+                  max_points: int) -> List[np.ndarray]:
+    """Do the boolean operation for the part of the operands within a tile.
+
+    Args:
+        tile (tuple): (minx, miny, maxx, maxy) of the tile.
+        points1 (List[np.ndarray]): Polygons of operand1 near the tile.
+        points2 (List[np.ndarray]): Polygons of operand2 near the tile.
+        operation (str): 'or', 'and', 'xor' or 'not'.
+        precision (float): Used for gdspy.
+        max_points (int): Used for gdspy.
+
+    Returns:
+        List[np.ndarray]: The vertices of each polygon of the result.
+    """
+    rectangle = gdspy.Rectangle(tile[:2], tile[2:])
+    clipped1 = gdspy.boolean(points1, rectangle, 'and', precision=precision)
+    if operation in ('or', 'xor'):
+        clipped2 = gdspy.boolean(points2, rectangle, 'and', precision=precision)
+    else:
+        # The result is within operand1, so operand2 needs no clipping.
+        clipped2 = points2
+    result = gdspy.boolean(clipped1,
+                           clipped2,
+                           operation,
+                           precision=precision,
+                           max_points=max_points)
+    return [] if result is None else result.polygons
+
+
+def tiled_boolean(operand1,
+                  operand2,
+                  operation: str,
+                  precision: float,
+                  max_points: int,
+                  layer: int = 0,
+                  datatype: int = 0,
+                  tile_size: float = 0,
+                  max_workers: int = 1) -> Union[gdspy.PolygonSet, None]:
+    """Same as gdspy.boolean(), but split into square tiles of tile_size.
+    The tiles are processed by up to max_workers processes.
+
+    The polygons of the result are cut at the edges of the tiles. Each tile
+    only handles the polygons whose bounding box meets it, so the cost of
+    the boolean operation grows more slowly with the number of polygons.
+
+    Args:
+        operand1: First operand, as accepted by gdspy.boolean().
+        operand2: Second operand, as accepted by gdspy.boolean().
+        operation (str): 'or', 'and', 'xor' or 'not'.
+        precision (float): Used for gdspy.
+        max_points (int): Used for gdspy. GDSpy uses 199 as the default.
+        layer (int, optional): Layer of the result. Defaults to 0.
+        datatype (int, optional): Datatype of the result. Defaults to 0.
+        tile_size (float, optional): Size of the tiles.  If zero, use
+            gdspy.boolean() at once.  Defaults to 0.
+        max_workers (int, optional): Number of processes.  If one, the tiles
+            are processed in this process.  Defaults to 1.
+
+    Returns:
+        Union[gdspy.PolygonSet, None]: The result, or None if it is empty.
+    """
+    # pylint: disable=too-many-arguments
+    # pylint: disable=too-many-locals
+    if tile_size <= 0:
+        return gdspy.boolean(operand1,
+                             operand2,
+                             operation,
+                             precision=precision,
+                             max_points=max_points,
+                             layer=layer,
+                             datatype=datatype)
+
+    points1 = _get_points(operand1)
+    points2 = _get_points(operand2)
+    bounds1 = _get_bounds(points1)
+    bounds2 = _get_bounds(points2)
+
+    # Area which may hold the result
+    if operation in ('or', 'xor'):
+        all_bounds = np.vstack([bounds1, bounds2])
+    else:
+        all_bounds = bounds1
+    if len(all_bounds) == 0:
+        return None
+    minx, miny = all_bounds[:, :2].min(axis=0)
+    maxx, maxy = all_bounds[:, 2:].max(axis=0)
+
+    # Tiles of equal size, no larger than tile_size
+    x_edges = np.linspace(minx, maxx,
+                          max(1, int(np.ceil((maxx - minx) / tile_size))) + 1)
+    y_edges = np.linspace(miny, maxy,
+                          max(1, int(np.ceil((maxy - miny) / tile_size))) + 1)
+
+    tiles = []
+    for x_min, x_max in zip(x_edges[:-1], x_edges[1:]):
+        for y_min, y_max in zip(y_edges[:-1], y_edges[1:]):
+            near1 = ((bounds1[:, 0] <= x_max) & (bounds1[:, 2] >= x_min) &
+                     (bounds1[:, 1] <= y_max) & (bounds1[:, 3] >= y_min))
+            near2 = ((bounds2[:, 0] <= x_max) & (bounds2[:, 2] >= x_min) &
+                     (bounds2[:, 1] <= y_max) & (bounds2[:, 3] >= y_min))
+            if near1.any() or (operation in ('or', 'xor') and near2.any()):
+                near_points1 = [points1[i] for i in np.flatnonzero(near1)]
+                near_points2 = [points2[i] for i in np.flatnonzero(near2)]
+                tiles.append(
+                    ((x_min, y_min, x_max, y_max), near_points1, near_points2))
+
+    if not tiles:
+        return None
+    boxes, tile_points1, tile_points2 = zip(*tiles)
+    arguments = (boxes, tile_points1, tile_points2, [operation] * len(tiles),
+                 [precision] * len(tiles), [max_points] * len(tiles))
+    if max_workers > 1 and len(tiles) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_boolean_tile, *arguments))
+    else:
+        results = list(map(_boolean_tile, *arguments))
+
+    polygons = [polygon for result in results for polygon in result]
+    if not polygons:
+        return None
+    return gdspy.PolygonSet(polygons, layer=layer, datatype=datatype)
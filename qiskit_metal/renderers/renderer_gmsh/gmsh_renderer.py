@@ -1,14 +1,19 @@
 from typing import Union, List, Optional
 from collections import defaultdict
+import hashlib
 import pandas as pd
 import gmsh
 import numpy as np
+import shapely
+from shapely.geometry import CAP_STYLE, JOIN_STYLE, Polygon
 
 from qiskit_metal.renderers.renderer_base import QRenderer
 
 from .gmsh_utils import Vec3D, Vec3DArray, line_width_offset_pts, render_path_curves
+from .gmsh_utils import fillet_path_coords
+from .mesh_cache import MeshCache
 from qiskit_metal.toolbox_metal.bounds_for_path_and_poly_tables import BoundsForPathAndPolyTables
-from qiskit_metal.toolbox_metal.parsing import parse_value
+from qiskit_metal.toolbox_metal.parsing import is_true, parse_value
 
 from qiskit_metal import Dict
 
@@ -41,6 +46,15 @@ class QGmshRenderer(QRenderer):
             * metal -- color for metallized entities
             * jj -- color for JJs
             * dielectric -- color for dielectric entity
+        * merge_subtract -- to merge the subtracted geometries before the cut
+            * enable -- union the subtracted paths and polys of each layer in shapely,
+                        so the ground plane is cut by a few Gmsh entities
+            * quad_segs -- number of segments for a quarter circle of a fillet
+        * mesh_cache -- to reuse the meshes of previous renders
+            * enable -- load the mesh and physical groups from cache_dir when the
+                        qgeometry, layer stack and options are unchanged
+            * cache_dir -- directory of the cached meshes
+            * max_entries -- number of meshes kept, the least recently used are removed
     """
 
     default_options = Dict(
@@ -64,6 +78,10 @@ class QGmshRenderer(QRenderer):
             jj=(84, 140, 168, 150),
             dielectric=(180, 180, 180, 255),
         ),
+        merge_subtract=Dict(enable=False, quad_segs=8),
+        mesh_cache=Dict(enable=False,
+                        cache_dir="./gmsh_mesh_cache",
+                        max_entries=16),
     )
 
     name = "gmsh"
@@ -252,8 +270,31 @@ class QGmshRenderer(QRenderer):
         self.juncs_dict = defaultdict(dict)
         self.physical_groups = defaultdict(dict)
 
+        # dict: (dim, geom_tag) -- (kind, layer, geom_name), where kind is
+        # "path", "poly", "junction" or "layer", and geom_name is None for
+        # a layer. Reverse index of the dicts above.
+        self.geom_owners = dict()
+
+        # defaultdict: layer -- list of shapely geometries, for the subtracted
+        # geometries to merge.
+        self.subtract_shapes = defaultdict(list)
+
         self.clear_design()
 
+        mesh_cache_key = None
+        if mesh_geoms and is_true(self._options["mesh_cache"]["enable"]):
+            mesh_cache_key = self.get_mesh_cache_key(
+                selection=selection,
+                open_pins=open_pins,
+                box_plus_buffer=box_plus_buffer,
+                draw_sample_holder=draw_sample_holder,
+                skip_junctions=skip_junctions,
+                ignore_metal_volume=ignore_metal_volume,
+                omit_ground_for_layers=omit_ground_for_layers)
+            if mesh_cache_key is not None and self.load_cached_mesh(
+                    mesh_cache_key):
+                return
+
         self.draw_geometries(selection=selection,
                              open_pins=open_pins,
                              box_plus_buffer=box_plus_buffer,
@@ -268,9 +309,104 @@ class QGmshRenderer(QRenderer):
         if mesh_geoms:
             try:
                 self.add_mesh()  # generate mesh
+                if mesh_cache_key is not None:
+                    self.save_cached_mesh(mesh_cache_key)
             except Exception as e:
                 self.logger.info(f"ERROR: Generate Mesh: {e}")
 
+    def get_mesh_cache(self) -> MeshCache:
+        """Get the cache of meshes given by the mesh_cache options.
+
+        Returns:
+            MeshCache: Cache in mesh_cache.cache_dir.
+        """
+        return MeshCache(self._options["mesh_cache"]["cache_dir"],
+                         int(self._options["mesh_cache"]["max_entries"]))
+
+    def get_mesh_cache_key(self,
+                           selection: Union[list, None] = None,
+                           **render_args) -> Union[str, None]:
+        """Digest of everything the mesh made by render_design() depends on:
+        the selected qgeometry rows and their component names, the layer stack,
+        chips and variables of the design, the options of the renderer and the
+        arguments of render_design(). Also sets self.qcomp_ids and self.case
+        for the selection.
+
+        Args:
+            selection (Union[list, None], optional): List of selected components
+                                                        to render. Defaults to None.
+            render_args: The other arguments of render_design().
+
+        Returns:
+            Union[str, None]: Hex digest, or None if the selection is not valid.
+        """
+        self.qcomp_ids, self.case = self.get_unique_component_ids(selection)
+        if self.case == 2:
+            return None
+
+        digest = hashlib.blake2b(digest_size=20)
+        component_ids = set()
+        for table_type in self.design.qgeometry.get_element_types():
+            table = self.design.qgeometry.tables[table_type]
+            if self.case == 0:
+                table = table[table["component"].isin(self.qcomp_ids)]
+            component_ids.update(table["component"].tolist())
+            other_columns = [
+                column for column in table.columns if column != "geometry"
+            ]
+            digest.update(repr((table_type, other_columns)).encode())
+            digest.update(b"".join(shapely.to_wkb(table.geometry.values.data)))
+            digest.update(
+                repr(table[other_columns].to_numpy(
+                    dtype=object).tolist()).encode())
+
+        ls_df = self.design.ls.ls_df
+        options = {
+            key: value
+            for key, value in self._options.items()
+            if key != "mesh_cache"
+        }
+        component_names = sorted(
+            (component_id, self.design._components[component_id].name)
+            for component_id in component_ids)
+        inputs = (component_names, list(ls_df.columns),
+                  ls_df.to_numpy(dtype=object).tolist(), self.design.chips,
+                  self.design.variables, options, self.layer_types,
+                  sorted(render_args.items()), gmsh.__version__)
+        digest.update(repr(inputs).encode())
+        return digest.hexdigest()
+
+    def load_cached_mesh(self, key: str) -> bool:
+        """Load the mesh and the physical groups of a previous render from the
+        mesh cache. The other dicts of the rendered geometries stay empty.
+
+        Args:
+            key (str): From get_mesh_cache_key().
+
+        Returns:
+            bool: True if the mesh was in the cache.
+        """
+        cached = self.get_mesh_cache().get(key)
+        if cached is None:
+            return False
+        msh_path, self.physical_groups = cached
+        gmsh.merge(msh_path)
+        self.logger.info(f"Loaded the mesh from the cache: {msh_path}")
+        return True
+
+    def save_cached_mesh(self, key: str):
+        """Store the mesh and the physical groups in the mesh cache.
+
+        Args:
+            key (str): From get_mesh_cache_key().
+        """
+
+        def write_mesh(filepath: str):
+            gmsh.option.setNumber("Mesh.ScalingFactor", 1)
+            gmsh.write(filepath)
+
+        self.get_mesh_cache().put(key, write_mesh, self.physical_groups)
+
     def draw_geometries(self,
                         draw_sample_holder: bool,
                         selection: Union[list, None] = None,
@@ -303,6 +439,7 @@ class QGmshRenderer(QRenderer):
             return
 
         self.render_tables(skip_junction=skip_junctions)
+        self.render_merged_subtract_shapes()
         self.add_endcaps(open_pins=open_pins)
         self.render_layers(box_plus_buffer=box_plus_buffer,
                            omit_layers=omit_ground_for_layers,
@@ -361,6 +498,12 @@ class QGmshRenderer(QRenderer):
             mask = table["component"].isin(self.qcomp_ids)
             table = table[mask]
 
+        if table_type in ("path", "poly") and is_true(
+                self._options["merge_subtract"]["enable"]):
+            subtract = table["subtract"].astype(bool)
+            self.add_subtract_shapes(table[subtract], table_type)
+            table = table[~subtract]
+
         for _, qgeom in table.iterrows():
             self.render_element(qgeom, table_type)
 
@@ -473,10 +616,7 @@ class QGmshRenderer(QRenderer):
                                  dy=0,
                                  dz=qc_thickness / 2)
 
-        if junc.layer not in self.juncs_dict:
-            self.juncs_dict[junc.layer] = dict()
-
-        self.juncs_dict[junc.layer][qc_name] = [surface]
+        self.set_geom_tags("junction", junc.layer, qc_name, 2, [surface])
 
     def render_element_path(self, path: pd.Series):
         """Render an element of type: 'path'
@@ -516,13 +656,13 @@ class QGmshRenderer(QRenderer):
             if path["subtract"]:
                 self.layer_subtract_dict[path.layer].add(volume[0])
             else:
-                self.paths_dict[path.layer][qc_name] = [volume[0]]
+                self.set_geom_tags("path", path.layer, qc_name, 3, [volume[0]])
 
         else:
             if path["subtract"]:
                 self.layer_subtract_dict[path.layer].add(surface)
             else:
-                self.paths_dict[path.layer][qc_name] = [surface]
+                self.set_geom_tags("path", path.layer, qc_name, 2, [surface])
 
     def make_poly_surface(self, points: List[np.ndarray], chip_z: float) -> int:
         """Make a Gmsh surface for creating poly type QGeometries
@@ -592,13 +732,90 @@ class QGmshRenderer(QRenderer):
             if poly["subtract"]:
                 self.layer_subtract_dict[poly.layer].add(volume[0])
             else:
-                self.polys_dict[poly.layer][qc_name] = [volume[0]]
+                self.set_geom_tags("poly", poly.layer, qc_name, 3, [volume[0]])
 
         else:
             if poly["subtract"]:
                 self.layer_subtract_dict[poly.layer].add(surface)
             else:
-                self.polys_dict[poly.layer][qc_name] = [surface]
+                self.set_geom_tags("poly", poly.layer, qc_name, 2, [surface])
+
+    def add_subtract_shapes(self, table: pd.DataFrame, table_type: str):
+        """Collect the subtracted paths or polys of a table in
+        self.subtract_shapes, to be merged by render_merged_subtract_shapes()
+        instead of being rendered one by one. The paths are filleted and
+        given their width in shapely.
+
+        Args:
+            table (pd.DataFrame): Subtracted rows of the table to collect.
+            table_type (str): Table type (poly or path).
+        """
+        quad_segs = int(self._options["merge_subtract"]["quad_segs"])
+        for _, qgeom in table.iterrows():
+            qc_shapely = qgeom.geometry
+
+            if table_type == "path":
+                qc_width = self.parse_units_gmsh(qgeom.width)
+                qc_fillet = self.parse_units_gmsh(qgeom.fillet)
+                qc_fillet = 0.0 if np.isnan(float(qc_fillet)) else qc_fillet
+                bad_fillets = bad_fillet_idxs(qc_shapely.coords, qc_fillet)
+                coords = fillet_path_coords(np.array(qc_shapely.coords),
+                                            qc_fillet, bad_fillets, quad_segs)
+                qc_shapely = shapely.LineString(coords).buffer(
+                    qc_width / 2,
+                    cap_style=CAP_STYLE.flat,
+                    join_style=JOIN_STYLE.mitre)
+
+            self.subtract_shapes[qgeom.layer].append(qc_shapely)
+
+    def make_polygon_surface(self, polygon: Polygon, chip_z: float) -> int:
+        """Make a Gmsh surface from a shapely polygon, with all its holes
+
+        Args:
+            polygon (Polygon): Polygon defining the surface
+            chip_z (float): z-coordinate of the chip
+
+        Returns:
+            int: tag of the created Gmsh surface
+        """
+        curve_loops = []
+        for ring in [polygon.exterior, *polygon.interiors]:
+            pts = [
+                gmsh.model.occ.addPoint(x, y, chip_z)
+                for x, y in list(ring.coords)[:-1]
+            ]
+            lines = [
+                gmsh.model.occ.addLine(p1, p2)
+                for p1, p2 in zip(pts, pts[1:] + pts[:1])
+            ]
+            curve_loops += [gmsh.model.occ.addCurveLoop(lines)]
+        return gmsh.model.occ.addPlaneSurface(curve_loops)
+
+    def render_merged_subtract_shapes(self):
+        """Union the geometries collected in self.subtract_shapes for each
+        layer, and render each polygon of the union as a single Gmsh entity
+        in layer_subtract_dict.
+        """
+        for layer, shapes in self.subtract_shapes.items():
+            merged = shapely.simplify(shapely.unary_union(shapes), 0)
+
+            qc_thickness, qc_z = self.get_thickness_zcoord_for_layer_datatype(
+                layer_num=layer)
+            dim = 3 if np.abs(qc_thickness) > 0 else 2
+
+            for polygon in getattr(merged, "geoms", [merged]):
+                if polygon.is_empty:
+                    continue
+                surface = self.make_polygon_surface(polygon, qc_z)
+                tag = surface
+                if dim == 3:
+                    extruded_entity = gmsh.model.occ.extrude([(2, surface)],
+                                                             dx=0,
+                                                             dy=0,
+                                                             dz=qc_thickness)
+                    tag = [t for d, t in extruded_entity if d == 3][0]
+
+                self.layer_subtract_dict[layer].add(tag)
 
     def add_endcaps(self, open_pins: Union[list, None] = None):
         """Create endcaps (rectangular cutouts) for all pins in the list
@@ -745,14 +962,13 @@ class QGmshRenderer(QRenderer):
         if np.abs(thickness) > 0:
             layer_tag = gmsh.model.occ.addBox(layer_x, layer_y, z_coord,
                                               layer_wx, layer_wy, thickness)
+            dim = 3
         else:
             layer_tag = gmsh.model.occ.addRectangle(layer_x, layer_y, z_coord,
                                                     layer_wx, layer_wy)
+            dim = 2
 
-        if layer_number not in self.layers_dict:
-            self.layers_dict[layer_number] = [-1]
-
-        self.layers_dict[layer_number] = [layer_tag]
+        self.set_geom_tags("layer", layer_number, None, dim, [layer_tag])
 
     def subtract_from_layers(self, omit_layers: Optional[list[int]] = None):
         """Subtract the QGeometries in tables from the chip ground plane
@@ -785,7 +1001,91 @@ class QGmshRenderer(QRenderer):
                             tag for _, tag in subtract_layer[1][i]
                         ]
 
-                self.layers_dict[layer_num] = updated_layer_geoms
+                self.set_geom_tags("layer", layer_num, None, dim,
+                                   updated_layer_geoms)
+
+    def _get_geoms_dict(self, kind: str) -> defaultdict:
+        return {
+            "path": self.paths_dict,
+            "poly": self.polys_dict,
+            "junction": self.juncs_dict,
+            "layer": self.layers_dict
+        }[kind]
+
+    def get_geom_tags(self, kind: str, layer: int,
+                      name: Union[str, None]) -> List[int]:
+        """Get the list of Gmsh tags of a geometry, as held by its dict.
+
+        Args:
+            kind (str): "path", "poly", "junction" or "layer".
+            layer (int): Layer number of the geometry.
+            name (Union[str, None]): Name of the geometry, or None for a layer.
+
+        Returns:
+            List[int]: The tags, which can be edited in place.
+        """
+        layer_geoms = self._get_geoms_dict(kind)[layer]
+        return layer_geoms if name is None else layer_geoms[name]
+
+    def set_geom_tags(self, kind: str, layer: int, name: Union[str, None],
+                      dim: int, tags: List[int]):
+        """Set the Gmsh tags of a geometry in its dict, and in the reverse
+        index `geom_owners`.
+
+        Args:
+            kind (str): "path", "poly", "junction" or "layer".
+            layer (int): Layer number of the geometry.
+            name (Union[str, None]): Name of the geometry, or None for a layer.
+            dim (int): Dimension of the tags.
+            tags (List[int]): Tags of the geometry.
+        """
+        owner = (kind, layer, name)
+        geoms_dict = self._get_geoms_dict(kind)
+        if name is None:
+            old_tags = geoms_dict.get(layer, [])
+            geoms_dict[layer] = tags
+        else:
+            old_tags = geoms_dict[layer].get(name, [])
+            geoms_dict[layer][name] = tags
+
+        for tag in old_tags:
+            if self.geom_owners.get((dim, tag)) == owner:
+                del self.geom_owners[(dim, tag)]
+        for tag in tags:
+            self.geom_owners[(dim, tag)] = owner
+
+    def remap_geom_tags(self, old_dimtags: List[tuple],
+                        new_dimtags: List[tuple]):
+        """Replace the tags of the geometries changed by a Gmsh operation,
+        such as a fragment, in their dicts and in `geom_owners`.
+
+        The owner of each changed tag is found in `geom_owners`, so the time
+        grows with the number of tags, not with the number of tags times the
+        number of geometries.
+
+        Args:
+            old_dimtags (List[tuple]): (dim, tag) of each geometry before
+                the operation.
+            new_dimtags (List[tuple]): (dim, tag) of the same geometries after
+                the operation.
+        """
+        new_tags = {
+            old: new for old, new in zip(old_dimtags, new_dimtags) if old != new
+        }
+        # key=owner, value=dim of its tags
+        changed_owners = dict()
+        for old in new_tags:
+            if old in self.geom_owners:
+                changed_owners[self.geom_owners[old]] = old[0]
+
+        for (kind, layer, name), dim in changed_owners.items():
+            tags = self.get_geom_tags(kind, layer, name)
+            tags[:] = [new_tags.get((dim, tag), (dim, tag))[1] for tag in tags]
+
+        self.geom_owners = {
+            new_tags.get(dimtag, dimtag): owner
+            for dimtag, owner in self.geom_owners.items()
+        }
 
     def fragment_interfaces(self, draw_sample_holder: bool):
         """Fragment Gmsh surfaces to ensure consistent tetrahedral meshing
@@ -846,26 +1146,7 @@ class QGmshRenderer(QRenderer):
         updated_geoms = fragmented_geoms[0]
         insert_idx = updated_geoms.index(object_dimtag)
         all_geom_dimtags.insert(insert_idx, object_dimtag)
-        all_dicts = {
-            0: self.paths_dict,
-            1: self.polys_dict,
-            2: self.juncs_dict,
-            3: self.layers_dict
-        }
-        for old, new in zip(all_geom_dimtags, updated_geoms):
-            if old != new:
-                for i, d in all_dicts.items():
-                    for l, geoms in d.items():
-                        if isinstance(geoms, dict):
-                            for name, geom_id in geoms.items():
-                                if len(geom_id) > 0 and geom_id[0] == old[1]:
-                                    all_dicts[i][l][name].append(new[1])
-                                    all_dicts[i][l][name].remove(old[1])
-                        elif isinstance(geoms, list):
-                            for geom_id in geoms:
-                                if geom_id == old[1]:
-                                    all_dicts[i][l].append(new[1])
-                                    all_dicts[i][l].remove(old[1])
+        self.remap_geom_tags(all_geom_dimtags, updated_geoms)
 
         # TODO: Do we require 3D junctions? Active issue: #842
         # all_juncs = []
@@ -879,24 +1160,17 @@ class QGmshRenderer(QRenderer):
     def get_all_metal_surfaces(self):
         metal_geoms = list()
         surf_tags = list()
-        for layer in self.layer_types["metal"]:
-            thickness = self.get_thickness_for_layer_datatype(layer_num=layer)
-
-            for _, tag in self.juncs_dict[layer].items():
-                surf_tags += tag
-
-            if thickness > 0.0:
-                for _, tag in self.polys_dict[layer].items():
-                    metal_geoms += tag
-                for _, tag in self.paths_dict[layer].items():
-                    metal_geoms += tag
-                metal_geoms += self.layers_dict[layer]
+        has_volume = {
+            layer: self.get_thickness_for_layer_datatype(layer_num=layer) > 0.0
+            for layer in self.layer_types["metal"]
+        }
+        for (_, tag), (kind, layer, _) in self.geom_owners.items():
+            if layer not in has_volume:
+                continue
+            if has_volume[layer] and kind != "junction":
+                metal_geoms.append(tag)
             else:
-                for _, tag in self.polys_dict[layer].items():
-                    surf_tags += tag
-                for _, tag in self.paths_dict[layer].items():
-                    surf_tags += tag
-                surf_tags += self.layers_dict[layer]
+                surf_tags.append(tag)
 
         for geom in metal_geoms:
             surf_tags += list(gmsh.model.occ.getSurfaceLoops(geom)[1][0])
@@ -917,6 +1191,7 @@ class QGmshRenderer(QRenderer):
             ValueError: if layer number is not in self.layer_types
         """
         layer_numbers = list(set(l for l in self.design.ls.ls_df["layer"]))
+        all_metal_surfs = None
         for layer in layer_numbers:
             # TODO: check if thickness == 0, then fragment differently
             layer_thickness = self.get_thickness_for_layer_datatype(
@@ -977,7 +1252,8 @@ class QGmshRenderer(QRenderer):
 
                 layer_name = layer_type + f'_(layer {layer})'
                 layer_tag = self.layers_dict[layer]
-                all_metal_surfs = self.get_all_metal_surfaces()
+                if all_metal_surfs is None:
+                    all_metal_surfs = set(self.get_all_metal_surfaces())
                 if len(layer_tag) > 0:
                     if layer_dim == 3:
                         layer_sfs_tags = []
@@ -1057,15 +1333,16 @@ class QGmshRenderer(QRenderer):
 
         all_vols = []
         all_surfs = []
-        all_dicts = (self.polys_dict, self.paths_dict)
+        jj_surfs = []
 
-        for d in all_dicts:
-            for layer, geoms in d.items():
-                thickness = self.get_thickness_for_layer_datatype(layer)
-                if np.abs(thickness) > 0:
-                    all_vols += [tag[0] for tag in geoms.values()]
+        for (dim, tag), (kind, _, _) in self.geom_owners.items():
+            if kind == "junction":
+                jj_surfs.append(tag)
+            elif kind != "layer":
+                if dim == 3:
+                    all_vols.append(tag)
                 else:
-                    all_surfs += [tag[0] for tag in geoms.values()]
+                    all_surfs.append(tag)
 
         # Metal layers
         for layer in self.layer_types["metal"]:
@@ -1105,10 +1382,6 @@ class QGmshRenderer(QRenderer):
 
             thresh_fields += [tf]
 
-        jj_surfs = []
-        for _, geoms in self.juncs_dict.items():
-            jj_surfs += [tag[0] for tag in geoms.values()]
-
         jj_curve_loops = [
             gmsh.model.occ.getCurveLoops(surf) for surf in all_surfs
         ]
@@ -394,3 +394,64 @@ def render_path_curves(vecs: Vec3DArray,
     curves = curves1 + curves2[::-1]
 
     return curves
+
+
+def fillet_path_coords(coords: np.ndarray,
+                       fillet: float,
+                       bad_fillet_idxs: List[int],
+                       quad_segs: int = 16,
+                       straight_line_tol: float = 1e-9) -> np.ndarray:
+    """Replace the corners of a path by circle arcs of radius fillet, made of
+    straight segments, as done by render_path_curves() with Gmsh arcs.
+
+    Args:
+        coords (np.ndarray): (x, y) coordinates of the vertices of the path
+        fillet (float): fillet radius
+        bad_fillet_idxs (List[int]): indices of the vertices not to fillet
+        quad_segs (int, optional): Number of segments for a quarter circle.
+                                        Defaults to 16.
+        straight_line_tol (float, optional): Tolerance for straight line
+                                        through a point. Defaults to 1e-9.
+
+    Raises:
+        ValueError: raises when fillet radius < 0.0
+
+    Returns:
+        np.ndarray: (x, y) coordinates of the vertices of the filleted path
+    """
+    if fillet < 0.0:
+        raise ValueError(f"Expected positive fillet radius, got {fillet}.")
+
+    coords = np.asarray(coords, dtype=float)[:, :2]
+    if fillet == 0.0 or len(coords) < 3:
+        return coords
+
+    new_coords = [coords[:1]]
+    for i in range(1, len(coords) - 1):
+        if i in bad_fillet_idxs:
+            new_coords.append(coords[i:i + 1])
+            continue
+
+        pv1 = coords[i] - coords[i - 1]
+        pv2 = coords[i + 1] - coords[i]
+        pv1 = pv1 / np.linalg.norm(pv1)
+        pv2 = pv2 / np.linalg.norm(pv2)
+        cross = pv1[0] * pv2[1] - pv1[1] * pv2[0]
+        if np.abs(cross) < straight_line_tol:
+            new_coords.append(coords[i:i + 1])
+            continue
+
+        # Turn angle of the path, and the arc tangent to both segments
+        angle = np.arctan2(np.abs(cross), np.dot(pv1, pv2))
+        arc_start = coords[i] - pv1 * fillet * np.tan(angle / 2)
+        center = arc_start + np.sign(cross) * fillet * np.array(
+            [-pv1[1], pv1[0]])
+        start_angle = np.arctan2(*(arc_start - center)[::-1])
+        num_segs = max(1, int(np.ceil(quad_segs * angle / (np.pi / 2))))
+        arc_angles = start_angle + np.sign(cross) * np.linspace(
+            0, angle, num_segs + 1)
+        new_coords.append(center + fillet * np.column_stack(
+            (np.cos(arc_angles), np.sin(arc_angles))))
+
+    new_coords.append(coords[-1:])
+    return np.concatenate(new_coords)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2017, 2022.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+"""Cache on disk of the meshes generated by the Gmsh renderer, keyed by a
+digest of everything the mesh depends on."""
+
+import glob
+import json
+import os
+from collections import defaultdict
+from typing import Callable, Tuple, Union
+
+
+class MeshCache():
+    """Directory of .msh files, each with the physical groups of its model in a
+    .json file.  Both are named after the key of the mesh.
+
+    The least recently used meshes are removed when there are more than
+    max_entries of them.  A mesh is used when it is stored or loaded.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 16):
+        """
+        Args:
+            cache_dir (str): Directory of the cache.  Made on the first store.
+            max_entries (int, optional): Maximum number of meshes to keep.
+                Defaults to 16.
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    def _get_paths(self, key: str) -> Tuple[str, str]:
+        path = os.path.join(self.cache_dir, key)
+        return f"{path}.msh", f"{path}.json"
+
+    def get(self, key: str) -> Union[Tuple[str, defaultdict], None]:
+        """Find a mesh in the cache, and mark it as used.
+
+        Args:
+            key (str): Key of the mesh.
+
+        Returns:
+            Union[Tuple[str, defaultdict], None]: Path of the .msh file and
+            the physical groups, as in QGmshRenderer.physical_groups.  None if
+            the mesh is not in the cache.
+        """
+        msh_path, json_path = self._get_paths(key)
+        if not (os.path.exists(json_path) and os.path.exists(msh_path)):
+            return None
+        with open(json_path, "r", encoding="utf-8") as f:
+            items = json.load(f)
+        os.utime(msh_path)
+        os.utime(json_path)
+        return msh_path, defaultdict(dict, {layer: ph for layer, ph in items})
+
+    def put(self, key: str, write_mesh: Callable[[str], None],
+            physical_groups: dict):
+        """Store a mesh in the cache, then remove the least recently used
+        meshes beyond max_entries.
+
+        Args:
+            key (str): Key of the mesh.
+            write_mesh (Callable[[str], None]): Writes the mesh to the given
+                .msh path.
+            physical_groups (dict): As in QGmshRenderer.physical_groups.
+                key=layer number or "global", value=dict(name: tag).
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        msh_path, json_path = self._get_paths(key)
+
+        # The .json file is written last, so an entry is only found once
+        # both files are complete.
+        tmp_msh_path = f"{msh_path[:-4]}.tmp.msh"
+        write_mesh(tmp_msh_path)
+        os.replace(tmp_msh_path, msh_path)
+
+        items = [[layer if isinstance(layer, str) else int(layer), ph]
+                 for layer, ph in physical_groups.items()]
+        tmp_json_path = f"{json_path}.tmp"
+        with open(tmp_json_path, "w", encoding="utf-8") as f:
+            json.dump(items, f)
+        os.replace(tmp_json_path, json_path)
+
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used meshes beyond max_entries."""
+        json_paths = sorted(glob.glob(os.path.join(self.cache_dir, "*.json")),
+                            key=os.path.getmtime,
+                            reverse=True)
+        for json_path in json_paths[max(0, self.max_entries):]:
+            os.remove(json_path)
+            msh_path = f"{json_path[:-5]}.msh"
+            if os.path.exists(msh_path):
+                os.remove(msh_path)
+
+    def clear(self):
+        """Remove all the meshes of the cache."""
+        max_entries = self.max_entries
+        self.max_entries = 0
+        try:
+            self.evict()
+        finally:
+            self.max_entries = max_entries
@@ -30,6 +30,7 @@ from qiskit_metal.designs.interface_components import Components
 from qiskit_metal.designs.net_info import QNet
 from qiskit_metal.qlibrary.core import QComponent
 from qiskit_metal.qlibrary.qubits.transmon_pocket import TransmonPocket
+from qiskit_metal.qlibrary.tlines.straight_path import RouteStraight
 from qiskit_metal.tests.assertions import AssertionsMixin
 
 from qiskit_metal.qlibrary.lumped.resonator_coil_rect import ResonatorCoilRect
@@ -345,6 +346,27 @@ class TestDesign(unittest.TestCase, AssertionsMixin):
             for j in ['net_id', 'component_id', 'pin_name']:
                 self.assertEqual(df_expected[j][i], df[j][i])
 
+    def test_design_qnet_edit_net_info_in_place(self):
+        """Test that the edits of _net_info in place are kept in net_info.py."""
+        qnet = QNet()
+        qnet.add_pins_to_table(1, 'a', 2, 'b')
+        qnet.add_pins_to_table(3, 'c', 4, 'd')
+
+        table = qnet._net_info
+        table.drop(table.index[table['net_id'] == 1], inplace=True)
+        table.loc[2, 'pin_name'] = 'e'
+        self.assertEqual(qnet.get_net_id(1, 'a'), 0)
+        self.assertEqual(qnet.get_net_id(3, 'e'), 2)
+        self.assertEqual(qnet.get_pins_for_net_id(2), [(3, 'e'), (4, 'd')])
+
+        # The edits are kept after the next change
+        net_id = qnet.add_pins_to_table(1, 'a', 2, 'b')
+        self.assertEqual(
+            qnet.net_info.values.tolist(),
+            [[2, 3, 'e'], [2, 4, 'd'], [net_id, 1, 'a'], [net_id, 2, 'b']])
+        self.assertEqual(qnet.get_connections_for_component(3),
+                         [(3, 'e', 4, 'd')])
+
     def test_design_qnet_get_components_and_pins_for_netid(self):
         """Test get_components_Sand_pins_for_netid in net_info.py."""
         design = DesignPlanar(metadata={})
@@ -465,6 +487,28 @@ class TestDesign(unittest.TestCase, AssertionsMixin):
         self.assertEqual(pf['pin_name'][0], 'p1')
         self.assertEqual(pf['pin_name'][1], 'p2')
 
+    def test_design_connect_pins_many(self):
+        """Test connect_pins_many in design_base.py and the pin index in
+        net_info.py."""
+        design = DesignPlanar()
+        pads = dict(a=dict(loc_W=1, loc_H=1), b=dict(loc_W=-1, loc_H=-1))
+        for name in ['Q1', 'Q2', 'Q3']:
+            TransmonPocket(design, name, options=dict(connection_pads=pads))
+
+        net_ids = design.connect_pins_many([(1, 'a', 2, 'b'), (2, 'a', 3, 'b'),
+                                            (3, 'b', 1, 'b')])
+        self.assertEqual(net_ids, [1, 2, 0])
+        self.assertEqual(design.components['Q2'].pins['a'].net_id, 2)
+        self.assertEqual(design.qnet.get_net_id(3, 'b'), 2)
+        self.assertEqual(design.qnet.get_net_id(3, 'a'), 0)
+        self.assertEqual(design.qnet.get_pins_for_net_id(1), [(1, 'a'),
+                                                              (2, 'b')])
+
+        design.delete_component('Q2')
+        self.assertEqual(design.components['Q1'].pins['a'].net_id, 0)
+        self.assertEqual(design.components['Q3'].pins['b'].net_id, 0)
+        self.assertTrue(design.net_info.empty)
+
     def test_design_delete_all_pins(self):
         """Test delete_all_pins functionality in design_base.py."""
         design = DesignPlanar()
@@ -495,6 +539,81 @@ class TestDesign(unittest.TestCase, AssertionsMixin):
         for i in range(2):
             self.assertEqual(expected[i], actual[i])
 
+    def test_design_update_component_dependencies(self):
+        """Test the dependency graph, update_component and incremental rebuild
+        in design_base.py."""
+        design = DesignPlanar()
+        pads = dict(a=dict(loc_W=1, loc_H=1), b=dict(loc_W=-1, loc_H=-1))
+        TransmonPocket(design, 'Q1', options=dict(connection_pads=pads))
+        TransmonPocket(design,
+                       'Q2',
+                       options=dict(pos_x='2mm', connection_pads=pads))
+        TransmonPocket(design, 'Q3', options=dict(pos_x='4mm'))
+        RouteStraight(
+            design,
+            'R1',
+            options=dict(
+                pin_inputs=dict(start_pin=dict(component='Q1', pin='a'),
+                                end_pin=dict(component='Q2', pin='b'))))
+        design.add_dependency('Q2', 'Q3')
+
+        graph = design.get_dependency_graph(variables=True)
+        self.assertEqual(graph['Q1'], ['R1'])
+        self.assertEqual(graph['Q2'], ['Q3', 'R1'])
+        self.assertIn('R1', graph['cpw_width'])
+
+        # Q3 has a new parent since it was made
+        self.assertEqual(design.rebuild(incremental=True), ['Q3'])
+        self.assertEqual(design.rebuild(incremental=True), [])
+
+        # Pins of Q1 do not move, so R1 keeps its connection without a remake
+        design.components['Q1'].options.hfss_inductance = '11nH'
+        self.assertEqual(design.update_component('Q1'), ['Q1'])
+        self.assertEqual(len(design.net_info), 4)
+        self.assertNotEqual(design.components['Q1'].pins['a'].net_id, 0)
+
+        design.components['Q2'].options.pos_y = '1mm'
+        self.assertEqual(design.update_component('Q2'), ['Q2', 'Q3', 'R1'])
+
+        design.components['Q3'].options.pos_y = '1mm'
+        self.assertEqual(design.rebuild(incremental=True), ['Q3'])
+
+        design.remove_dependency('Q2', 'Q3')
+        design.delete_component('R1')
+        self.assertEqual(design.get_dependency_graph()['Q2'], [])
+
+    def test_design_route_all(self):
+        """Test the batch routing of route_all in design_base.py."""
+        design = DesignPlanar()
+        pads = dict(a=dict(loc_W=1, loc_H=1), b=dict(loc_W=-1, loc_H=-1))
+        TransmonPocket(design, 'Q1', options=dict(connection_pads=pads))
+        TransmonPocket(design,
+                       'Q2',
+                       options=dict(pos_x='2mm', connection_pads=pads))
+        for name, pin_1, pin_2 in [('R1', 'a', 'b'), ('R2', 'b', 'a')]:
+            RouteStraight(
+                design,
+                name,
+                options=dict(
+                    pin_inputs=dict(start_pin=dict(component='Q1', pin=pin_1),
+                                    end_pin=dict(component='Q2', pin=pin_2))),
+                make=False)
+        design.components['R2'].options.pin_inputs.end_pin.pin = 'c'
+
+        report = design.route_all()
+        self.assertEqual(report['name'].to_list(), ['R1', 'R2'])
+        self.assertEqual(report['status'].to_list(), ['good', 'failed'])
+        self.assertIsNone(report['error'][0])
+        self.assertIsInstance(report['error'][1], str)
+        self.assertTrue((report['time'] > 0).all())
+
+        # R1 is now an obstacle of the design
+        self.assertIn(design.components['R1'].id,
+                      design.qgeometry.spatial_index.query((0.5, -1, 1.5, 1)))
+
+        report = design.route_all(['not_there', 'R1'])
+        self.assertEqual(report['status'].to_list(), ['missing', 'good'])
+
     def test_design_get_list_of_tables_in_metadata(self):
         """Tests the get_list_of_tables_in_metadata function in design_base.py
         by exeucting get_table_values_form_renderers in a component."""
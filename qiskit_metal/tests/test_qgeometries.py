@@ -26,6 +26,7 @@ from geopandas import GeoDataFrame
 from qiskit_metal import designs
 from qiskit_metal import draw
 
+from qiskit_metal.qgeometries import galvanic_nets
 from qiskit_metal.qgeometries import qgeometries_handler
 from qiskit_metal.qgeometries.qgeometries_handler import QGeometryTables
 from qiskit_metal.qlibrary.qubits.transmon_pocket import TransmonPocket
@@ -218,6 +219,56 @@ class TestElements(unittest.TestCase):
         self.assertEqual(table['poly']['chip'][0], 'main')
         self.assertEqual(str(table['poly']['fillet'][0]), str(np.nan))
 
+    def test_qgeometry_q_element_add_qgeometry_buffered(self):
+        """Test that rows buffered by add_qgeometry in QGeometryTables class
+        in element_handler.py are written to the tables once they are read."""
+        design = designs.DesignPlanar()
+        qgt = QGeometryTables(design)
+        qgt.clear_all_tables()
+
+        a_poly = draw.rectangle(2, 2, 0, 0)
+        a_linestring = draw.LineString([[0, 0], [0, 1]])
+        qgt.add_qgeometry('poly', 'id_1', dict(pad=a_poly, pad_2=a_poly))
+        qgt.add_qgeometry('poly', 'id_2', dict(pad=a_poly), subtract=True)
+        qgt.add_qgeometry('path', 'id_2', dict(trace=a_linestring), width=0.1)
+
+        # Buffered rows of a deleted component never reach the tables.
+        qgt.add_qgeometry('poly', 'id_3', dict(pad=a_poly))
+        qgt.delete_component_id('id_3')
+
+        table = qgt.tables
+        self.assertEqual(table['poly']['component'].tolist(),
+                         ['id_1', 'id_1', 'id_2'])
+        self.assertEqual(table['poly']['name'].tolist(),
+                         ['pad', 'pad_2', 'pad'])
+        self.assertEqual(table['poly']['subtract'].tolist(),
+                         [False, False, True])
+        self.assertEqual(table['poly'].dtypes['fillet'], object)
+        self.assertTrue(isinstance(table['poly'], GeoDataFrame))
+        self.assertEqual(len(table['path']), 1)
+        self.assertEqual(table['path']['width'][0], 0.1)
+
+        # Rows added after a read are appended to the existing rows.
+        qgt.add_qgeometry('poly', 'id_4', dict(pad=a_poly))
+        self.assertEqual(len(qgt.tables['poly']), 4)
+        self.assertEqual(qgt.tables['poly']['component'][3], 'id_4')
+
+    def test_qgeometry_q_element_add_qgeometry_unknown_kind(self):
+        """Test that add_qgeometry in QGeometryTables class in
+        element_handler.py does not add the rows of an unknown kind, and the
+        tables can still be read."""
+        design = designs.DesignPlanar()
+        qgt = QGeometryTables(design)
+        qgt.clear_all_tables()
+
+        a_poly = draw.rectangle(2, 2, 0, 0)
+        qgt.add_qgeometry('poly', 'id_1', dict(pad=a_poly))
+        qgt.add_qgeometry('pathh', 'id_1', dict(trace=a_poly))
+
+        self.assertFalse('pathh' in qgt.tables)
+        self.assertEqual(len(qgt.tables['poly']), 1)
+        self.assertEqual(len(qgt.tables['path']), 0)
+
     def test_qgeometry_q_element_clear_all_tables(self):
         """Test clear_all_tables in QGeometryTables class in
         element_handler.py."""
@@ -259,6 +310,94 @@ class TestElements(unittest.TestCase):
         self.assertEqual(len(qgt.tables['path']), 0)
         self.assertEqual(len(qgt.tables['poly']), 0)
 
+    def test_qgeometry_q_element_component_index(self):
+        """Test that the component index of QGeometryTables class in
+        element_handler.py follows deletes and renames."""
+        design = designs.DesignPlanar()
+        q_1 = TransmonPocket(design, 'Q1', options=dict(pos_x='-1mm'))
+        q_2 = TransmonPocket(design, 'Q2', options=dict(pos_x='1mm'))
+        qgt = design.qgeometry
+
+        poly = qgt.tables['poly']
+        expected = poly.geometry[poly.component == q_2.id].to_list()
+        self.assertEqual(qgt.get_component_geometry_list('Q2', 'poly'),
+                         expected)
+        self.assertEqual(len(qgt.get_component('Q2', 'poly')), len(expected))
+
+        # Remake Q1, then delete it.
+        q_1.options.pos_y = '1mm'
+        q_1.rebuild()
+        self.assertGreater(
+            qgt.get_component_bounds('Q1')[1],
+            qgt.get_component_bounds('Q2')[1])
+        design.delete_component('Q1')
+
+        poly = qgt.tables['poly']
+        self.assertEqual(set(poly.component), {q_2.id})
+        self.assertEqual(qgt.get_component_geometry_list('Q2', 'poly'),
+                         expected)
+        self.assertEqual(list(qgt.get_component_geometry_dict('Q2', 'poly')),
+                         poly.name.to_list())
+
+        qgt.rename_component(q_2.id, 'Q2_renamed')
+        self.assertEqual(set(qgt.tables['poly'].component), {'Q2_renamed'})
+        self.assertEqual(len(qgt.get_component('Q2', 'poly')), 0)
+
+    def test_qgeometry_q_element_spatial_index(self):
+        """Test that the spatial index of QGeometryTables class in
+        element_handler.py follows rebuilds and deletes."""
+        design = designs.DesignPlanar()
+        q_1 = TransmonPocket(design, 'Q1', options=dict(pos_x='-1mm'))
+        q_2 = TransmonPocket(design, 'Q2', options=dict(pos_x='1mm'))
+        index = design.qgeometry.spatial_index
+
+        for component in [q_1, q_2]:
+            self.assertEqual(index.get_bounds(component.id),
+                             tuple(component.qgeometry_bounds()))
+        self.assertEqual(index.query((-2, -1, 2, 1)), [q_1.id, q_2.id])
+        self.assertEqual(index.query((0.5, -1, 2, 1)), [q_2.id])
+        self.assertEqual(index.query((-0.1, -0.1, 0.1, 0.1)), [])
+
+        outline = index.get_outline(q_1.id)
+        self.assertEqual(len(outline), 1)
+        self.assertEqual(
+            draw.Polygon(outline[0]).bounds, index.get_bounds(q_1.id))
+
+        # Move Q1 next to the origin, then delete Q2.
+        q_1.options.pos_x = '0mm'
+        q_1.rebuild()
+        self.assertEqual(index.query((-0.1, -0.1, 0.1, 0.1)), [q_1.id])
+        self.assertEqual(index.get_bounds(q_1.id),
+                         tuple(q_1.qgeometry_bounds()))
+        design.delete_component('Q2')
+        self.assertEqual(index.query((-2, -1, 2, 1)), [q_1.id])
+        self.assertIsNone(index.get_bounds(q_2.id))
+
+    def test_qgeometry_q_element_spatial_index_flush(self):
+        """Test that reading the tables of QGeometryTables class in
+        element_handler.py only refreshes the components which were added
+        to."""
+        design = designs.DesignPlanar()
+        q_1 = TransmonPocket(design, 'Q1', options=dict(pos_x='-1mm'))
+        TransmonPocket(design, 'Q2', options=dict(pos_x='1mm'))
+        index = design.qgeometry.spatial_index
+        self.assertEqual(index.query((-2, -1, 2, 1)), [1, 2])
+        tree = index._tree
+
+        refreshed = []
+        get_geometry = index._get_geometry
+
+        def logged_get_geometry(table_name, component_id, columns):
+            refreshed.append(component_id)
+            return get_geometry(table_name, component_id, columns)
+
+        index._get_geometry = logged_get_geometry
+        q_1.add_qgeometry('poly', {'extra': draw.rectangle(0.1, 0.1, 0, 0)})
+        self.assertEqual(len(design.qgeometry.tables['poly']), 7)
+        self.assertEqual(index.query((-0.1, -0.1, 0.1, 0.1)), [q_1.id])
+        self.assertEqual(set(refreshed), {q_1.id})
+        self.assertIs(index._tree, tree)
+
     def test_qgeometry_get_all_unique_layers(self):
         """Test get_all_unique_layers functionality in elment_handler.py."""
         design = designs.DesignPlanar()
@@ -280,6 +419,51 @@ class TestElements(unittest.TestCase):
         self.assertEqual(qgt.get_all_unique_layers('main'), [1])
         self.assertEqual(qgt.get_all_unique_layers('fake'), [])
 
+    def test_qgeometry_get_galvanic_nets(self):
+        """Test get_galvanic_nets in QGeometryTables class and
+        get_galvanic_net_ids in galvanic_nets.py."""
+        design = designs.DesignPlanar()
+        qgt = design.qgeometry
+        TransmonPocket(design, 'Q1', options=dict(pos_x='-1mm'))
+        pads = {
+            'left': draw.rectangle(1, 1, -2, 0),
+            'right': draw.rectangle(1, 1, 2, 0)
+        }
+        qgt.add_qgeometry('poly', 1, pads, layer=2)
+        qgt.add_qgeometry('path',
+                          1, {'bridge': draw.LineString([[-1.5, 0], [1.5, 0]])},
+                          width=0.01,
+                          layer=3)
+        qgt.add_qgeometry('poly',
+                          1, {'hole': draw.rectangle(1, 1, 2, 0)},
+                          subtract=True,
+                          layer=2)
+
+        # Different layers are not connected without their z extents.
+        metal = qgt.get_galvanic_nets(layers=[2, 3])
+        self.assertEqual(metal['name'].tolist(), ['bridge', 'left', 'right'])
+        self.assertEqual(metal['net'].tolist(), [0, 1, 2])
+
+        # Layer 3 is on top of layer 2, so the bridge joins both pads.
+        layer_thickness_z = {2: (0.1, 0), 3: (0.1, 0.1)}
+        metal = qgt.get_galvanic_nets(layers=[2, 3],
+                                      layer_thickness_z=layer_thickness_z)
+        self.assertEqual(metal['net'].tolist(), [0, 0, 0])
+        self.assertEqual(len(qgt.get_galvanic_nets(qcomp_ids=[2])), 0)
+
+        # Rows on another chip, or with the same group, are handled.
+        table = metal[['geometry', 'layer', 'chip']].copy()
+        table.loc[1, 'chip'] = 'other'
+        self.assertEqual(
+            galvanic_nets.get_galvanic_net_ids(table,
+                                               layer_thickness_z).tolist(),
+            [0, 1, 0])
+        self.assertEqual(
+            galvanic_nets.get_galvanic_net_ids(table,
+                                               layer_thickness_z,
+                                               groups=['a', 'b', 'b']).tolist(),
+            [0, 0, 0])
+
     def test_qgeometry_q_element_get_component_bounds(self):
         """Test get_component_bounds in QGeometryTables class in
         element_handler.py."""
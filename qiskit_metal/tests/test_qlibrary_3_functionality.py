@@ -38,6 +38,7 @@ from qiskit_metal.qlibrary.tlines import anchored_path
 from qiskit_metal.qlibrary.tlines.anchored_path import RouteAnchors
 from qiskit_metal.qlibrary.tlines.framed_path import RouteFramed
 from qiskit_metal.qlibrary.tlines.meandered import RouteMeander
+from qiskit_metal.qlibrary.tlines.pathfinder import RoutePathfinder
 from qiskit_metal.qlibrary.tlines import straight_path
 from qiskit_metal import designs
 from qiskit_metal.qlibrary.qubits import star_qubit
@@ -516,6 +517,58 @@ class TestComponentFunctionality(unittest.TestCase, AssertionsMixin):
 
         self.assertEqual(design.components.keys(), ['Q1_new_name'])
 
+    def test_qlibrary_parse_options_snapshot(self):
+        """Test the parsed options snapshot used while making a component in
+        base.py."""
+
+        class SnapshotComponent(QComponent):
+            """Records the parsed options it reads in make."""
+            default_options = Dict(width='10um', pads=Dict(a='cpw_width'))
+            seen = []
+
+            def make(self):
+                first = self.parse_options()
+                self.seen.append(first is self.parse_options())
+                self.seen.append(self.p.pads.a)
+                self.options.width = '20um'
+                self.seen.append(self.p.width)
+                self.seen.append(first is self.parse_options())
+
+        design = designs.DesignPlanar()
+        design.variables.cpw_width = '15um'
+        component = SnapshotComponent(design, 'snap')
+        self.assertEqual(SnapshotComponent.seen, [True, 0.015, 0.02, False])
+        self.assertIsNone(component._options_snapshot)
+
+        # Outside of a build, options are parsed on access
+        design.variables.cpw_width = '5um'
+        self.assertEqual(component.p.pads.a, 0.005)
+
+    def test_qlibrary_qgeometry_keepout(self):
+        """Test the cached keep-out area of a component in base.py."""
+        design = designs.DesignPlanar()
+        q_1 = transmon_pocket.TransmonPocket(design, 'Q1')
+
+        keepout = q_1.qgeometry_keepout()
+        self.assertIs(q_1.qgeometry_keepout(), keepout)
+        self.assertEqual(keepout.bounds, tuple(q_1.qgeometry_bounds()))
+
+        grown = q_1.qgeometry_keepout(clearance=0.1)
+        self.assertTrue(grown.contains(keepout))
+        self.assertAlmostEqual(grown.bounds[0], keepout.bounds[0] - 0.1)
+
+        pocket = q_1.qgeometry_keepout(subtract=True)
+        self.assertEqual(pocket.bounds,
+                         q_1.qgeometry_dict('poly')['rect_pk'].bounds)
+        self.assertTrue(q_1.qgeometry_keepout(layer=2).is_empty)
+
+        # Rebuilding forgets the cached geometry
+        q_1.options.pos_x = '1mm'
+        q_1.rebuild()
+        self.assertIsNot(q_1.qgeometry_keepout(), keepout)
+        self.assertAlmostEqual(q_1.qgeometry_keepout().bounds[0],
+                               keepout.bounds[0] + 1)
+
     def test_qlibrary_delete_component(self):
         """Test delete_component in element_handler.py."""
         design = designs.DesignPlanar()
@@ -548,6 +601,62 @@ class TestComponentFunctionality(unittest.TestCase, AssertionsMixin):
             anchored_path.intersecting(np.array([1, 1]), np.array([3, 3]),
                                        np.array([5, 5]), np.array([7, 7])))
 
+    def test_qlibrary_pathfinder_grid_engine(self):
+        """Test the grid engine of RoutePathfinder in pathfinder.py."""
+        design = designs.DesignPlanar()
+        pads = dict(connection_pads=dict(a=dict(loc_W=1, loc_H=1)))
+        # A wall of pockets between the two pins
+        for index in range(3):
+            transmon_pocket.TransmonPocket(design,
+                                           f'W{index}',
+                                           options=dict(
+                                               pos_x=f'{(index - 1) * 1.5}mm',
+                                               pocket_width='1.5mm',
+                                               pad_width='1.2mm'))
+        transmon_pocket.TransmonPocket(design,
+                                       'A',
+                                       options=dict(pos_y='-2mm',
+                                                    orientation='90',
+                                                    **pads))
+        transmon_pocket.TransmonPocket(design,
+                                       'B',
+                                       options=dict(pos_x='0.3mm',
+                                                    pos_y='2mm',
+                                                    orientation='-90',
+                                                    **pads))
+
+        lengths = {}
+        for engine in ['segment', 'grid']:
+            route = RoutePathfinder(
+                design,
+                f'route_{engine}',
+                options=dict(engine=engine,
+                             lead=dict(start_straight='0.1mm',
+                                       end_straight='0.1mm'),
+                             pin_inputs=dict(start_pin=dict(component='A',
+                                                            pin='a'),
+                                             end_pin=dict(component='B',
+                                                          pin='a'))))
+            self.assertEqual(route.status, 'good')
+            lengths[engine] = route.length
+            if engine == 'segment':
+                route.delete()
+
+        self.assertAlmostEqual(lengths['grid'], lengths['segment'])
+        line = draw.LineString(route.get_points())
+        for index in range(3):
+            self.assertFalse(
+                line.crosses(
+                    design.components[f'W{index}'].qgeometry_keepout()))
+
+        # Only the steps through the wall are blocked
+        blocked_x, blocked_y = route.get_occupancy_grid(np.array([-3., 0., 3.]),
+                                                        np.array([-1., 0., 1.]))
+        self.assertEqual(blocked_x.tolist(),
+                         [[False, True, False], [False, True, False]])
+        self.assertEqual(blocked_y.tolist(),
+                         [[False, False], [True, True], [False, False]])
+
     @staticmethod
     def generate_spiral_list(x: int, y: int):
         """Helper function to generate a sprital list.
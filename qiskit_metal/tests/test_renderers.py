@@ -19,11 +19,18 @@
 # pylint: disable-msg=protected-access
 """Qiskit Metal unit tests analyses functionality."""
 
+import os
+import tempfile
+from collections import defaultdict
+from copy import deepcopy
 import unittest
 from unittest.mock import MagicMock
+import gdspy
+import geopandas
 import matplotlib.pyplot as _plt
+import numpy as np
 
-from qiskit_metal import designs
+from qiskit_metal import Dict, designs
 from qiskit_metal.renderers import setup_default
 from qiskit_metal.renderers.renderer_ansys.ansys_renderer import QAnsysRenderer
 from qiskit_metal.renderers.renderer_ansys.q3d_renderer import QQ3DRenderer
@@ -31,8 +38,11 @@ from qiskit_metal.renderers.renderer_ansys.hfss_renderer import QHFSSRenderer
 from qiskit_metal.renderers.renderer_base.renderer_base import QRenderer
 from qiskit_metal.renderers.renderer_base.renderer_gui_base import QRendererGui
 from qiskit_metal.renderers.renderer_gds.gds_renderer import QGDSRenderer
+from qiskit_metal.renderers.renderer_gds.tiled_boolean import tiled_boolean
+from qiskit_metal.renderers.renderer_gds.make_cheese import Cheesing
 from qiskit_metal.renderers.renderer_mpl.mpl_interaction import MplInteraction
 from qiskit_metal.renderers.renderer_gmsh.gmsh_renderer import QGmshRenderer
+from qiskit_metal.renderers.renderer_gmsh.mesh_cache import MeshCache
 from qiskit_metal.renderers.renderer_elmer.elmer_renderer import QElmerRenderer
 from qiskit_metal.renderers.renderer_ansys_pyaedt.hfss_renderer_eigenmode_aedt import QHFSSEigenmodePyaedt
 from qiskit_metal.renderers.renderer_ansys_pyaedt.hfss_renderer_drivenmodal_aedt import QHFSSDrivenmodalPyaedt
@@ -323,12 +333,16 @@ class TestRenderers(unittest.TestCase):
         renderer = QGDSRenderer(design)
         options = renderer.default_options
 
-        self.assertEqual(len(options), 17)
+        self.assertEqual(len(options), 21)
         self.assertEqual(options['short_segments_to_not_fillet'], 'True')
         self.assertEqual(options['check_short_segments_by_scaling_fillet'],
                          '2.0')
         self.assertEqual(options['gds_unit'], '1')
         self.assertEqual(options['ground_plane'], 'True')
+        self.assertEqual(options['hierarchical'], 'False')
+        self.assertEqual(options['streaming'], 'False')
+        self.assertEqual(options['parallel_chips']['enable'], 'False')
+        self.assertEqual(options['parallel_chips']['max_workers'], '4')
         self.assertEqual(options['negative_mask']['main'], [])
         self.assertEqual(options['corners'], 'circular bend')
         self.assertEqual(options['tolerance'], '0.00001')
@@ -343,8 +357,9 @@ class TestRenderers(unittest.TestCase):
 
         self.assertEqual(options['fabricate'], 'False')
 
-        self.assertEqual(len(options['cheese']), 9)
+        self.assertEqual(len(options['cheese']), 10)
         self.assertEqual(len(options['no_cheese']), 5)
+        self.assertEqual(len(options['tiled_boolean']), 2)
 
         self.assertEqual(options['cheese']['datatype'], '100')
         self.assertEqual(options['cheese']['shape'], '0')
@@ -354,12 +369,16 @@ class TestRenderers(unittest.TestCase):
         self.assertEqual(options['cheese']['delta_x'], '100um')
         self.assertEqual(options['cheese']['delta_y'], '100um')
         self.assertEqual(options['cheese']['edge_nocheese'], '200um')
+        self.assertEqual(options['cheese']['engine'], 'boolean')
 
         self.assertEqual(options['no_cheese']['datatype'], '99')
         self.assertEqual(options['no_cheese']['buffer'], '25um')
         self.assertEqual(options['no_cheese']['cap_style'], '2')
         self.assertEqual(options['no_cheese']['join_style'], '2')
 
+        self.assertEqual(options['tiled_boolean']['tile_size'], '0um')
+        self.assertEqual(options['tiled_boolean']['max_workers'], '4')
+
         self.assertEqual(len(options['cheese']['view_in_file']), 1)
         self.assertEqual(len(options['cheese']['view_in_file']['main']), 1)
         self.assertEqual(options['cheese']['view_in_file']['main'][1], True)
@@ -375,7 +394,7 @@ class TestRenderers(unittest.TestCase):
         renderer = QGmshRenderer(design)
         options = renderer.default_options
 
-        self.assertEqual(len(options), 4)
+        self.assertEqual(len(options), 6)
         self.assertEqual(len(options["mesh"]), 8)
         self.assertEqual(len(options["mesh"]["mesh_size_fields"]), 4)
         self.assertEqual(len(options["colors"]), 3)
@@ -401,6 +420,12 @@ class TestRenderers(unittest.TestCase):
         self.assertEqual(options["colors"]["metal"], (84, 140, 168, 255))
         self.assertEqual(options["colors"]["jj"], (84, 140, 168, 150))
         self.assertEqual(options["colors"]["dielectric"], (180, 180, 180, 255))
+        self.assertEqual(options["merge_subtract"]["enable"], False)
+        self.assertEqual(options["merge_subtract"]["quad_segs"], 8)
+        self.assertEqual(options["mesh_cache"]["enable"], False)
+        self.assertEqual(options["mesh_cache"]["cache_dir"],
+                         "./gmsh_mesh_cache")
+        self.assertEqual(options["mesh_cache"]["max_entries"], 16)
 
     def test_renderer_qelmer_renderer_options(self):
         """Test that default_options in QElmerRenderer were not accidentally
@@ -451,6 +476,136 @@ class TestRenderers(unittest.TestCase):
         renderer = QGmshRenderer(design, initiate=False)
         self.assertEqual(renderer.name, 'gmsh')
 
+    def test_renderer_qgmsh_renderer_remap_geom_tags(self):
+        """Test set_geom_tags and remap_geom_tags in QGmshRenderer."""
+        design = designs.MultiPlanar()
+        renderer = QGmshRenderer(design, initiate=False)
+        renderer.layers_dict = defaultdict(list)
+        renderer.polys_dict = defaultdict(dict)
+        renderer.paths_dict = defaultdict(dict)
+        renderer.juncs_dict = defaultdict(dict)
+        renderer.geom_owners = dict()
+
+        renderer.set_geom_tags("path", 1, "Q1_trace", 3, [1])
+        renderer.set_geom_tags("poly", 1, "Q1_pad", 3, [2])
+        renderer.set_geom_tags("junction", 1, "Q1_jj", 2, [2])
+        renderer.set_geom_tags("layer", 1, None, 3, [3, 4])
+        renderer.set_geom_tags("poly", 1, "Q1_pad", 3, [5])
+        self.assertNotIn((3, 2), renderer.geom_owners)
+        self.assertEqual(renderer.geom_owners[(2, 2)], ("junction", 1, "Q1_jj"))
+
+        # Each tag is remapped once, from the tags before the fragment.
+        renderer.remap_geom_tags([(3, 1), (3, 5), (2, 2), (3, 3), (3, 4)],
+                                 [(3, 5), (3, 6), (2, 2), (3, 3), (3, 7)])
+        self.assertEqual(renderer.paths_dict[1], {"Q1_trace": [5]})
+        self.assertEqual(renderer.polys_dict[1], {"Q1_pad": [6]})
+        self.assertEqual(renderer.juncs_dict[1], {"Q1_jj": [2]})
+        self.assertEqual(renderer.layers_dict[1], [3, 7])
+        self.assertEqual(
+            renderer.geom_owners, {
+                (3, 5): ("path", 1, "Q1_trace"),
+                (3, 6): ("poly", 1, "Q1_pad"),
+                (2, 2): ("junction", 1, "Q1_jj"),
+                (3, 3): ("layer", 1, None),
+                (3, 7): ("layer", 1, None)
+            })
+
+    def test_renderer_qgmsh_renderer_add_subtract_shapes(self):
+        """Test add_subtract_shapes in QGmshRenderer."""
+        design = designs.MultiPlanar()
+        q1 = TransmonPocket(design, 'Q1')
+        q1.add_qgeometry('path',
+                         {'cut': draw.LineString([[0, 0], [1, 0], [1, 1]])},
+                         width=0.1,
+                         subtract=True,
+                         fillet=0.2)
+        renderer = QGmshRenderer(design, initiate=False)
+        renderer.subtract_shapes = defaultdict(list)
+
+        table = design.qgeometry.tables['path']
+        renderer.add_subtract_shapes(table[table['subtract']], 'path')
+        table = design.qgeometry.tables['poly']
+        renderer.add_subtract_shapes(table[table['subtract']], 'poly')
+
+        cut, rect_pk = renderer.subtract_shapes[1]
+        self.assertAlmostEqual(cut.area, (2 * 0.8 + np.pi / 2 * 0.2) * 0.1,
+                               places=3)
+        self.assertAlmostEqual(rect_pk.area, 0.65 * 0.65, places=6)
+
+    def test_renderer_qgmsh_renderer_mesh_cache_key(self):
+        """Test get_mesh_cache_key in QGmshRenderer."""
+        design = designs.MultiPlanar()
+        TransmonPocket(design, 'Q1')
+        TransmonPocket(design, 'Q2', options=dict(pos_x='1mm'))
+        renderer = QGmshRenderer(design, initiate=False)
+
+        key = renderer.get_mesh_cache_key(selection=['Q1'], open_pins=None)
+        self.assertEqual(
+            renderer.get_mesh_cache_key(selection=['Q1'], open_pins=None), key)
+
+        # Changes outside the selection keep the key
+        design.components['Q2'].options.pos_x = '2mm'
+        design.rebuild()
+        self.assertEqual(
+            renderer.get_mesh_cache_key(selection=['Q1'], open_pins=None), key)
+
+        renderer.options.mesh.max_size = '50um'
+        self.assertNotEqual(
+            renderer.get_mesh_cache_key(selection=['Q1'], open_pins=None), key)
+        renderer.options.mesh.max_size = '70um'
+        design.components['Q1'].options.pad_gap = '35um'
+        design.rebuild()
+        self.assertNotEqual(
+            renderer.get_mesh_cache_key(selection=['Q1'], open_pins=None), key)
+        self.assertIsNone(renderer.get_mesh_cache_key(selection=['Q3']))
+
+    def test_renderer_qgmsh_mesh_cache(self):
+        """Test put, get and eviction of the MeshCache."""
+
+        def write_mesh(content):
+
+            def write(filepath):
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    f.write(content)
+
+            return write
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = MeshCache(os.path.join(tmp_dir, 'cache'), max_entries=2)
+            self.assertIsNone(cache.get('a'))
+
+            cache.put('a', write_mesh('mesh a'), {
+                1: {
+                    'Q1_pad': 1
+                },
+                'global': {
+                    'vacuum_box': 2
+                }
+            })
+            msh_path, physical_groups = cache.get('a')
+            with open(msh_path, 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), 'mesh a')
+            self.assertEqual(physical_groups, {
+                1: {
+                    'Q1_pad': 1
+                },
+                'global': {
+                    'vacuum_box': 2
+                }
+            })
+
+            # The least recently used mesh is removed
+            cache.put('b', write_mesh('mesh b'), {})
+            os.utime(msh_path, (0, 0))
+            os.utime(msh_path[:-4] + '.json', (0, 0))
+            cache.put('c', write_mesh('mesh c'), {})
+            self.assertIsNone(cache.get('a'))
+            self.assertIsNotNone(cache.get('b'))
+            self.assertIsNotNone(cache.get('c'))
+
+            cache.clear()
+            self.assertEqual(os.listdir(os.path.join(tmp_dir, 'cache')), [])
+
     def test_renderer_qelmer_renderer_name(self):
         """Test name in QElmerRenderer."""
         design = designs.MultiPlanar()
@@ -561,6 +716,38 @@ class TestRenderers(unittest.TestCase):
         self.assertEqual(actual[0], 15.0)
         self.assertEqual(actual[1], 22.5)
 
+    def test_renderer_gdsrenderer_fix_short_segments(self):
+        """Test _fix_short_segments_within_table in gds_renderer.py."""
+        design = designs.DesignPlanar()
+        renderer = QGDSRenderer(design)
+        table = geopandas.GeoDataFrame(dict(
+            name=['short', 'straight', 'no_fillet'],
+            geometry=[
+                draw.LineString([(0, 0), (1, 0), (1, 0.05), (2, 0.05), (2, 1)]),
+                draw.LineString([(0, 2), (1, 2), (1, 3)]),
+                draw.LineString([(0, 4), (1, 4), (1, 4.05), (2, 4.05)])
+            ],
+            fillet=[0.1, 0.1, np.nan]),
+                                       index=[10, 11, 12])
+        renderer.chip_info = {'main': {1: {'all_subtract_true': table}}}
+
+        renderer._fix_short_segments_within_table('main', 1,
+                                                  'all_subtract_true')
+        actual = renderer.chip_info['main'][1]['all_subtract_true']
+
+        self.assertEqual(list(actual.index), [11, 12, 10, 10])
+        self.assertEqual(list(actual['name']),
+                         ['straight', 'no_fillet', 'short', 'short'])
+        self.assertEqual(list(actual.geometry.iloc[2].coords), [(0, 0), (1, 0),
+                                                                (1, 0.05),
+                                                                (1.5, 0.05)])
+        self.assertTrue(np.isnan(actual.fillet.iloc[2]))
+        self.assertEqual(list(actual.geometry.iloc[3].coords), [(1.5, 0.05),
+                                                                (2, 0.05),
+                                                                (2, 1)])
+        self.assertEqual(actual.fillet.iloc[3], 0.1)
+        self.assertTrue(actual.geometry.iloc[0].equals(table.geometry[11]))
+
     # pylint: disable-msg=unused-variable
     def test_renderer_gdsrenderer_check_qcomps(self):
         """Test check_qcomps in gds_renderer.py."""
@@ -618,6 +805,302 @@ class TestRenderers(unittest.TestCase):
         self.assertEqual(renderer._check_either_cheese('main', 1), 1)
         self.assertEqual(renderer._check_either_cheese('fake', 0), 5)
 
+    def test_renderer_gds_hierarchical(self):
+        """Test the hierarchical export of QGDSRenderer in gds_renderer.py."""
+
+        def export(hierarchical: str) -> QGDSRenderer:
+            design = designs.DesignPlanar()
+            pads = dict(a=dict(loc_W=1, loc_H=1), b=dict(loc_W=-1, loc_H=-1))
+            for index in range(3):
+                TransmonPocket(design,
+                               f'Q{index}',
+                               options=dict(pos_x=f'{2 * index}mm',
+                                            pos_y=f'{index}mm',
+                                            orientation=str(90 * index),
+                                            connection_pads=pads))
+            TransmonPocket(design,
+                           'other',
+                           options=dict(pos_y='-2mm',
+                                        pad_width='300um',
+                                        connection_pads=pads))
+
+            renderer = QGDSRenderer(design)
+            renderer.options['hierarchical'] = hierarchical
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                file_name = os.path.join(tmp_dir, 'hierarchical.gds')
+                self.assertEqual(renderer.export_to_gds(file_name), 1)
+            return renderer
+
+        def get_areas(renderer: QGDSRenderer) -> dict:
+            polygons = renderer.lib.cells['TOP'].get_polygons(by_spec=True)
+            return {
+                spec: sum(draw.Polygon(points).area for points in all_points)
+                for spec, all_points in polygons.items()
+            }
+
+        flat = export('False')
+        hierarchical = export('True')
+
+        variants = hierarchical._get_component_variants(
+            hierarchical.design.qgeometry.tables['poly'])
+        self.assertEqual(sorted(variants), [1, 2, 3])
+        self.assertEqual({variant[:2] for variant in variants.values()},
+                         {(0, 1)})
+        self.assertEqual(variants[2][2:], ((2.0, 1.0), 90.0))
+
+        self.assertNotIn('VARIANT_false_main_1_0', flat.lib.cells)
+        cell = hierarchical.lib.cells['VARIANT_false_main_1_0']
+        references = [
+            reference
+            for reference in hierarchical.lib.cells['TOP_main_1'].references
+            if reference.ref_cell is cell
+        ]
+        self.assertEqual(len(references), 3)
+
+        flat_areas = get_areas(flat)
+        hierarchical_areas = get_areas(hierarchical)
+        self.assertEqual(flat_areas.keys(), hierarchical_areas.keys())
+        for spec, area in flat_areas.items():
+            self.assertAlmostEqual(hierarchical_areas[spec], area, places=6)
+
+    def test_renderer_gds_streaming(self):
+        """Test the streaming export of QGDSRenderer in gds_renderer.py."""
+        design = designs.DesignPlanar()
+        for index in range(2):
+            TransmonPocket(design,
+                           f'Q{index}',
+                           options=dict(pos_x=f'{2 * index - 1}mm',
+                                        layer=str(1 + index)))
+        renderer = QGDSRenderer(design)
+        renderer.options.cheese.view_in_file = Dict(main={1: True, 2: False})
+
+        def export(streaming: str) -> tuple:
+            renderer.options['streaming'] = streaming
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                file_name = os.path.join(tmp_dir, 'streaming.gds')
+                self.assertEqual(renderer.export_to_gds(file_name), 1)
+                lib = gdspy.GdsLibrary(infile=file_name)
+            polygons = lib.cells['TOP'].get_polygons(by_spec=True)
+            return sorted(lib.cells), {
+                spec: sum(draw.Polygon(points).area for points in all_points)
+                for spec, all_points in polygons.items()
+            }
+
+        cells, areas = export('False')
+        self.assertIn('TOP_main_1', renderer.lib.cells)
+        streamed_cells, streamed_areas = export('True')
+        self.assertNotIn('TOP_main_1', renderer.lib.cells)
+
+        self.assertEqual(streamed_cells, cells)
+        self.assertEqual(streamed_areas.keys(), areas.keys())
+        for spec, area in areas.items():
+            self.assertAlmostEqual(streamed_areas[spec], area, places=6)
+
+    def test_renderer_gds_parallel_chips(self):
+        """Test the export of each chip by a separate process, in
+        gds_renderer.py."""
+        design = designs.DesignPlanar()
+        design.chips['second'] = deepcopy(design.chips.main)
+        design.chips.second.size.center_x = '10mm'
+        for index, chip in enumerate(['main', 'main', 'second']):
+            TransmonPocket(design,
+                           f'Q{index}',
+                           options=dict(chip=chip,
+                                        pos_x=f'{4 * index - 2}mm',
+                                        layer=str(1 + index % 2)))
+        renderer = QGDSRenderer(design)
+        renderer.options.negative_mask = Dict(second=[1])
+        renderer.options.parallel_chips.max_workers = '2'
+
+        def export(parallel: str) -> tuple:
+            renderer.options.parallel_chips.enable = parallel
+            renderer.clear_cache()
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                file_name = os.path.join(tmp_dir, 'parallel.gds')
+                self.assertEqual(renderer.export_to_gds(file_name), 1)
+                lib = gdspy.GdsLibrary(infile=file_name)
+            polygons = lib.cells['TOP'].get_polygons(by_spec=True)
+            return sorted(lib.cells), {
+                spec: sum(draw.Polygon(points).area for points in all_points)
+                for spec, all_points in polygons.items()
+            }, renderer.get_cache_stats()
+
+        cells, areas, stats = export('False')
+        parallel_cells, parallel_areas, parallel_stats = export('True')
+
+        self.assertIn('TOP_second', parallel_cells)
+        self.assertEqual(parallel_cells, cells)
+        self.assertEqual(parallel_areas.keys(), areas.keys())
+        for spec, area in areas.items():
+            self.assertAlmostEqual(parallel_areas[spec], area, places=6)
+        self.assertEqual(parallel_stats, stats)
+        self.assertEqual(sorted(renderer.chip_info), ['main', 'second'])
+        self.assertIn('all_subtract_true', renderer.chip_info['second'][1])
+
+    def test_renderer_gds_junction_cache(self):
+        """Test that the junction file is only read again by
+        export_to_gds() when it is modified, in gds_renderer.py."""
+        design = designs.DesignPlanar()
+        TransmonPocket(design, 'Q1', options=dict(gds_cell_name='my_jj'))
+        renderer = QGDSRenderer(design)
+        renderer.options.cheese.view_in_file = Dict(main={1: False})
+        renderer.options.no_cheese.view_in_file = Dict(main={1: False})
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            junction_file = os.path.join(tmp_dir, 'junctions.gds')
+            file_name = os.path.join(tmp_dir, 'junction_cache.gds')
+            renderer.options.path_filename = junction_file
+
+            def write_junction(width: float):
+                # Not in gdspy.current_library, which has the exported cell.
+                cell = gdspy.Cell('my_jj', exclude_from_current=True)
+                cell.add(
+                    gdspy.Rectangle((-width / 2, -0.002), (width / 2, 0.002)))
+                junction_lib = gdspy.GdsLibrary(unit=1e-3)
+                junction_lib.add(cell)
+                junction_lib.write_gds(junction_file)
+
+            write_junction(0.004)
+            self.assertEqual(renderer.export_to_gds(file_name), 1)
+            junction_cell = renderer.lib.cells['my_jj']
+            self.assertAlmostEqual(junction_cell.area(), 1.6e-5)
+
+            # Same cell, without reading the file.
+            self.assertEqual(renderer.export_to_gds(file_name), 1)
+            self.assertIs(renderer.lib.cells['my_jj'], junction_cell)
+            self.assertIs(
+                renderer.lib.cells['TOP_main_1'].references[-2].ref_cell,
+                junction_cell)
+
+            # The modified file is read again.
+            write_junction(0.008)
+            stat = os.stat(junction_file)
+            os.utime(junction_file,
+                     ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            self.assertEqual(renderer.export_to_gds(file_name), 1)
+            self.assertIsNot(renderer.lib.cells['my_jj'], junction_cell)
+            self.assertAlmostEqual(renderer.lib.cells['my_jj'].area(), 3.2e-5)
+
+            QGDSRenderer.clear_junction_gds_cache()
+            self.assertEqual(renderer.export_to_gds(file_name), 1)
+            self.assertAlmostEqual(renderer.lib.cells['my_jj'].area(), 3.2e-5)
+
+    def test_renderer_gds_tiled_boolean(self):
+        """Test tiled_boolean in tiled_boolean.py."""
+        ground = gdspy.Rectangle((-5, -5), (5, 5))
+        holes = [
+            gdspy.Round((x_center, y_center), 0.4)
+            for x_center in range(-4, 5, 2)
+            for y_center in range(-4, 5, 2)
+        ]
+        expected = gdspy.boolean(ground, holes, 'not', precision=1e-6)
+
+        for tile_size, max_workers in ((0, 1), (3, 1), (3, 2), (20, 1)):
+            actual = tiled_boolean(ground,
+                                   holes,
+                                   'not',
+                                   1e-6,
+                                   199,
+                                   layer=3,
+                                   tile_size=tile_size,
+                                   max_workers=max_workers)
+            self.assertEqual(actual.layers, [3] * len(actual.polygons))
+            self.assertAlmostEqual(actual.area(), expected.area(), places=4)
+            self.assertEqual(actual.get_bounding_box().tolist(),
+                             expected.get_bounding_box().tolist())
+
+        self.assertIsNone(
+            tiled_boolean(holes, ground, 'not', 1e-6, 199, tile_size=3))
+
+    def test_renderer_gds_cheese_engine(self):
+        """Test the engines of Cheesing in make_cheese.py."""
+        mask = np.array([[1, 1, 0, 1], [1, 1, 0, 1], [0, 0, 1, 1]], dtype=bool)
+        rectangles = Cheesing._get_rectangles(mask)
+        covered = np.zeros(mask.shape, dtype=int)
+        for x_index, y_index, columns, rows in rectangles:
+            covered[x_index:x_index + columns, y_index:y_index + rows] += 1
+        self.assertEqual(covered.tolist(), mask.astype(int).tolist())
+        self.assertIn((0, 0, 2, 2), rectangles)
+
+        def export(engine: str) -> dict:
+            design = designs.DesignPlanar()
+            for index in range(2):
+                TransmonPocket(design,
+                               f'Q{index}',
+                               options=dict(pos_x=f'{2 * index - 1}mm'))
+            renderer = QGDSRenderer(design)
+            renderer.options.cheese.engine = engine
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                file_name = os.path.join(tmp_dir, 'cheese.gds')
+                self.assertEqual(renderer.export_to_gds(file_name), 1)
+            polygons = renderer.lib.cells['TOP'].get_polygons(by_spec=True)
+            return renderer.lib, {
+                spec: sum(draw.Polygon(points).area for points in all_points)
+                for spec, all_points in polygons.items()
+            }
+
+        lib_boolean, areas_boolean = export('boolean')
+        lib_array, areas_array = export('array')
+
+        diff_cell = lib_array.cells['TOP_main_1_Cheese_diff']
+        self.assertGreater(len(diff_cell.references), 0)
+        self.assertTrue(
+            all(
+                isinstance(reference, gdspy.CellArray)
+                for reference in diff_cell.references))
+        self.assertEqual(
+            len(lib_boolean.cells['TOP_main_1_Cheese_diff'].references), 0)
+
+        self.assertEqual(areas_boolean.keys(), areas_array.keys())
+        for spec, area in areas_boolean.items():
+            self.assertAlmostEqual(areas_array[spec], area, places=6)
+
+    def test_renderer_gds_cache(self):
+        """Test the cache of export_to_gds in gds_renderer.py."""
+        design = designs.DesignPlanar()
+        for index in range(2):
+            TransmonPocket(design,
+                           f'Q{index}',
+                           options=dict(pos_x=f'{2 * index - 1}mm',
+                                        layer=str(1 + index)))
+        renderer = QGDSRenderer(design)
+
+        def export() -> dict:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                file_name = os.path.join(tmp_dir, 'cache.gds')
+                self.assertEqual(renderer.export_to_gds(file_name), 1)
+            polygons = renderer.lib.cells['TOP'].get_polygons(by_spec=True)
+            return {
+                spec: sum(draw.Polygon(points).area for points in all_points)
+                for spec, all_points in polygons.items()
+            }
+
+        first = export()
+        self.assertEqual(
+            renderer.get_cache_stats(),
+            dict(element_hits=0,
+                 element_misses=4,
+                 boolean_hits=0,
+                 boolean_misses=2))
+        self.assertEqual(export(), first)
+        self.assertEqual(renderer.get_cache_stats().element_hits, 4)
+        self.assertEqual(renderer.get_cache_stats().boolean_hits, 2)
+
+        # Only the pocket of Q1 is converted again, and only its layer
+        # goes through the ground plane boolean.
+        design.components.Q1.options.pad_gap = '40um'
+        design.rebuild()
+        changed = export()
+        stats = renderer.get_cache_stats()
+        self.assertEqual(stats.element_hits, 7)
+        self.assertEqual(stats.element_misses, 5)
+        self.assertEqual(stats.boolean_hits, 3)
+        self.assertEqual(stats.boolean_misses, 3)
+
+        renderer.clear_cache()
+        self.assertEqual(export(), changed)
+        self.assertEqual(renderer.get_cache_stats().element_hits, 0)
+
     def test_successful_get_convergence(self):
         """Test get_convergence returns the correct Boolean when converged"""
 
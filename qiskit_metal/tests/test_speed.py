@@ -16,12 +16,35 @@
 # pylint: disable-msg=broad-except
 # pylint: disable-msg=too-many-public-methods
 # pylint: disable-msg=import-error
+# pylint: disable-msg=protected-access
 """Qiskit Metal unit tests for speed."""
 
 import unittest
 import time
+import os
+import tempfile
+import tracemalloc
+from copy import deepcopy
+from unittest import mock
+
+import gdspy
+import geopandas
+import numpy as np
+import shapely
+from shapely.strtree import STRtree
+
+from qiskit_metal import Dict, designs
+from qiskit_metal.designs.net_info import QNet
+from qiskit_metal.qgeometries import get_galvanic_net_ids
+from qiskit_metal.qlibrary.qubits.transmon_pocket import TransmonPocket
+from qiskit_metal.qlibrary.tlines.pathfinder import RoutePathfinder
+from qiskit_metal.renderers.renderer_gds.gds_renderer import QGDSRenderer
 from qiskit_metal.tests.custom_decorators import timeout
 
+# The wall-clock times depend on the load of the machine, so they are only
+# compared when QISKIT_METAL_BENCHMARK is set.
+BENCHMARK = os.environ.get('QISKIT_METAL_BENCHMARK', '') not in ('', '0')
+
 
 class TestSpeed(unittest.TestCase):
     """Unit test class."""
@@ -34,6 +57,19 @@ class TestSpeed(unittest.TestCase):
         """Tie any loose ends."""
         pass
 
+    def assertTimeLess(self, first: float, second: float, report: str):
+        """Check that a time is less than another one, when benchmarking.
+        Does nothing otherwise.
+
+        Args:
+            first (float): Time, in seconds, or ratio of times.
+            second (float): Bound of the time.
+            report (str): Timings, as message of the failure.
+        """
+        # pylint: disable=invalid-name
+        if BENCHMARK:
+            self.assertLess(first, second, report)
+
     @timeout(5)
     def test_example_test(self):
         """
@@ -42,6 +78,537 @@ class TestSpeed(unittest.TestCase):
         time.sleep(4)
         self.assertEqual(4, 2 + 2)
 
+    @timeout(120)
+    def test_speed_build_design_scales_linearly(self):
+        """Benchmark building a design of TransmonPockets.
+
+        The qgeometry rows are buffered, so the time per component should
+        not grow with the number of components already in the design.
+        """
+
+        def build_time(num_components: int) -> tuple:
+            design = designs.DesignPlanar()
+            qgeometry = design.qgeometry
+            concat_pending_rows = qgeometry._concat_pending_rows
+            num_concats = [0]
+
+            def counted_concat_pending_rows(*args, **kwargs):
+                num_concats[0] += 1
+                return concat_pending_rows(*args, **kwargs)
+
+            qgeometry._concat_pending_rows = counted_concat_pending_rows
+            start = time.perf_counter()
+            for index in range(num_components):
+                TransmonPocket(design,
+                               f'Q{index}',
+                               options=dict(pos_x=f'{index}mm'))
+            design.rebuild()
+            elapsed = time.perf_counter() - start
+            self.assertEqual(len(design.qgeometry.tables['poly']),
+                             3 * num_components)
+            return elapsed, num_concats[0]
+
+        num_small, num_large = 25, 200
+        time_small, concats_small = build_time(num_small)
+        time_large, concats_large = build_time(num_large)
+
+        # The rows of each table are concatenated once, whatever the number
+        # of components.
+        self.assertEqual(concats_large, concats_small)
+
+        # Quadratic growth would give a ratio close to num_large / num_small.
+        ratio = (time_large / num_large) / (time_small / num_small)
+        self.assertTimeLess(
+            ratio, 2.5, f'{num_small} components: {time_small:.3f}s, '
+            f'{num_large} components: {time_large:.3f}s')
+
+    @timeout(120)
+    def test_speed_pathfinder_grid_engine(self):
+        """Benchmark the engines of RoutePathfinder around a wall of
+        TransmonPockets.
+
+        The grid engine marks the blocked steps once, instead of checking
+        each step of the search against the qgeometry.
+        """
+        design = designs.DesignPlanar()
+        pads = dict(connection_pads=dict(a=dict(loc_W=1, loc_H=1)))
+        for index in range(5):
+            TransmonPocket(design,
+                           f'W{index}',
+                           options=dict(pos_x=f'{(index - 2) * 1.5}mm',
+                                        pocket_width='1.5mm',
+                                        pad_width='1.2mm'))
+        TransmonPocket(design,
+                       'A',
+                       options=dict(pos_y='-2mm', orientation='90', **pads))
+        TransmonPocket(design,
+                       'B',
+                       options=dict(pos_x='0.3mm',
+                                    pos_y='2mm',
+                                    orientation='-90',
+                                    **pads))
+
+        def route_time(engine: str) -> tuple:
+            with mock.patch.object(
+                    RoutePathfinder,
+                    'unobstructed',
+                    autospec=True,
+                    side_effect=RoutePathfinder.unobstructed) as unobstructed:
+                start = time.perf_counter()
+                route = RoutePathfinder(
+                    design,
+                    'route',
+                    options=dict(engine=engine,
+                                 step_size='0.1mm',
+                                 lead=dict(start_straight='0.1mm',
+                                           end_straight='0.1mm'),
+                                 pin_inputs=dict(start_pin=dict(component='A',
+                                                                pin='a'),
+                                                 end_pin=dict(component='B',
+                                                              pin='a'))))
+                elapsed = time.perf_counter() - start
+            self.assertEqual(route.status, 'good')
+            length = route.length
+            route.delete()
+            return elapsed, length, unobstructed.call_count
+
+        time_segment, length_segment, checks_segment = route_time('segment')
+        time_grid, length_grid, checks_grid = route_time('grid')
+
+        report = (f'segment: {time_segment:.2f}s, {checks_segment} checks; '
+                  f'grid: {time_grid:.2f}s, {checks_grid} checks')
+        self.assertAlmostEqual(length_grid, length_segment)
+        self.assertLess(checks_grid, checks_segment / 100, report)
+        self.assertTimeLess(time_grid, time_segment / 4, report)
+
+    @timeout(60)
+    def test_speed_connect_pins_scales_linearly(self):
+        """Benchmark connecting pins in QNet.
+
+        The pins are indexed, so the time per connection should not grow
+        with the number of connections already made.
+        """
+
+        def connect_time(num_connections: int) -> float:
+            qnet = QNet()
+            with mock.patch.object(qnet, '_make_table',
+                                   wraps=qnet._make_table) as make_table:
+                start = time.perf_counter()
+                for index in range(num_connections):
+                    qnet.add_pins_to_table(2 * index + 1, 'a', 2 * index + 2,
+                                           'b')
+                elapsed = time.perf_counter() - start
+                # No table is made until net_info is read
+                self.assertEqual(make_table.call_count, 0)
+                self.assertEqual(len(qnet.net_info), 2 * num_connections)
+                self.assertEqual(make_table.call_count, 1)
+            return elapsed
+
+        num_small, num_large = 4000, 32000
+        time_small = connect_time(num_small)
+        time_large = connect_time(num_large)
+
+        ratio = (time_large / num_large) / (time_small / num_small)
+        self.assertTimeLess(
+            ratio, 2.5, f'{num_small} connections: {time_small:.3f}s, '
+            f'{num_large} connections: {time_large:.3f}s')
+
+    @timeout(60)
+    def test_speed_galvanic_nets_scale_linearly(self):
+        """Benchmark finding the galvanic nets of chains of touching boxes.
+
+        The touching rows are found with an STRtree, so the time per row
+        should not grow with the number of rows.
+        """
+
+        num_pairs = [0]
+
+        class CountedSTRtree(STRtree):
+            """Counts the pairs of rows found by the queries."""
+
+            def query(self, *args, **kwargs):
+                pairs = super().query(*args, **kwargs)
+                num_pairs[0] += pairs.shape[-1]
+                return pairs
+
+        def nets_time(num_rows: int) -> tuple:
+            # Chains of 10 boxes, which touch end to end
+            index = np.arange(num_rows)
+            x_min = index % 10 + (index // 10) * 20
+            y_min = (index // 10) % 7
+            table = geopandas.GeoDataFrame(
+                dict(layer=1,
+                     chip='main',
+                     geometry=shapely.box(x_min, y_min, x_min + 1, y_min + 1)))
+            elapsed = list()
+            for _ in range(3):
+                start = time.perf_counter()
+                net_ids = get_galvanic_net_ids(table)
+                elapsed.append(time.perf_counter() - start)
+            self.assertEqual(net_ids.tolist(), (index // 10).tolist())
+
+            num_pairs[0] = 0
+            with mock.patch('qiskit_metal.qgeometries.galvanic_nets.STRtree',
+                            CountedSTRtree):
+                get_galvanic_net_ids(table)
+            return min(elapsed), num_pairs[0]
+
+        num_small, num_large = 10000, 80000
+        time_small, pairs_small = nets_time(num_small)
+        time_large, pairs_large = nets_time(num_large)
+
+        # Each box is paired with itself and the boxes it touches.
+        self.assertEqual(pairs_small, num_small * 28 // 10)
+        self.assertEqual(pairs_large, num_large * 28 // 10)
+
+        ratio = (time_large / num_large) / (time_small / num_small)
+        self.assertTimeLess(
+            ratio, 3, f'{num_small} rows: {time_small:.3f}s, '
+            f'{num_large} rows: {time_large:.3f}s')
+
+    @timeout(120)
+    def test_speed_export_gds_many_layers(self):
+        """Benchmark exporting to GDS the same TransmonPockets on one layer,
+        and spread over many layers.
+
+        The qgeometry tables of a chip are split by layer in a single pass,
+        so the time and peak memory should not grow with the number of layers
+        as much as with the number of rows.
+        """
+
+        def export_gds(num_layers: int) -> tuple:
+            design = designs.DesignPlanar()
+            for index in range(200):
+                TransmonPocket(design,
+                               f'Q{index}',
+                               options=dict(
+                                   pos_x=f'{(index % 20) * 0.8 - 8}mm',
+                                   pos_y=f'{(index // 20) * 0.8 - 4}mm',
+                                   layer=str(1 + index % num_layers)))
+            gds = design.renderers.gds
+            gds.options.cheese.view_in_file = Dict(main={1: False})
+            gds.options.no_cheese.view_in_file = Dict(main={1: False})
+
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                file_name = os.path.join(tmp_dir, 'many_layers.gds')
+                with mock.patch.object(
+                        QGDSRenderer,
+                        '_get_rows_by_layer',
+                        wraps=QGDSRenderer._get_rows_by_layer) as split:
+                    start = time.perf_counter()
+                    self.assertEqual(gds.export_to_gds(file_name), 1)
+                    elapsed = time.perf_counter() - start
+
+                tracemalloc.start()
+                gds.export_to_gds(file_name)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+            self.assertEqual(len(gds.lib.cells['TOP_main'].references),
+                             num_layers)
+            return elapsed, peak, split.call_count
+
+        time_one, peak_one, splits_one = export_gds(1)
+        time_many, peak_many, splits_many = export_gds(50)
+
+        report = (f'1 layer: {time_one:.3f}s, {peak_one / 1e6:.1f}MB; '
+                  f'50 layers: {time_many:.3f}s, {peak_many / 1e6:.1f}MB')
+        # One split per qgeometry table, whatever the number of layers.
+        self.assertEqual(splits_many, splits_one, report)
+        self.assertTimeLess(time_many, 6 * time_one, report)
+        self.assertLess(peak_many, 4 * peak_one, report)
+
+    @unittest.skipUnless(BENCHMARK, 'QISKIT_METAL_BENCHMARK is not set.')
+    @timeout(120)
+    def test_speed_export_gds_streaming(self):
+        """Benchmark the peak memory of exporting to GDS, with the library in
+        memory and streamed, for a design with cheesing on several layers.
+
+        The streaming export writes and frees each layer when complete, so
+        its peak of traced Python allocations should be closer to that of
+        one layer.
+        """
+        num_layers = 8
+        design = designs.DesignPlanar()
+        design.chips.main.size.size_x = '10mm'
+        design.chips.main.size.size_y = '10mm'
+        for index in range(100):
+            TransmonPocket(design,
+                           f'Q{index}',
+                           options=dict(pos_x=f'{(index % 20) * 0.45 - 4.5}mm',
+                                        pos_y=f'{(index // 20) * 0.45 - 4.5}mm',
+                                        layer=str(1 + index % num_layers)))
+        gds = design.renderers.gds
+        all_layers = range(1, num_layers + 1)
+        gds.options.cheese.view_in_file = Dict(
+            main={layer: True for layer in all_layers})
+        gds.options.no_cheese.view_in_file = Dict(
+            main={layer: False for layer in all_layers})
+        gds.options.cheese.delta_x = '200um'
+        gds.options.cheese.delta_y = '200um'
+
+        def export_gds(streaming: str) -> tuple:
+            gds.options.streaming = streaming
+            gds.clear_cache()
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                file_name = os.path.join(tmp_dir, 'streaming.gds')
+                tracemalloc.start()
+                start = time.perf_counter()
+                self.assertEqual(gds.export_to_gds(file_name), 1)
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                size = os.path.getsize(file_name)
+            return elapsed, peak, size
+
+        time_memory, peak_memory, size_memory = export_gds('False')
+        time_streaming, peak_streaming, size_streaming = export_gds('True')
+
+        report = (f'peak of traced Python allocations, in memory: '
+                  f'{time_memory:.2f}s, {peak_memory / 1e6:.1f}MB; '
+                  f'streaming: {time_streaming:.2f}s, '
+                  f'{peak_streaming / 1e6:.1f}MB')
+        self.assertEqual(size_streaming, size_memory, report)
+        self.assertLess(peak_streaming, peak_memory / 2, report)
+
+    @unittest.skipUnless(BENCHMARK, 'QISKIT_METAL_BENCHMARK is not set.')
+    @timeout(180)
+    def test_speed_export_gds_parallel_chips(self):
+        """Benchmark exporting a design of four chips to GDS, one chip after
+        another and with a process for each chip.
+
+        The chips are independent until the TOP cell, so with enough CPUs
+        the parallel export should be faster.  Otherwise, the cost of the
+        processes should stay small.
+        """
+        num_chips = 4
+        design = designs.DesignPlanar()
+        for chip_index in range(num_chips):
+            chip_name = f'chip{chip_index}'
+            design.chips[chip_name] = deepcopy(design.chips.main)
+            design.chips[chip_name].size.center_x = f'{10 * chip_index}mm'
+            for index in range(25):
+                TransmonPocket(design,
+                               f'Q{chip_index}_{index}',
+                               options=dict(
+                                   chip=chip_name,
+                                   pos_x=f'{10 * chip_index + index % 5 - 2}mm',
+                                   pos_y=f'{index // 5 - 2}mm',
+                                   layer=str(1 + index % 2)))
+        gds = design.renderers.gds
+        gds.options.cheese.view_in_file = Dict()
+        for chip_index in range(num_chips):
+            gds.options.cheese.view_in_file[f'chip{chip_index}'] = {
+                1: True,
+                2: True
+            }
+        gds.options.parallel_chips.max_workers = str(num_chips)
+
+        def export_gds(parallel: str) -> tuple:
+            gds.options.parallel_chips.enable = parallel
+            gds.clear_cache()
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                file_name = os.path.join(tmp_dir, 'parallel.gds')
+                start = time.perf_counter()
+                self.assertEqual(gds.export_to_gds(file_name), 1)
+                elapsed = time.perf_counter() - start
+                lib = gdspy.GdsLibrary(infile=file_name)
+            polygons = lib.cells['TOP'].get_polygons(by_spec=True)
+            areas = {
+                spec: round(
+                    sum(shapely.Polygon(points).area for points in all_points),
+                    6) for spec, all_points in polygons.items()
+            }
+            return elapsed, sorted(lib.cells), areas
+
+        time_sequential, cells, areas = export_gds('False')
+        time_parallel, parallel_cells, parallel_areas = export_gds('True')
+
+        report = (f'one chip after another: {time_sequential:.2f}s, '
+                  f'parallel: {time_parallel:.2f}s, '
+                  f'{os.cpu_count()} CPUs')
+        self.assertEqual(parallel_cells, cells, report)
+        self.assertEqual(parallel_areas, areas, report)
+        if os.cpu_count() >= num_chips:
+            self.assertLess(time_parallel, time_sequential * 0.75, report)
+        else:
+            self.assertLess(time_parallel, time_sequential * 1.5, report)
+
+    @timeout(120)
+    def test_speed_qgeometry_batch_to_gds(self):
+        """Benchmark converting 100k qgeometry rows to gdspy, row by row and
+        in a batch.
+
+        The batch parses the options once, and puts the polygons of each
+        component into one PolygonSet.
+        """
+        num_rows = 100000
+        half = num_rows // 2
+        x_all = (np.arange(num_rows) % 300) * 0.05
+        y_all = (np.arange(num_rows) // 300) * 0.05
+        polygons = shapely.box(x_all[:half], y_all[:half], x_all[:half] + 0.02,
+                               y_all[:half] + 0.02)
+        starts = np.stack([x_all[half:], y_all[half:]], axis=1)
+        lines = shapely.linestrings(starts[:, None, :] +
+                                    np.array([[0, 0], [0.03, 0], [0.03, 0.03]]))
+        path_values = np.r_[np.full(half, np.nan), np.full(half, 0.01)]
+        table = geopandas.GeoDataFrame(
+            dict(component=np.arange(num_rows) // 100 + 1,
+                 name='a',
+                 layer=1,
+                 subtract=False,
+                 helper=False,
+                 chip='main',
+                 width=path_values,
+                 fillet=path_values,
+                 geometry=np.r_[polygons, lines]))
+        gds = QGDSRenderer(designs.DesignPlanar())
+
+        start = time.perf_counter()
+        by_row = list(table.apply(gds._qgeometry_to_gds, axis=1))
+        time_by_row = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = gds._qgeometry_batch_to_gds(table)
+        time_batch = time.perf_counter() - start
+
+        elements = [element for value in batch.values() for element in value]
+        self.assertEqual(len(batch), num_rows // 100)
+        self.assertEqual(
+            sum(
+                len(element.polygons)
+                for element in elements
+                if hasattr(element, 'polygons')), half)
+        self.assertEqual(
+            sum(not hasattr(element, 'polygons') for element in elements), half)
+        self.assertEqual(len(by_row), num_rows)
+
+        report = (f'by row: {time_by_row:.2f}s, batch: {time_batch:.2f}s '
+                  f'for {num_rows} rows')
+        self.assertTimeLess(time_batch, time_by_row / 2, report)
+
+    @timeout(300)
+    def test_speed_gmsh_merge_subtract(self):
+        """Benchmark cutting the subtracted geometries of a grid of
+        TransmonPockets out of the ground plane in Gmsh, one by one and
+        merged in shapely.
+
+        The merged geometries are a few Gmsh entities, so the ground plane
+        is cut by fewer tools, in less time.
+        """
+        import gmsh  # pylint: disable=import-outside-toplevel
+
+        design = designs.MultiPlanar()
+        pads = dict(a=dict(loc_W=1, loc_H=1),
+                    b=dict(loc_W=-1, loc_H=1),
+                    c=dict(loc_W=1, loc_H=-1),
+                    d=dict(loc_W=-1, loc_H=-1))
+        for index in range(36):
+            TransmonPocket(design,
+                           f'Q{index}',
+                           options=dict(pos_x=f'{0.6 * (index % 6 - 2.5)}mm',
+                                        pos_y=f'{0.6 * (index // 6 - 2.5)}mm',
+                                        connection_pads=pads))
+        num_subtract = sum(
+            design.qgeometry.tables[table_type]['subtract'].sum()
+            for table_type in ('path', 'poly'))
+        renderer = design.renderers.gmsh
+        subtract_from_layers = renderer.subtract_from_layers
+
+        def render(merge: str) -> tuple:
+            renderer.options.merge_subtract.enable = merge
+            elapsed = dict()
+
+            def timed_subtract_from_layers(*args, **kwargs):
+                start = time.perf_counter()
+                subtract_from_layers(*args, **kwargs)
+                elapsed['cut'] = time.perf_counter() - start
+
+            renderer.subtract_from_layers = timed_subtract_from_layers
+            start = time.perf_counter()
+            renderer.render_design(mesh_geoms=False)
+            elapsed['render'] = time.perf_counter() - start
+            del renderer.subtract_from_layers
+
+            num_tools = len(renderer.layer_subtract_dict[1])
+            num_entities = len(gmsh.model.getEntities())
+            ground = sum(
+                gmsh.model.occ.getMass(dim, tag)
+                for (dim, tag), owner in renderer.geom_owners.items()
+                if owner == ('layer', 1, None))
+            renderer.close()
+            return elapsed, num_tools, num_entities, ground
+
+        elapsed, num_tools, num_entities, ground = render('False')
+        elapsed_merged, num_tools_merged, num_entities_merged, \
+            ground_merged = render('True')
+
+        report = (f'one by one: {num_tools} tools, {num_entities} entities, '
+                  f'cut {elapsed["cut"]:.2f}s, '
+                  f'render {elapsed["render"]:.2f}s; '
+                  f'merged: {num_tools_merged} tools, '
+                  f'{num_entities_merged} entities, '
+                  f'cut {elapsed_merged["cut"]:.2f}s, '
+                  f'render {elapsed_merged["render"]:.2f}s')
+        self.assertEqual(num_tools, num_subtract, report)
+        self.assertLess(num_tools_merged, num_tools / 10, report)
+        self.assertLess(num_entities_merged, num_entities, report)
+        self.assertAlmostEqual(ground_merged / ground, 1, 4, report)
+        self.assertTimeLess(elapsed_merged['cut'], elapsed['cut'], report)
+
+    @timeout(300)
+    def test_speed_gmsh_mesh_cache(self):
+        """Benchmark rendering and meshing the same TransmonPockets in Gmsh
+        twice, with the mesh cache.
+
+        The second render loads the mesh from the cache, instead of building
+        the OCC model and meshing it again.
+        """
+        design = designs.MultiPlanar()
+        for index in range(4):
+            TransmonPocket(design,
+                           f'Q{index}',
+                           options=dict(pos_x=f'{index - 1.5}mm'))
+        renderer = design.renderers.gmsh
+        renderer.options.mesh.num_threads = 1
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            renderer.options.mesh_cache.enable = 'True'
+            renderer.options.mesh_cache.cache_dir = tmp_dir
+
+            def render() -> tuple:
+                with mock.patch.object(renderer,
+                                       'add_mesh',
+                                       wraps=renderer.add_mesh) as add_mesh:
+                    start = time.perf_counter()
+                    renderer.render_design()
+                    elapsed = time.perf_counter() - start
+                mesh_file = os.path.join(tmp_dir, 'out.msh')
+                renderer.export_mesh(mesh_file)
+                with open(mesh_file, 'r', encoding='utf-8') as f:
+                    lines = f.read().splitlines()
+                os.remove(mesh_file)
+                # Number of nodes and of elements, in the line after the
+                # start of their sections.
+                mesh = [
+                    lines[lines.index(section) + 1].split()[1]
+                    for section in ('$Nodes', '$Elements')
+                ]
+                physical_groups = dict(renderer.physical_groups)
+                renderer.close()
+                return elapsed, add_mesh.call_count, mesh, physical_groups
+
+            time_miss, meshed_miss, mesh_miss, physical_groups_miss = render()
+            time_hit, meshed_hit, mesh_hit, physical_groups_hit = render()
+
+        report = (f'meshing: {time_miss:.2f}s, '
+                  f'from the cache: {time_hit:.2f}s')
+        self.assertEqual(meshed_miss, 1, report)
+        self.assertEqual(meshed_hit, 0, report)
+        self.assertEqual(physical_groups_hit, physical_groups_miss, report)
+        self.assertEqual(mesh_hit, mesh_miss, report)
+        self.assertTimeLess(time_hit, time_miss / 4, report)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
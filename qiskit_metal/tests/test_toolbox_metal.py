@@ -20,6 +20,7 @@
 
 import unittest
 import numpy as np
+import pandas as pd
 from typing import Union
 
 from qiskit_metal.toolbox_metal import about
@@ -34,6 +35,7 @@ from qiskit_metal.toolbox_metal.exceptions import IncorrectQtException
 from qiskit_metal.toolbox_metal.exceptions import QLibraryGUIException
 from qiskit_metal.toolbox_metal.exceptions import InputError
 from qiskit_metal.tests.assertions import AssertionsMixin
+from qiskit_metal.toolbox_python.attr_dict import VersionedDict
 from qiskit_metal.qlibrary.qubits.transmon_concentric import TransmonConcentric
 from qiskit_metal.designs.design_multiplanar import MultiPlanar
 from qiskit_metal.qlibrary.qubits.transmon_pocket_6 import TransmonPocket6
@@ -274,6 +276,26 @@ class TestToolboxMetal(unittest.TestCase, AssertionsMixin):
                                   0.001,
                                   rel_tol=1e-3)
 
+    def test_toolbox_metal_parse_value_cache(self):
+        """Test the cache of parse_value in toolbox_metal.py."""
+        var_dict = VersionedDict({'data_a': '2mm', 'data_b': 'data_a'})
+        parsing.parse_cache_clear()
+
+        self.assertEqual(parsing.parse_value('data_b', var_dict), 2)
+        misses = parsing.parse_cache_info().misses
+        self.assertEqual(parsing.parse_value('data_b', var_dict), 2)
+        self.assertEqual(parsing.parse_cache_info().misses, misses)
+        self.assertEqual(parsing.parse_cache_info().hits, 1)
+
+        var_dict.data_a = '3mm'
+        self.assertEqual(parsing.parse_value('data_b', var_dict), 3)
+
+        # Plain dictionaries can't be tracked, so they are not cached
+        parsing.parse_cache_clear()
+        self.assertEqual(parsing.parse_value('data_a', dict(data_a='4mm')), 4)
+        self.assertEqual(parsing.parse_value('data_a', dict(data_a='5mm')), 5)
+        self.assertEqual(parsing.parse_cache_info().size, 0)
+
     def test_toolbox_metal_parse_options(self):
         """Test parse_options in toolbox_metal.py."""
         dict_1 = {'data_a': '2mm', 'data_b': '1um'}
@@ -658,6 +680,40 @@ class TestToolboxMetal(unittest.TestCase, AssertionsMixin):
                 (ls_file_path, None)).get_properties_for_layer_datatype(
                     ['material', 'thickness'], 3, 0), ('silicon', -0.5))
 
+    def test_toolbox_metal_get_properties_for_layer_datatype_columns(self):
+        """Test functionality of get_properties_for_layer_datatype_columns,
+        and that the parsed layer stack follows the design variables, in
+        toolbox_metal.py."""
+        ls_file_path = ("./qiskit_metal/tests/test_data/planar_chip.txt")
+        multiplanar_design = MultiPlanar(metadata={},
+                                         overwrite_enabled=True,
+                                         layer_stack_filename=ls_file_path)
+        layer_stack = multiplanar_design.ls
+
+        table = layer_stack.get_properties_for_layer_datatype_columns(
+            ['material', 'thickness'],
+            pd.Series([3, 1, 3, 7], index=[4, 5, 6, 7]))
+        self.assertEqual(list(table.index), [4, 5, 6, 7])
+        self.assertEqual(table['material'].tolist()[:3],
+                         ['silicon', 'pec', 'silicon'])
+        self.assertEqual(table['thickness'].tolist()[:3], [-0.5, 0.002, -0.5])
+        self.assertTrue(table.loc[7].isnull().all())
+        self.assertIsNone(
+            layer_stack.get_properties_for_layer_datatype_columns(['bad'], [1]))
+
+        # Replacing ls_df or editing a variable parses the layer stack again.
+        multiplanar_design.variables['metal_thickness'] = '3um'
+        ls_df = layer_stack.ls_df.copy()
+        ls_df.loc[0, 'thickness'] = 'metal_thickness'
+        layer_stack.ls_df = ls_df
+        self.assertAlmostEqual(
+            layer_stack.get_properties_for_layer_datatype(['thickness'], 1)[0],
+            0.003)
+        multiplanar_design.variables['metal_thickness'] = '4um'
+        self.assertAlmostEqual(
+            layer_stack.get_properties_for_layer_datatype(['thickness'], 1)[0],
+            0.004)
+
     def test_toolbox_metal_is_layer_data_unique(self):
         """Test functionality of is_layer_data_unique in toolbox_metal.py."""
         ls_file_path = ("./qiskit_metal/tests/test_data/planar_chip.txt")
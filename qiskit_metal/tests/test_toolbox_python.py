@@ -18,6 +18,9 @@
 """Qiskit Metal unit tests analyses functionality."""
 
 import unittest
+
+import numpy as np
+
 from qiskit_metal.toolbox_python.display import Headings
 from qiskit_metal.toolbox_python.display import Color
 from qiskit_metal.toolbox_python.display import MetalTutorialMagics
@@ -149,6 +152,30 @@ class TestToolboxPython(unittest.TestCase):
                                                     0.1)
         self.assertEqual(results, [1, 2])
 
+    def test_utility_bad_fillet_mask(self):
+        """Test functionality of bad_fillet_mask in utility_functions.py."""
+        lines = [[(1.0, 1.0), (1.5, 1.5), (1.51, 1.5), (2.0, 2.0)],
+                 [(0.0, 0.0), (1.0, 0.0)],
+                 [(0.0, 0.0), (1.0, 0.0), (1.0, 0.05), (2.0, 0.05), (2.0, 1.0)]]
+        offsets = [0, 4, 6, 11]
+        coords = [vertex for line in lines for vertex in line]
+
+        mask = utility_functions.bad_fillet_mask(coords, offsets, 0.1)
+        self.assertEqual(list(np.flatnonzero(mask)), [1, 2, 7, 8])
+        for line, start in zip(lines, offsets):
+            self.assertEqual([
+                start + idx
+                for idx in utility_functions.bad_fillet_idxs(line, 0.1)
+            ], [
+                idx for idx in np.flatnonzero(mask)
+                if start <= idx < start + len(line)
+            ])
+
+        # One fillet radius for each linestring
+        mask = utility_functions.bad_fillet_mask(coords, offsets,
+                                                 [0.1, 0.1, 0.01])
+        self.assertEqual(list(np.flatnonzero(mask)), [1, 2])
+
     def test_utility_clean_name(self):
         """Test clean_name in utility_function.py."""
         self.assertEqual(
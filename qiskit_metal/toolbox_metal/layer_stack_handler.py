@@ -3,12 +3,13 @@
 from re import search
 import pandas as pd
 from typing import List, Tuple, Dict
-from typing import Union
+from typing import Iterable, Union
 from addict import Dict
 import os
 import logging
 
 from .parsing import TRUE_STR, FALSE_STR
+from ..toolbox_python.attr_dict import get_dict_version
 
 
 class LayerStackHandler():
@@ -46,6 +47,14 @@ class LayerStackHandler():
             self.filename_csv_df = fname
 
         self.ls_df = None
+
+        # key=(layer, datatype), value=parsed properties of the first row,
+        # or the exception raised while parsing it.  Built again when ls_df
+        # is replaced, such as when the file is read, or when the design
+        # variables change.
+        self._parsed_props = None
+        self._parsed_props_key = None
+
         # self.column_names = [
         #     'chip_name', 'layer', 'datatype', 'material', 'thickness',
         #     'z_coord', 'fill'
@@ -157,53 +166,119 @@ class LayerStackHandler():
             self._warning_properties(properties)
             return None
 
-        props = Dict()
-        thickness = 0.0
-        z_coord = 0.0
-        material = None
-        fill_value = None
-        chip_name = None
+        props = self._get_parsed_properties().get((layer_number, datatype),
+                                                  Dict())
+        if isinstance(props, Exception):
+            self._warning_search_minus_chip(layer_number, datatype, props)
+            props = Dict()
+        result = list()
+        for item in properties:
+            result.append(props[item])
+        return tuple(result)
+
+    def get_properties_for_layer_datatype_columns(
+            self,
+            properties: List[str],
+            layer_numbers: Iterable[int],
+            datatypes: Union[int,
+                             Iterable[int]] = 0) -> Union[pd.DataFrame, None]:
+        """Same as get_properties_for_layer_datatype, but for whole columns,
+        such as the 'layer' column of a qgeometry table.
+
+        Args:
+            properties (List[str]): The column(s) within the layer stack that you want
+            for each row.
+            layer_numbers (Iterable[int]): The layer number of each row.
+            datatypes (Union[int, Iterable[int]], optional): The datatype of
+                                    each row, or one datatype for all the rows.
+                                    Defaults to 0.
+
+        Returns:
+            Union[pd.DataFrame, None]: None if any of the properties are not in
+                            Col_Names.  Otherwise one column for each property,
+                            and one row for each layer number, with the same index
+                            if layer_numbers is a pandas Series.  Rows not in the
+                            layer_stack file are null.
+        """
+        if not properties:
+            return None
 
+        if not set(properties).issubset(set(self.Col_Names)):
+            self._warning_properties(properties)
+            return None
+
+        layer_numbers = pd.Series(layer_numbers, dtype=object)
+        if pd.api.types.is_scalar(datatypes):
+            datatypes = [datatypes] * len(layer_numbers)
+        keys = list(zip(layer_numbers, datatypes))
+
+        # Look up each unique (layer, datatype) once.
+        parsed_props = self._get_parsed_properties()
+        rows = dict()
+        for a_key in keys:
+            if a_key in rows:
+                continue
+            props = parsed_props.get(a_key, Dict())
+            if isinstance(props, Exception):
+                self._warning_search_minus_chip(a_key[0], a_key[1], props)
+                props = Dict()
+            rows[a_key] = [props.get(item) for item in properties]
+        return pd.DataFrame([rows[a_key] for a_key in keys],
+                            index=layer_numbers.index,
+                            columns=properties)
+
+    def _get_parsed_properties(self) -> dict:
+        """Parse the properties of each (layer, datatype) of ls_df once, and
+        keep them until ls_df or the design variables change.
+
+        Returns:
+            dict: key=(layer, datatype), value=Dict with thickness, z_coord,
+                material, fill and chip_name, or the exception raised while
+                parsing the row.
+        """
         if self.ls_df is None:
             abs_path = os.path.abspath(self.filename_csv_df)
             self.logger.error(
                 f'Not able to read file.'
                 f'File:{abs_path} not read. Check the name and path.')
 
-        mask = (self.ls_df['layer'] == layer_number) & (self.ls_df['datatype']
-                                                        == datatype)
-
-        search_result_df = self.ls_df[mask]
-
-        if len(search_result_df) > 0:
+        version = get_dict_version(self.multi_planar_design.variables)
+        if version is not None and self._parsed_props_key is not None:
+            ls_df, parsed_version = self._parsed_props_key
+            if ls_df is self.ls_df and parsed_version == version:
+                return self._parsed_props
+
+        parsed_props = dict()
+        for row in self.ls_df.itertuples():
+            a_key = (row.layer, row.datatype)
+            if a_key in parsed_props:
+                continue
             try:
-                thickness = self.multi_planar_design.parse_value(
-                    search_result_df.thickness.iloc[0].strip('\''))
-                z_coord = self.multi_planar_design.parse_value(
-                    search_result_df.z_coord.iloc[0].strip('\''))
-                material = search_result_df.material.iloc[0].strip('\'')
-                chip_name = search_result_df.chip_name.iloc[0].strip('\'')
-                value = search_result_df.fill.iloc[0].strip('\'')
+                props = Dict()
+                props['thickness'] = self.multi_planar_design.parse_value(
+                    row.thickness.strip('\''))
+                props['z_coord'] = self.multi_planar_design.parse_value(
+                    row.z_coord.strip('\''))
+                props['material'] = row.material.strip('\'')
+                props['chip_name'] = row.chip_name.strip('\'')
+                value = row.fill.strip('\'')
                 if value in TRUE_STR:
-                    fill_value = True
+                    props['fill'] = True
                 elif value in FALSE_STR:
-                    fill_value = False
+                    props['fill'] = False
                 else:
                     self.logger.warning(
                         f'The \"fill\" value is neither True nor False.'
                         f'You have:{value}.  '
                         f'Will return NULL for fill value.')
-                props['thickness'] = thickness
-                props['z_coord'] = z_coord
-                props['material'] = material
-                props['fill'] = fill_value
-                props['chip_name'] = chip_name
+                    props['fill'] = None
+                parsed_props[a_key] = props
             except Exception as ex:
-                self._warning_search_minus_chip(layer_number, datatype, ex)
-        result = list()
-        for item in properties:
-            result.append(props[item])
-        return tuple(result)
+                parsed_props[a_key] = ex
+
+        self._parsed_props = parsed_props
+        self._parsed_props_key = (self.ls_df, version)
+        return parsed_props
 
     def is_layer_data_unique(self) -> bool:
         """For each layer number make sure the datatypes are unique.  A layers can
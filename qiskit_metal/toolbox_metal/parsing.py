@@ -169,6 +169,7 @@ Returns:
         'dict1': {'key1': 4e-06, '2mm': 0.1}}
 """
 
+from collections import OrderedDict
 from collections.abc import Iterable
 from collections.abc import Mapping
 from numbers import Number
@@ -180,6 +181,7 @@ import pint
 from pint import UnitRegistry
 
 from .. import Dict, config, logger
+from ..toolbox_python.attr_dict import get_dict_version
 
 __all__ = [
     'parse_value',  # Main function
@@ -187,7 +189,9 @@ __all__ = [
     'is_numeric_possible',
     'is_for_ast_eval',
     'is_true',
-    'parse_options'
+    'parse_options',
+    'parse_cache_info',
+    'parse_cache_clear'
 ]
 
 #########################################################################
@@ -219,6 +223,52 @@ def is_true(value: Union[str, int, bool, float]) -> bool:
 # The unit registry stores the definitions and relationships between units.
 UREG = pint.UnitRegistry()
 
+#########################################################################
+# Cache of parsed strings
+
+#: Maximum number of parsed strings kept by `parse_value`
+PARSE_CACHE_SIZE = 4096
+
+# Least recently used first. Keys are (string, version of the variables)
+_PARSE_CACHE = OrderedDict()
+_PARSE_CACHE_STATS = {'hits': 0, 'misses': 0}
+
+
+def _get_variables_version(variable_dict: dict):
+    """Version of the variables used to key the cache of `parse_value`.
+
+    Args:
+        variable_dict (dict): dict pointer of variables
+
+    Returns:
+        int: 0 for no variables, the version of a `VersionedDict`, else None
+        when the variables can't be tracked and parsed strings are not cached.
+    """
+    if not variable_dict:
+        return 0
+    return get_dict_version(variable_dict)
+
+
+def parse_cache_info() -> Dict:
+    """Statistics of the cache of parsed strings used by `parse_value`.
+
+    Returns:
+        Dict: hits, misses, size and maxsize of the cache.
+    """
+    return Dict(hits=_PARSE_CACHE_STATS['hits'],
+                misses=_PARSE_CACHE_STATS['misses'],
+                size=len(_PARSE_CACHE),
+                maxsize=PARSE_CACHE_SIZE)
+
+
+def parse_cache_clear():
+    """Empty the cache of parsed strings used by `parse_value` and reset its
+    statistics."""
+    _PARSE_CACHE.clear()
+    _PARSE_CACHE_STATS['hits'] = 0
+    _PARSE_CACHE_STATS['misses'] = 0
+
+
 #########################################################################
 # Basic string to number
 
@@ -335,6 +385,12 @@ def parse_value(value: str, variable_dict: dict):
     Default units:
         User units can be set in the design. The design will set config.DEFAULT.units
 
+    Caching:
+        Strings parsed to numbers or strings are cached, keyed on the string and
+        the version of the variables, when `variable_dict` is empty or a
+        `VersionedDict` (such as the design variables). Any edit of the
+        variables invalidates their cached values. See `parse_cache_info`.
+
     Examples:
         See the docstring for this module.
             >> ?qiskit_metal.toolbox_metal.parsing
@@ -348,52 +404,26 @@ def parse_value(value: str, variable_dict: dict):
     """
 
     if isinstance(value, str):
-
-        # remove trailing and leading white spaces in the name
-        val = str(value).strip()
-
-        if val:
-            if is_variable_name(val):
-                # we have a string that could be interpreted as a variable
-                # check if there is such a variable name, else return as string
-                # logger.warning(f'Missing variable {opts[name]} from variable list.\n')
-
-                if val in variable_dict:
-                    # Parse the returned value
-                    return parse_value(variable_dict[val], variable_dict)
-
-                # Assume it is a string and just return it
-                # CAUTION: This could cause issues for the user, if they meant to pass a variable
-                # but mistyped it or didn't define it. But they might also want to pass a string
-                # that is variable name compatible, such as pec.
-                # This is basically about type checking, which we can get back to later.
-                return val
-
-            if is_for_ast_eval(val):
-                # If it is a list or dict, this will do a literal eval, so string have
-                # to be in "" else [5um , 4um ] wont work, but ["5um", "0.4 um"] will
-                evaluated = ast.literal_eval(val)
-                if isinstance(evaluated, list):
-                    # check if list, parse each element of the list
-                    return [
-                        parse_value(element, variable_dict)
-                        for element in evaluated
-                    ]
-                if isinstance(evaluated, dict):
-                    return Dict({
-                        key: parse_value(element, variable_dict)
-                        for key, element in evaluated.items()
-                    })
-
-                logger.error(
-                    f'Unknown error in `is_for_ast_eval`\nval={val}\nevaluated={evaluated}'
-                )
-                return evaluated
-
-            if is_numeric_possible(val):
-                return _parse_string_to_float(value)
-
-    elif isinstance(value, Mapping):
+        version = _get_variables_version(variable_dict)
+        if version is None:
+            return _parse_string(value, variable_dict)
+
+        key = (value, version)
+        if key in _PARSE_CACHE:
+            _PARSE_CACHE_STATS['hits'] += 1
+            _PARSE_CACHE.move_to_end(key)
+            return _PARSE_CACHE[key]
+
+        _PARSE_CACHE_STATS['misses'] += 1
+        parsed = _parse_string(value, variable_dict)
+        # Lists and Dicts are mutable, so they are not shared
+        if isinstance(parsed, (Number, str)):
+            _PARSE_CACHE[key] = parsed
+            if len(_PARSE_CACHE) > PARSE_CACHE_SIZE:
+                _PARSE_CACHE.popitem(last=False)
+        return parsed
+
+    if isinstance(value, Mapping):
         # If the value is a dictionary (dict,Dict,...),
         # then parse that dictionary. return Dict
         return Dict(
@@ -402,21 +432,75 @@ def parse_value(value: str, variable_dict: dict):
                 [item[0], parse_value(item[1], variable_dict)],
                 value.items()))
 
-    elif isinstance(value, Iterable):
+    if isinstance(value, Iterable):
         # list, tuple, ... Return the same type
         return {
             np.ndarray: np.array
         }.get(type(value),
               type(value))([parse_value(val, variable_dict) for val in value])
 
-    elif isinstance(value, Number):
-        # If it is an int it will return an int, not a float, etc.
-        return value
-
+    # If it is a number, it will return an int, not a float, etc.
     # else no parsing needed, it is not data that we can handle
     return value
 
 
+def _parse_string(value: str, variable_dict: dict):
+    """Parse a string for `parse_value`, without the cache.
+
+    Args:
+        value (str): String to parse
+        variable_dict (dict): dict pointer of variables
+
+    Return:
+        str, float, list, or ast eval: Parsed value
+    """
+    # remove trailing and leading white spaces in the name
+    val = str(value).strip()
+
+    if val:
+        if is_variable_name(val):
+            # we have a string that could be interpreted as a variable
+            # check if there is such a variable name, else return as string
+            # logger.warning(f'Missing variable {opts[name]} from variable list.\n')
+
+            if val in variable_dict:
+                # Parse the returned value
+                return parse_value(variable_dict[val], variable_dict)
+
+            # Assume it is a string and just return it
+            # CAUTION: This could cause issues for the user, if they meant to pass a variable
+            # but mistyped it or didn't define it. But they might also want to pass a string
+            # that is variable name compatible, such as pec.
+            # This is basically about type checking, which we can get back to later.
+            return val
+
+        if is_for_ast_eval(val):
+            # If it is a list or dict, this will do a literal eval, so string have
+            # to be in "" else [5um , 4um ] wont work, but ["5um", "0.4 um"] will
+            evaluated = ast.literal_eval(val)
+            if isinstance(evaluated, list):
+                # check if list, parse each element of the list
+                return [
+                    parse_value(element, variable_dict) for element in evaluated
+                ]
+            if isinstance(evaluated, dict):
+                return Dict({
+                    key: parse_value(element, variable_dict)
+                    for key, element in evaluated.items()
+                })
+
+            logger.error(
+                f'Unknown error in `is_for_ast_eval`\nval={val}\nevaluated={evaluated}'
+            )
+            return evaluated
+
+        if is_numeric_possible(val):
+            return _parse_string_to_float(value)
+
+    # Not a string that we can parse, return as is
+    return value
+
+
 def parse_options(params: dict, parse_names: str, variable_dict=None):
     """
     Calls parse_value to extract from a dictionary a small subset of values.
@@ -533,4 +617,4 @@ def parse_units(x):
 
     [USER UNITS] ----> [HFSS UNITS]
     '''
-    return parse_entry(fix_units(x))
\ No newline at end of file
+    return parse_entry(fix_units(x))
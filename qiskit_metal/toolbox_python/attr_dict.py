@@ -19,4 +19,75 @@ We use the `addict` package `Dict` class.
 
 # pylint: disable=unused-import
 
+from itertools import count
+import weakref
+
 from addict import Dict
+
+_VERSIONS = count(1)
+
+
+class VersionedDict(Dict):
+    """A `Dict` that takes a new version number on every edit.
+
+    Used for the design variables and the component options, so that values
+    parsed from them can be cached until they change. Version numbers are
+    unique across all instances. An edit of a nested `VersionedDict` also
+    gives a new version to the dictionaries that hold it. Nested dictionaries
+    of other types are not tracked.
+    """
+
+    def __init__(self, *args, **kwargs):
+        object.__setattr__(self, '__version', next(_VERSIONS))
+        object.__setattr__(self, '__owner', None)
+        super().__init__(*args, **kwargs)
+
+    def _bump_version(self):
+        a_dict = self
+        while a_dict is not None:
+            object.__setattr__(a_dict, '__version', next(_VERSIONS))
+            try:
+                owner = object.__getattribute__(a_dict, '__owner')
+            except AttributeError:
+                # Unpickled, __init__ was not called
+                owner = None
+            a_dict = owner() if owner is not None else None
+
+    def __setitem__(self, name, value):
+        super().__setitem__(name, value)
+        if isinstance(value, VersionedDict):
+            object.__setattr__(value, '__owner', weakref.ref(self))
+        self._bump_version()
+
+    def __delitem__(self, name):
+        super().__delitem__(name)
+        self._bump_version()
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._bump_version()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._bump_version()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._bump_version()
+
+
+def get_dict_version(a_dict: dict) -> int:
+    """Get the version of a `VersionedDict`.
+
+    Args:
+        a_dict (dict): The dictionary.
+
+    Returns:
+        int: The version, or None if the dictionary is not versioned.
+    """
+    try:
+        return object.__getattribute__(a_dict, '__version')
+    except AttributeError:
+        return None
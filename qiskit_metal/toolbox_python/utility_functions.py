@@ -23,9 +23,9 @@ from copy import deepcopy
 from typing import Dict, List, TYPE_CHECKING, Tuple, Callable, Union
 import inspect
 
+import numpy as np
 import pandas as pd
 
-from qiskit_metal.draw import Vector
 from qiskit_metal.toolbox_metal.exceptions import InputError
 
 if TYPE_CHECKING:
@@ -36,7 +36,8 @@ __all__ = [
     'enable_warning_traceback', 'get_traceback', 'print_traceback_easy',
     'log_error_easy', 'monkey_patch', 'can_write_to_path',
     'can_write_to_path_with_warning', 'toggle_numbers', 'bad_fillet_idxs',
-    'compress_vertex_list', 'get_range_of_vertex_to_not_fillet'
+    'bad_fillet_mask', 'compress_vertex_list',
+    'get_range_of_vertex_to_not_fillet'
 ]
 
 ####################################################################################
@@ -351,6 +352,55 @@ def toggle_numbers(numbers: list, totlength: int) -> list:
     return complement
 
 
+def bad_fillet_mask(coords: np.ndarray,
+                    offsets: np.ndarray,
+                    fradius: Union[float, np.ndarray],
+                    precision: int = 9) -> np.ndarray:
+    """
+    Flag the vertices which cannot be filleted, for many linestrings at once.
+    Same criteria as bad_fillet_idxs(isclosed=False), but the segment lengths
+    of all the linestrings are computed together.
+
+    Args:
+        coords (np.ndarray): Vertex coordinates of all the linestrings, one
+            linestring after the other. Shape is (number of vertices, 2).
+        offsets (np.ndarray): Index in coords of the first vertex of each
+            linestring, followed by len(coords).
+        fradius (Union[float, np.ndarray]): Fillet radius, for all the
+            linestrings or for each of them.
+        precision (int, optional): Digits of precision used for round(). Defaults to 9.
+
+    Returns:
+        np.ndarray: One bool for each vertex, True if it is too close to its neighbors to be filleted.
+    """
+    coords = np.asarray(coords, dtype=float)
+    offsets = np.asarray(offsets, dtype=int)
+    num_vertex = len(coords)
+    mask = np.zeros(num_vertex, dtype=bool)
+    if num_vertex < 3:
+        return mask
+
+    # seg_length[i] is the length of the segment from vertex i to vertex i + 1
+    seg_length = np.round(np.linalg.norm(np.diff(coords, axis=0), axis=1),
+                          precision)
+    sizes = np.diff(offsets)
+    first = np.repeat(offsets[:-1], sizes)
+    last = np.repeat(offsets[1:] - 1, sizes)
+    radius = np.repeat(
+        np.broadcast_to(np.asarray(fradius, dtype=float), sizes.shape), sizes)
+
+    # The endpoints are never filleted. The vertices next to them need half
+    # the distance to the endpoint.
+    idx = np.arange(num_vertex)
+    idx = idx[(idx > first) & (idx < last)]
+    radius = radius[idx]
+    limit_before = np.where(idx - 1 == first[idx], radius, 2 * radius)
+    limit_after = np.where(idx + 1 == last[idx], radius, 2 * radius)
+    mask[idx] = (seg_length[idx - 1] < limit_before) | (seg_length[idx] <
+                                                        limit_after)
+    return mask
+
+
 def bad_fillet_idxs(coords: list,
                     fradius: float,
                     precision: int = 9,
@@ -369,34 +419,19 @@ def bad_fillet_idxs(coords: list,
         list: List of indices of vertices too close to their neighbors to be filleted.
     """
     length = len(coords)
-    get_dist = Vector.get_distance
     if isclosed:
-        return [
-            i for i in range(length)
-            if min(get_dist(coords[i - 1], coords[i], precision),
-                   get_dist(coords[i], coords[(i + 1) %
-                                              length], precision)) < 2 * fradius
-        ]
-    if length < 3:
-        return []
-    if length == 3:
-        return [] if min(get_dist(coords[0], coords[1], precision),
-                         get_dist(coords[1], coords[2],
-                                  precision)) >= fradius else [1]
-    if (get_dist(coords[0], coords[1], precision) < fradius) or (get_dist(
-            coords[1], coords[2], precision) < 2 * fradius):
-        badlist = [1]
-    else:
-        badlist = []
-    for i in range(2, length - 2):
-        if min(get_dist(coords[i - 1], coords[i], precision),
-               get_dist(coords[i], coords[i + 1], precision)) < 2 * fradius:
-            badlist.append(i)
-    if (get_dist(coords[length - 3], coords[length - 2], precision)
-            < 2 * fradius) or (get_dist(coords[length - 2], coords[length - 1],
-                                        precision) < fradius):
-        badlist.append(length - 2)
-    return badlist
+        if not length:
+            return []
+        coords = np.asarray(coords, dtype=float)
+        # seg_length[i] is the length of the segment from vertex i - 1 to i
+        seg_length = np.round(
+            np.linalg.norm(coords - np.roll(coords, 1, axis=0), axis=1),
+            precision)
+        return np.flatnonzero(
+            np.minimum(seg_length, np.roll(seg_length, -1)) < 2 *
+            fradius).tolist()
+    return np.flatnonzero(
+        bad_fillet_mask(coords, [0, length], fradius, precision)).tolist()
 
 
 def good_fillet_idxs(coords: list,